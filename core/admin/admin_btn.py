@@ -1256,6 +1256,7 @@ class GwAdminButton:
                 self._close_dialog_admin(self.dlg_readsql_rename)
         else:
             global_vars.dao.rollback()
+        tools_db.reload_catalog_cache()
 
         # Reset count error variable to 0
         self.error_count = 0
@@ -1612,7 +1613,7 @@ class GwAdminButton:
                "FROM public.spatial_ref_sys "
                "WHERE CAST(srid AS TEXT) LIKE '" + str(filter_value))
         sql += "%'  AND  srtext ILIKE 'PROJCS%' ORDER BY substr(srtext, 1, 6), srid"
-        self.last_srids = tools_db.get_rows(sql)
+        self.last_srids = tools_db.get_rows(sql, cache_ttl=3600)
 
         # Populate Table
         self.model_srid = QSqlQueryModel()
@@ -1850,6 +1851,7 @@ class GwAdminButton:
             if f:
                 f_to_read = str(f.read().replace("SCHEMA_NAME", schema_name).replace("SRID_VALUE", project_epsg))
                 status = tools_db.execute_sql(str(f_to_read), filepath=filepath, commit=self.dev_commit, is_thread=True)
+                tools_db.reload_catalog_cache(schema_name)
 
                 if status is False:
                     self.error_count = self.error_count + 1
@@ -1970,6 +1972,7 @@ class GwAdminButton:
         if result:
             sql = f'DROP SCHEMA {project_name} CASCADE;'
             status = tools_db.execute_sql(sql)
+            tools_db.reload_catalog_cache(project_name)
             if status:
                 msg = "Process finished successfully"
                 tools_qt.show_info_box(msg, "Info", parameter="Delete schema")
@@ -2831,11 +2834,9 @@ class GwAdminButton:
         # Read the file
         _file = open(folder_path, "r+", encoding='utf8')
         full_file = _file.readlines()
-        sql = ""
-        progress = 0
+        rows = []
         target = ""
         for row in full_file:
-            progress += 1
             row = row.rstrip()
             if len(row) == 0:
                 continue
@@ -2889,28 +2890,16 @@ class GwAdminButton:
                 sp_n = dirty_list
 
             if len(sp_n) > 0:
-                sql += "INSERT INTO temp_csv (fid, source, "
-                values = "VALUES(239, $$" + target + "$$, "
-                for x in range(0, len(sp_n)):
-                    if sp_n[x] != "''":
-                        sql += "csv" + str(x + 1) + ", "
-                        value = "$$" + sp_n[x].strip().replace("\n", "") + "$$, "
-                        values += value.replace("$$$$", "null")
-                    else:
-                        sql += "csv" + str(x + 1) + ", "
-                        values = "VALUES(null, "
-                sql = sql[:-2] + ") "
-                values = values[:-2] + ");\n"
-                sql += values
-
-            if progress % 500 == 0:
-                # TODO:: Use dev_commit or dev_user?
-                tools_db.execute_sql(sql, commit=self.dev_commit)
-                sql = ""
-
-        if sql != "":
+                values = [value.strip().replace("\n", "") if value != "''" else "" for value in sp_n]
+                rows.append([239, target] + [value if value else None for value in values])
+
+        # Insert all rows with COPY, padding them to the same number of columns
+        if rows:
+            num_columns = max(len(row) for row in rows) - 2
+            columns = ['fid', 'source'] + [f"csv{x + 1}" for x in range(num_columns)]
+            rows = (tuple(row) + (None,) * (len(columns) - len(row)) for row in rows)
             # TODO:: Use dev_commit or dev_user?
-            tools_db.execute_sql(sql, commit=self.dev_commit)
+            tools_db.bulk_insert('temp_csv', columns, rows, commit=self.dev_commit)
 
         _file.close()
         del _file
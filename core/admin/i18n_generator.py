@@ -5,6 +5,7 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import itertools
 import os
 import psycopg2
 import psycopg2.extras
@@ -14,7 +15,7 @@ from functools import partial
 from ..ui.ui_manager import GwAdminTranslationUi
 from ..utils import tools_gw
 from ... import global_vars
-from ...lib import tools_qt, tools_qgis
+from ...lib import tools_qt, tools_qgis, tools_log, tools_db
 
 
 class GwI18NGenerator:
@@ -269,16 +270,32 @@ class GwI18NGenerator:
         else:
             os.makedirs(cfg_path, exist_ok=True)
 
-        self._write_header(cfg_path + file_name)
-
-        rows = self._get_dbdialog_values()
-        if not rows:
-            return False
-        self._write_dbdialog_values(rows, cfg_path + file_name)
-        rows = self._get_dbmessages_values()
-        if not rows:
+        # Write a temporary file, replacing the previous one only if every row has been read
+        tmp_path = f"{cfg_path}{file_name}.tmp"
+        try:
+            self._write_header(tmp_path)
+            rows = self._get_dbdialog_values()
+            if not rows:
+                os.remove(tmp_path)
+                return False
+            self._write_dbdialog_values(rows, tmp_path)
+            rows = self._get_dbmessages_values()
+            if not rows:
+                os.remove(tmp_path)
+                return False
+            self._write_dbmessages_values(rows, tmp_path)
+            os.replace(tmp_path, cfg_path + file_name)
+            self._commit()
+        except Exception as e:
+            self.last_error = e
+            tools_log.log_warning(f"Error writing database translation file: {e}")
+            try:
+                self._rollback()
+            except Exception:
+                pass
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return False
-        self._write_dbmessages_values(rows, cfg_path + file_name)
 
         return True
 
@@ -286,26 +303,29 @@ class GwI18NGenerator:
     def _get_dbdialog_values(self):
         """ Get db dialog values """
 
-        sql = (f"SELECT source, project_type, context, formname, formtype, lb_en_us, lb_{self.lower_lang}, tt_en_us, "
-               f"tt_{self.lower_lang} "
+        sql = (f"SELECT source, project_type, context, formname, formtype, lb_en_us, lb_{self.lower_lang} AS lb_lang, "
+               f"tt_en_us, tt_{self.lower_lang} AS tt_lang "
                f"FROM i18n.dbdialog "
                f"ORDER BY context, formname;")
-        rows = self._get_rows(sql)
-        if not rows:
+        rows = tools_db.iter_rows(sql, named=True, aux_conn=self.conn, show_exception=False)
+        first_row = next(rows, None)
+        if first_row is None:
             return False
-        return rows
+        return itertools.chain([first_row], rows)
 
 
     def _get_dbmessages_values(self):
         """ Get db messages values """
 
-        sql = (f"SELECT source, project_type, context, ms_en_us, ms_{self.lower_lang}, ht_en_us, ht_{self.lower_lang}"
+        sql = (f"SELECT source, project_type, context, ms_en_us, ms_{self.lower_lang} AS ms_lang, ht_en_us, "
+               f"ht_{self.lower_lang} AS ht_lang"
                f" FROM i18n.dbmessage "
                f" ORDER BY context;")
-        rows = self._get_rows(sql)
-        if not rows:
+        rows = tools_db.iter_rows(sql, named=True, aux_conn=self.conn, show_exception=False)
+        first_row = next(rows, None)
+        if first_row is None:
             return False
-        return rows
+        return itertools.chain([first_row], rows)
 
 
     def _write_header(self, path):
@@ -336,70 +356,67 @@ class GwI18NGenerator:
             :return: (Boolean)
         """
 
-        file = open(path, "a")
-
-        for row in rows:
-            # Get values
-            table = row['context'] if row['context'] is not None else ""
-            form_name = row['formname']if row['formname'] is not None else ""
-            form_type = row['formtype']if row['formtype'] is not None else ""
-            source = row['source']if row['source'] is not None else ""
-            lbl_value = row[f'lb_{self.lower_lang}'] if row[f'lb_{self.lower_lang}'] is not None else row['lb_en_us']
-            lbl_value = lbl_value if lbl_value is not None else ""
-            if row[f'tt_{self.lower_lang}'] is not None:
-                tt_value = row[f'tt_{self.lower_lang}']
-            elif row[f'tt_en_us'] is not None:
-                tt_value = row[f'tt_en_us']
-            else:
-                tt_value = row['lb_en_us']
-            tt_value = tt_value if tt_value is not None else ""
-
-            # Check invalid characters
-            if lbl_value is not None and "\n" in lbl_value:
-                lbl_value = self._replace_invalid_characters(lbl_value)
-            if tt_value is not None and "\n" in tt_value:
-                tt_value = self._replace_invalid_characters(tt_value)
-
-            line = f'SELECT gw_fct_admin_schema_i18n($$'
-            if row['context'] in ('config_param_system', 'sys_param_user'):
-                line += (f'{{"data":'
-                         f'{{"table":"{table}", '
-                         f'"formname":"{form_name}", '
-                         f'"label":{{"column":"label", "value":"{lbl_value}"}}, '
-                         f'"tooltip":{{"column":"descript", "value":"{tt_value}"}}')
-            elif row['context'] in 'config_typevalue':
-                line += (f'{{"data":'
-                         f'{{"table":"{table}", '
-                         f'"formname":"{form_name}", '
-                         f'"label":{{"column":"idval", "value":"{tt_value}"}} ')
-            elif row['context'] not in ('config_param_system', 'sys_param_user'):
-                line += (f'{{"data":'
-                         f'{{"table":"{table}", '
-                         f'"formname":"{form_name}", '
-                         f'"label":{{"column":"label", "value":"{lbl_value}"}}, '
-                         f'"tooltip":{{"column":"tooltip", "value":"{tt_value}"}}')
-
-            # Clause WHERE for each context
-            if row['context'] == 'config_form_fields':
-                line += (f', "clause":"WHERE columnname = \'{source}\' '
-                         f'AND formname = \'{form_name}\' AND formtype = \'{form_type}\'"')
-            elif row['context'] == 'config_form_tabs':
-                line += (f', "clause":"WHERE formname = \'{form_name}\' '
-                         f'AND columnname = \'{source}\' AND formtype = \'{form_type}\'"')
-            elif row['context'] == 'config_form_groupbox':
-                line += (f', "clause":"WHERE formname = \'{form_name}\' '
-                         f'AND layout_id  = \'{source}\'"')
-            elif row['context'] == 'config_typevalue':
-                line += f', "clause":"WHERE typevalue = \'{form_name}\' AND id  = \'{source}\'"'
-            elif row['context'] == 'config_param_system':
-                line += f', "clause":"WHERE parameter = \'{source}\'"'
-            elif row['context'] == 'sys_param_user':
-                line += f', "clause":"WHERE id = \'{source}\'"'
-
-            line += f'}}}}$$);\n'
-            file.write(line)
-        file.close()
-        del file
+        with open(path, "a") as file:
+            for row in rows:
+                # Get values
+                table = row.context if row.context is not None else ""
+                form_name = row.formname if row.formname is not None else ""
+                form_type = row.formtype if row.formtype is not None else ""
+                source = row.source if row.source is not None else ""
+                lbl_value = row.lb_lang if row.lb_lang is not None else row.lb_en_us
+                lbl_value = lbl_value if lbl_value is not None else ""
+                if row.tt_lang is not None:
+                    tt_value = row.tt_lang
+                elif row.tt_en_us is not None:
+                    tt_value = row.tt_en_us
+                else:
+                    tt_value = row.lb_en_us
+                tt_value = tt_value if tt_value is not None else ""
+
+                # Check invalid characters
+                if lbl_value is not None and "\n" in lbl_value:
+                    lbl_value = self._replace_invalid_characters(lbl_value)
+                if tt_value is not None and "\n" in tt_value:
+                    tt_value = self._replace_invalid_characters(tt_value)
+
+                line = f'SELECT gw_fct_admin_schema_i18n($$'
+                if row.context in ('config_param_system', 'sys_param_user'):
+                    line += (f'{{"data":'
+                             f'{{"table":"{table}", '
+                             f'"formname":"{form_name}", '
+                             f'"label":{{"column":"label", "value":"{lbl_value}"}}, '
+                             f'"tooltip":{{"column":"descript", "value":"{tt_value}"}}')
+                elif row.context in 'config_typevalue':
+                    line += (f'{{"data":'
+                             f'{{"table":"{table}", '
+                             f'"formname":"{form_name}", '
+                             f'"label":{{"column":"idval", "value":"{tt_value}"}} ')
+                elif row.context not in ('config_param_system', 'sys_param_user'):
+                    line += (f'{{"data":'
+                             f'{{"table":"{table}", '
+                             f'"formname":"{form_name}", '
+                             f'"label":{{"column":"label", "value":"{lbl_value}"}}, '
+                             f'"tooltip":{{"column":"tooltip", "value":"{tt_value}"}}')
+
+                # Clause WHERE for each context
+                if row.context == 'config_form_fields':
+                    line += (f', "clause":"WHERE columnname = \'{source}\' '
+                             f'AND formname = \'{form_name}\' AND formtype = \'{form_type}\'"')
+                elif row.context == 'config_form_tabs':
+                    line += (f', "clause":"WHERE formname = \'{form_name}\' '
+                             f'AND columnname = \'{source}\' AND formtype = \'{form_type}\'"')
+                elif row.context == 'config_form_groupbox':
+                    line += (f', "clause":"WHERE formname = \'{form_name}\' '
+                             f'AND layout_id  = \'{source}\'"')
+                elif row.context == 'config_typevalue':
+                    line += f', "clause":"WHERE typevalue = \'{form_name}\' AND id  = \'{source}\'"'
+                elif row.context == 'config_param_system':
+                    line += f', "clause":"WHERE parameter = \'{source}\'"'
+                elif row.context == 'sys_param_user':
+                    line += f', "clause":"WHERE id = \'{source}\'"'
+
+                line += f'}}}}$$);\n'
+                file.write(line)
 
 
     def _write_dbmessages_values(self, rows, path):
@@ -410,36 +427,33 @@ class GwI18NGenerator:
             :return: (Boolean)
         """
 
-        file = open(path, "a")
-
-        for row in rows:
-            # Get values
-            table = row['context'] if row['context'] is not None else ""
-            source = row['source'] if row['source'] is not None else ""
-            ms_value = row[f'ms_{self.lower_lang}'] if row[f'ms_{self.lower_lang}'] is not None else row['ms_en_us']
-            ht_value = row[f'ht_{self.lower_lang}'] if row[f'ht_{self.lower_lang}'] is not None else row['ht_en_us']
-
-            # Check invalid characters
-            if ms_value is not None and "\n" in ms_value:
-                ms_value = self._replace_invalid_characters(ms_value)
-            if ht_value is not None and "\n" in ht_value:
-                ht_value = self._replace_invalid_characters(ht_value)
-
-            line = f'SELECT gw_fct_admin_schema_i18n($$'
-            line += (f'{{"data":'
-                     f'{{"table":"{table}", '
-                     f'"formname":null, '
-                     f'"label":{{"column":"error_message", "value":"{ms_value}"}}, '
-                     f'"tooltip":{{"column":"hint_message", "value":"{ht_value}"}}')
-
-            # Clause WHERE for each context
-            if row['context'] == 'sys_message':
-                line += f', "clause":"WHERE id = \'{source}\' "'
-
-            line += f'}}}}$$);\n'
-            file.write(line)
-        file.close()
-        del file
+        with open(path, "a") as file:
+            for row in rows:
+                # Get values
+                table = row.context if row.context is not None else ""
+                source = row.source if row.source is not None else ""
+                ms_value = row.ms_lang if row.ms_lang is not None else row.ms_en_us
+                ht_value = row.ht_lang if row.ht_lang is not None else row.ht_en_us
+
+                # Check invalid characters
+                if ms_value is not None and "\n" in ms_value:
+                    ms_value = self._replace_invalid_characters(ms_value)
+                if ht_value is not None and "\n" in ht_value:
+                    ht_value = self._replace_invalid_characters(ht_value)
+
+                line = f'SELECT gw_fct_admin_schema_i18n($$'
+                line += (f'{{"data":'
+                         f'{{"table":"{table}", '
+                         f'"formname":null, '
+                         f'"label":{{"column":"error_message", "value":"{ms_value}"}}, '
+                         f'"tooltip":{{"column":"hint_message", "value":"{ht_value}"}}')
+
+                # Clause WHERE for each context
+                if row.context == 'sys_message':
+                    line += f', "clause":"WHERE id = \'{source}\' "'
+
+                line += f'}}}}$$);\n'
+                file.write(line)
 
 
     def _save_user_values(self):
@@ -21,6 +21,7 @@ from .utils import tools_gw
 from .threads.project_layers_config import GwProjectLayersConfig
 from .threads.project_check import GwProjectCheckTask
 from .threads.notify import GwNotify
+from .utils.startup_profiler import GwStartupProfiler
 from .. import global_vars
 from ..lib import tools_qgis, tools_log, tools_db, tools_qt, tools_os
 
@@ -38,12 +39,23 @@ class GwLoadProject(QObject):
 
 
     def project_read(self, show_warning=True):
-        """ Function executed when a user opens a QGIS project (*.qgs) """
+        """ Function executed when a user opens a QGIS project (*.qgs).
+        Time, database round trips and allocations of each phase are written into a report in the log folder """
+
+        self._start_startup_profiler()
+        try:
+            self._project_read(show_warning)
+        finally:
+            self._write_startup_report()
+
+
+    def _project_read(self, show_warning=True):
 
         global_vars.project_loaded = False
         if show_warning:
             tools_log.log_info("Project read started")
 
+        self.startup_profiler.phase('project_variables')
         self._get_user_variables()
         # Get variables from qgis project
         self._get_project_variables()
@@ -51,12 +63,15 @@ class GwLoadProject(QObject):
         # Check if loaded project is valid for Giswater
         if not self._check_project(show_warning):
             return
+        self.startup_status = 'failed'
 
         # Force commit before opening project and set new database connection
+        self.startup_profiler.phase('connection')
         if not self._check_database_connection(show_warning):
             return
 
         # Get SRID from table node
+        self.startup_profiler.phase('srid_user_search_path')
         global_vars.data_epsg = tools_db.get_srid('v_edit_node', global_vars.schema_name)
 
         # Manage schema name
@@ -66,10 +81,14 @@ class GwLoadProject(QObject):
         if schema_name:
             global_vars.schema_name = schema_name.replace('"', '')
 
+        # Set parameters of the connection pool used by tasks
+        self._set_db_pool_params()
+
         # Set PostgreSQL parameter 'search_path'
         tools_db.set_search_path(layer_source['schema'])
 
         # Get water software from table 'sys_version'
+        self.startup_profiler.phase('project_type')
         global_vars.project_type = tools_gw.get_project_type()
         if global_vars.project_type is None:
             return
@@ -79,6 +98,7 @@ class GwLoadProject(QObject):
             return
 
         # Removes all deprecated variables defined at giswater.config
+        self.startup_profiler.phase('user_config')
         tools_gw.remove_deprecated_config_vars()
 
         project_role = global_vars.project_vars.get('project_role')
@@ -99,6 +119,7 @@ class GwLoadProject(QObject):
 
 
         # Check if schema exists
+        self.startup_profiler.phase('check_schema')
         schema_exists = tools_db.check_schema(global_vars.schema_name)
         if not schema_exists:
             tools_qgis.show_warning("Selected schema not found", parameter=global_vars.schema_name)
@@ -116,12 +137,15 @@ class GwLoadProject(QObject):
         #     self.gw_search.open_search(self.dlg_search, load_project=True)
 
         # Get feature cat
+        self.startup_profiler.phase('feature_cat')
         global_vars.feature_cat = tools_gw.manage_feature_cat()
 
         # Create menu
+        self.startup_profiler.phase('menu')
         tools_gw.create_giswater_menu(True)
 
         # Get 'utils_use_gw_snapping' parameter
+        self.startup_profiler.phase('snapping')
         use_gw_snapping = tools_gw.get_config_value('utils_use_gw_snapping', table='config_param_system')
         if use_gw_snapping:
             use_gw_snapping = tools_os.set_boolean(use_gw_snapping[0])
@@ -132,15 +156,18 @@ class GwLoadProject(QObject):
             self._manage_snapping_layers()
 
         # Manage actions of the different plugin_toolbars
+        self.startup_profiler.phase('toolbars')
         self._manage_toolbars()
 
         # Manage "btn_updateall" from attribute table
         self._manage_attribute_table()
 
         # call dynamic mapzones repaint
+        self.startup_profiler.phase('mapzones')
         tools_gw.set_style_mapzones()
 
         # Check roles of this user to show or hide toolbars
+        self.startup_profiler.phase('user_roles')
         self._check_user_roles()
 
         # Create a thread to listen selected database channels
@@ -148,6 +175,9 @@ class GwLoadProject(QObject):
         # list_channels = ['desktop', global_vars.current_user]
         # global_vars.notify.start_listening(list_channels)
 
+        # Listen channel that invalidates the query cache, if configured
+        self._set_query_cache_channel()
+
         # Check parameter 'force_tab_expl'
         force_tab_expl = tools_gw.get_config_parser('system', 'force_tab_expl', 'user', 'init', prefix=False)
         if tools_os.set_boolean(force_tab_expl, False):
@@ -163,8 +193,11 @@ class GwLoadProject(QObject):
         self.iface.mapCanvas().snappingUtils().setIndexingStrategy(QgsSnappingUtils.IndexHybrid)
 
         # Manage versions of Giswater and PostgreSQL
+        self.startup_profiler.phase('versions')
         plugin_version = tools_qgis.get_plugin_metadata('version', 0, global_vars.plugin_dir)
         project_version = tools_gw.get_project_version(schema_name)
+        # Discard catalog cache if the schema has been updated since it was loaded
+        tools_db.check_catalog_version(global_vars.schema_name, project_version)
         # Only get the x.y.zzz, not x.y.zzz.n
         try:
             plugin_version_l = str(plugin_version).split('.')
@@ -195,10 +228,41 @@ class GwLoadProject(QObject):
         self._check_version_compatibility()
 
         # Call gw_fct_setcheckproject and create GwProjectLayersConfig thread
+        self.startup_profiler.phase('layers_config')
         self._config_layers()
+        self.startup_status = 'ok'
 
     # region private functions
 
+    def _start_startup_profiler(self):
+        """ Start profiler of project_read according to user parameters 'log_startup_profile',
+        'log_startup_allocations' and 'log_startup_history' """
+
+        enabled = tools_gw.get_config_parser('log', 'log_startup_profile', 'user', 'init', False)
+        allocations = tools_gw.get_config_parser('log', 'log_startup_allocations', 'user', 'init', False)
+        history_size = tools_gw.get_config_parser('log', 'log_startup_history', 'user', 'init', False)
+        try:
+            history_size = int(history_size)
+        except (TypeError, ValueError):
+            history_size = 50
+        self.startup_profiler = GwStartupProfiler(tools_os.set_boolean(enabled, True),
+                                                  tools_os.set_boolean(allocations, False), history_size)
+        self.startup_status = 'not_loaded'
+        self.startup_profiler.start()
+
+
+    def _write_startup_report(self):
+        """ Stop profiler of project_read and write its report into the log folder """
+
+        report = self.startup_profiler.stop(self.startup_status)
+        # Nothing to report if it is not a Giswater project
+        if report is None or self.startup_status == 'not_loaded' or global_vars.logger is None:
+            return
+        plugin_version = tools_qgis.get_plugin_metadata('version', 0, global_vars.plugin_dir)
+        self.startup_profiler.write_report(report, global_vars.logger.log_folder, schema_name=global_vars.schema_name,
+                                           project_type=global_vars.project_type, plugin_version=plugin_version)
+
+
     def _check_version_compatibility(self):
 
         # Get current QGIS and PostgreSQL versions
@@ -299,6 +363,33 @@ class GwLoadProject(QObject):
             return True
 
 
+    def _set_db_pool_params(self):
+        """ Set size of the pool of auxiliary connections used by tasks from user config file """
+
+        min_size = tools_gw.get_config_parser('system', 'db_pool_min_size', "user", "init", False)
+        max_size = tools_gw.get_config_parser('system', 'db_pool_max_size', "user", "init", False)
+        max_idle = tools_gw.get_config_parser('system', 'db_pool_max_idle', "user", "init", False)
+        global_vars.dao.set_pool_params(min_size, max_size, max_idle)
+
+
+    def _set_query_cache_channel(self):
+        """ Listen channel whose notifications invalidate the query cache, if it is set in user config file """
+
+        channel = tools_gw.get_config_parser('system', 'query_cache_channel', "user", "init", False)
+        if channel in (None, 'None', ''):
+            return
+
+        if global_vars.notify is None:
+            global_vars.notify = GwNotify()
+            global_vars.notify.cache_channel = channel
+            global_vars.notify.start_listening([channel])
+        elif channel not in (global_vars.notify.list_channels or []):
+            # Notify thread is already running: just add the channel
+            global_vars.notify.cache_channel = channel
+            global_vars.notify.list_channels = (global_vars.notify.list_channels or []) + [channel]
+            tools_db.execute_sql(f'LISTEN "{channel}";')
+
+
     def _check_layers_from_distinct_schema(self):
         """
             Checks if there are duplicate layers in any of the defined schemas from project_vars.
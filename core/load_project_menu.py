@@ -10,12 +10,12 @@ import os
 from functools import partial
 
 from qgis.PyQt.QtCore import QObject, Qt
-from qgis.PyQt.QtGui import QIcon, QKeySequence
-from qgis.PyQt.QtWidgets import QActionGroup, QMenu, QPushButton, QTreeWidget, QTreeWidgetItem
+from qgis.PyQt.QtGui import QFontDatabase, QIcon, QKeySequence
+from qgis.PyQt.QtWidgets import QActionGroup, QMenu, QPushButton, QTextEdit, QTreeWidget, QTreeWidgetItem
 from qgis.core import QgsApplication
 
 from .toolbars import buttons
-from .ui.ui_manager import GwLoadMenuUi
+from .ui.ui_manager import GwDialogTextUi, GwLoadMenuUi
 from .utils import tools_gw
 from .. import global_vars
 from ..lib import tools_log, tools_qt, tools_qgis, tools_os, tools_db
@@ -140,6 +140,10 @@ class GwMenuLoad(QObject):
             action_set_log_sql.setShortcuts(QKeySequence(f"{log_sql_shortcut}"))
             action_set_log_sql.triggered.connect(self._set_log_sql)
 
+            # Action 'Performance'
+            action_performance = actions_menu.addAction(f"Performance")
+            action_performance.triggered.connect(self._open_performance)
+
             # endregion
 
         # region Advanced
@@ -153,7 +157,7 @@ class GwMenuLoad(QObject):
         # region Open user folder
         if global_vars.user_folder_dir:
             log_folder = f"{global_vars.user_folder_dir}{os.sep}core{os.sep}log"
-            size = tools_os.get_folder_size(log_folder)
+            size = tools_log.get_log_folder_size(log_folder)
             log_folder_volume = f"{round(size / (1024 * 1024), 2)} MB"
             icon_path = f"{icon_folder}{os.sep}dialogs{os.sep}20x20{os.sep}102.png"
             folder_icon = QIcon(icon_path)
@@ -255,6 +259,7 @@ class GwMenuLoad(QObject):
         self.tree_config_files.itemDoubleClicked.connect(partial(self._double_click_event))
         self.tree_config_files.itemChanged.connect(partial(self._set_config_value))
 
+        tools_gw.flush_config_files()
         path = f"{global_vars.user_folder_dir}{os.sep}core{os.sep}config"
         files = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
         for file in files:
@@ -326,6 +331,53 @@ class GwMenuLoad(QObject):
         tools_qgis.show_info(message)
 
 
+    def _open_performance(self):
+        """ Show latency percentiles, rows and payload of the executed queries, grouped by function or statement """
+
+        self.dlg_performance = GwDialogTextUi('performance')
+        tools_gw.load_settings(self.dlg_performance)
+        self.dlg_performance.txt_infolog.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.dlg_performance.txt_infolog.setLineWrapMode(QTextEdit.NoWrap)
+        self.dlg_performance.btn_accept.setText("Reset")
+        self.dlg_performance.btn_accept.clicked.connect(partial(self._reset_performance))
+        self.dlg_performance.btn_close.clicked.connect(partial(self.dlg_performance.reject))
+        self.dlg_performance.rejected.connect(partial(tools_gw.close_dialog, self.dlg_performance))
+        self._fill_performance()
+        tools_gw.open_dialog(self.dlg_performance, title="Performance")
+
+
+    def _fill_performance(self):
+        """ Fill dialog 'Performance' with the statistics of the queries sorted by total time """
+
+        columns = ("Calls", "Total ms", "p50", "p95", "p99", "Max", "Rows", "KB", "Slow")
+        rows = tools_db.get_query_stats(order_by='total', limit=100)
+        name_width = max([len(row['name']) for row in rows] + [len("Statement")])
+        lines = [f"{'Statement':<{name_width}} " + " ".join(f"{column:>10}" for column in columns)]
+        for row in rows:
+            values = (row['count'], f"{row['total']:.0f}", f"{row['p50']:.1f}", f"{row['p95']:.1f}",
+                      f"{row['p99']:.1f}", f"{row['max']:.1f}", row['rows'], f"{row['bytes'] / 1024:.1f}", row['slow'])
+            lines.append(f"{row['name']:<{name_width}} " + " ".join(f"{value:>10}" for value in values))
+        if not rows:
+            lines.append("No queries executed yet")
+        self.dlg_performance.txt_infolog.setPlainText("\n".join(lines))
+
+        msg = "Percentiles are computed over the last 1000 executions of each statement"
+        cache_stats = tools_db.get_query_cache_stats()
+        msg += (f"\nQuery cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['size']} results, {cache_stats['evictions']} evicted, "
+                f"{cache_stats['invalidations']} invalidated")
+        filepath = tools_log.get_slow_query_filepath()
+        if filepath:
+            msg += f"\nSlow query log file: {filepath}"
+        self.dlg_performance.lbl_text.setText(msg)
+
+
+    def _reset_performance(self):
+
+        tools_db.reset_query_stats()
+        self._fill_performance()
+
+
     def _open_current_selections(self):
 
         if global_vars.session_vars['current_selections']:
@@ -336,6 +388,8 @@ class GwMenuLoad(QObject):
         """ Called in reset plugin action """
 
         self._reset_notify()
+        tools_db.reload_catalog_cache()
+        tools_db.invalidate_query_cache()
         self._reset_snapping_managers()
         self._reset_all_rubberbands()
         tools_qgis.restore_cursor()  # Restore cursor in case it's stuck with an overridden one
@@ -357,6 +411,11 @@ class GwMenuLoad(QObject):
                 pass
 
         schema_name = global_vars.schema_name.replace('"', '')
+
+        # Request configuration of layers to the database again, instead of using the one stored in user folder
+        if global_vars.layers_config_cache is not None:
+            global_vars.layers_config_cache.clear(schema_name=schema_name)
+
         sql = (f"SELECT DISTINCT(parent_layer) FROM cat_feature "
                f"UNION "
                f"SELECT DISTINCT(child_layer) FROM cat_feature "
@@ -0,0 +1,60 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+from ...lib import tools_pgdao
+
+
+class GwBody(object):
+    """ Class to build the json body of the database functions called from python.
+    Values are kept as python objects and escaped when encoded, so text typed by the user can be sent safely """
+
+    def __init__(self, client=None, form=None, feature=None, filter_fields=None, extras=None, page_info=None):
+
+        self.client = client if client is not None else {}
+        self.form = form if form is not None else {}
+        self.feature = feature if feature is not None else {}
+        self.filter_fields = filter_fields if filter_fields is not None else {}
+        self.page_info = page_info if page_info is not None else {}
+        self.extras = extras if extras is not None else {}
+        self._json = None
+
+
+    def __str__(self):
+        return self.to_sql()
+
+
+    def to_dict(self):
+        """ Return body as expected by the database functions (dict) """
+
+        data = {"filterFields": self.filter_fields, "pageInfo": self.page_info}
+        data.update(self.extras)
+        return {"client": self.client, "form": self.form, "feature": self.feature, "data": data}
+
+
+    def to_json(self):
+        """ Return body encoded as json text. It is encoded only once, so body must not be modified after calling it """
+
+        if self._json is None:
+            self._json = tools_pgdao.dumps_json(self.to_dict())
+        return self._json
+
+
+    def to_sql(self):
+        """ Return body as a json literal to be used as parameter of a function in a query.
+        execute_procedure sends the body as a bound parameter: this is used where queries are sent as text
+        (async calls, batches) """
+
+        # Escape string syntax doesn't depend on server setting 'standard_conforming_strings'
+        text = self.to_json().replace('\\', '\\\\').replace("'", "''")
+        return f"E'{text}'::json"
+
+
+    def get_key(self):
+        """ Return canonical json text of the body: equal bodies get the same text, whatever the order of their keys.
+        Useful as key of a cache of responses """
+
+        return tools_pgdao.dumps_json(self.to_dict(), sort_keys=True)
@@ -118,8 +118,14 @@ class GwCatalog:
             extras = f'"fields":{{"matcat_id":"{matcat_id_value}", "shape":"{pn_value}", "geom1":"{dn_value}"}}'
 
         body = tools_gw.create_body(form=form, feature=feature, extras=extras)
-        json_result = tools_gw.execute_procedure('gw_fct_getcatalog', body, log_sql=True)
-        if json_result is None:
+        tools_gw.execute_procedure_async('gw_fct_getcatalog', body, partial(self._fill_catalog_id, id),
+                                         log_sql=True, key='catalog_id')
+
+
+    def _fill_catalog_id(self, id, json_result):
+        """ Fill combo id with the response of gw_fct_getcatalog """
+
+        if json_result in (None, False):
             return
 
         if json_result['status'] == "Failed":
@@ -142,8 +148,14 @@ class GwCatalog:
         feature = f'"feature_type":"{child_type}"'
         extras = f'"fields":{{"matcat_id":"{matcat_id_value}"}}'
         body = tools_gw.create_body(form=form, feature=feature, extras=extras)
-        json_result = tools_gw.execute_procedure('gw_fct_getcatalog', body, log_sql=True)
-        if json_result is None:
+        tools_gw.execute_procedure_async('gw_fct_getcatalog', body, partial(self._fill_pn_dn, pnom, dnom),
+                                         log_sql=True, key='catalog_pn_dn')
+
+
+    def _fill_pn_dn(self, pnom, dnom, json_result):
+        """ Fill combos pnom and dnom (shape and geom1 in UD) with the response of gw_fct_getcatalog """
+
+        if json_result in (None, False):
             return
 
         for field in json_result['body']['data']['fields']:
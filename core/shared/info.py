@@ -123,10 +123,13 @@ class GwInfo(QObject):
                 self.canvas.getCoordinateTransform(), last_click.x(), last_click.y())
 
             extras = ""
+            tool_bar = None
             if tab_type == 'inp':
-                extras = '"toolBar":"epa"'
+                tool_bar = 'epa'
             elif tab_type == 'data':
-                extras = '"toolBar":"basic"'
+                tool_bar = 'basic'
+            if tool_bar is not None:
+                extras = f'"toolBar":"{tool_bar}"'
 
 
             function_name = None
@@ -145,26 +148,26 @@ class GwInfo(QObject):
 
             # Click over canvas
             elif point:
-                visible_layer = tools_qgis.get_visible_layers(as_str_list=True)
+                visible_layer = tools_qgis.get_visible_layers(as_list=True)
                 scale_zoom = self.iface.mapCanvas().scale()
-                extras += f', "activeLayer":"{active_layer}"'
-                extras += f', "visibleLayer":{visible_layer}'
-                extras += f', "mainSchema":"{qgis_project_main_schema}"'
-                extras += f', "addSchema":"{qgis_project_add_schema}"'
-                extras += f', "projecRole":"{qgis_project_role}"'
-                extras += f', "coordinates":{{"xcoord":{point.x()},"ycoord":{point.y()}, "zoomRatio":{scale_zoom}}}'
-                body = tools_gw.create_body(extras=extras)
+                extras = {"activeLayer": f"{active_layer}", "visibleLayer": visible_layer,
+                          "mainSchema": f"{qgis_project_main_schema}", "addSchema": f"{qgis_project_add_schema}",
+                          "projecRole": f"{qgis_project_role}",
+                          "coordinates": {"xcoord": point.x(), "ycoord": point.y(), "zoomRatio": scale_zoom}}
+                if tool_bar is not None:
+                    extras["toolBar"] = tool_bar
+                body = tools_gw.build_body(extras=extras)
                 function_name = 'gw_fct_getinfofromcoordinates'
 
             # Comes from QPushButtons node1 or node2 from custom form or RightButton
             elif feature_id:
                 if is_add_schema:
                     add_schema = global_vars.project_vars['add_schema']
-                    extras = f'"addSchema":"{add_schema}"'
+                    extras = {"addSchema": f"{add_schema}"}
                 else:
-                    extras = '"addSchema":""'
-                feature = f'"tableName":"{table_name}", "id":"{feature_id}"'
-                body = tools_gw.create_body(feature=feature, extras=extras)
+                    extras = {"addSchema": ""}
+                feature = {"tableName": f"{table_name}", "id": f"{feature_id}"}
+                body = tools_gw.build_body(feature=feature, extras=extras)
                 function_name = 'gw_fct_getinfofromid'
 
             if function_name is None:
@@ -3120,8 +3123,9 @@ class GwInfo(QObject):
             break
 
         sql = (f"SELECT gw_fct_getfeatureinfo('{table_name}', '{visit_id}', 3, 100, 'false', 'visit_id', 'integer', '')")
-        row = tools_db.get_row(sql)
-        _json = json.dumps(row[0])
+        row = tools_db.get_row(sql, lazy_json=True)
+        # NULL values are not wrapped into GwLazyJson
+        _json = row[0].text if row and row[0] is not None else 'null'
         _json = f'{{"body":{{"data":{{"fields":{_json}}}}}}}'
         result_json = json.loads(_json)
 
@@ -15,7 +15,7 @@ from functools import partial
 from qgis.PyQt.QtCore import Qt, QDate, QStringListModel, QTime, QDateTime, QTimer
 from qgis.PyQt.QtWidgets import QAbstractItemView, QAction, QCompleter, QLineEdit, QTableView, QTabWidget, QTextEdit, QLabel
 from qgis.PyQt.QtXml import QDomDocument
-from qgis.core import QgsApplication, QgsFeatureRequest, QgsPrintLayout, QgsProject, QgsReadWriteContext, \
+from qgis.core import QgsApplication, QgsPrintLayout, QgsProject, QgsReadWriteContext, \
     QgsVectorLayer
 from qgis.gui import QgsMapToolEmitPoint
 
@@ -1376,25 +1376,19 @@ class GwMincut:
         self._reload_table_hydro(expr_filter)
 
 
-    def _select_features_group_layers(self, expr):
-        """ Select features of the layers filtering by @expr """
+    def _select_features_group_layers(self, connec_ids):
+        """ Select features of the layers whose 'connec_id' is in @connec_ids """
 
         # Iterate over all layers of type 'connec'
-        # Select features and them to 'connec_list'
+        # Select features and add them to 'connec_list'
         for layer in self.layers_connec:
-            it = layer.getFeatures(QgsFeatureRequest(expr))
-            # Build a list of feature id's from the previous result
-            id_list = [i.id() for i in it]
-            # Select features with these id's
-            layer.selectByIds(id_list)
-            if layer.selectedFeatureCount() > 0:
-                # Get selected features of the layer
-                features = layer.selectedFeatures()
-                for feature in features:
-                    connec_id = feature.attribute("connec_id")
-                    # Check if 'connec_id' is already in 'connec_list'
-                    if connec_id not in self.list_ids['connec']:
-                        self.list_ids['connec'].append(connec_id)
+            layer.selectByIds(tools_qgis.get_feature_ids(layer, 'connec_id', connec_ids))
+        list_ids = set(self.list_ids['connec'])
+        for connec_id in tools_qgis.get_selected_values(self.layers_connec, 'connec_id'):
+            # Check if 'connec_id' is already in 'connec_list'
+            if connec_id not in list_ids:
+                list_ids.add(connec_id)
+                self.list_ids['connec'].append(connec_id)
 
 
     def _select_features_connec(self):
@@ -1406,25 +1400,21 @@ class GwMincut:
                f" WHERE result_id = {result_mincut_id}")
         rows = tools_db.get_rows(sql)
 
-        expr_filter = "\"connec_id\" IN ("
         if rows:
             for row in rows:
                 if row[0] not in self.list_ids['connec'] and row[0] not in self.deleted_list:
                     self.list_ids['connec'].append(row[0])
 
         if self.list_ids['connec']:
-            for connec_id in self.list_ids['connec']:
-                expr_filter += f"'{connec_id}', "
-            expr_filter = expr_filter[:-2] + ")"
-            if len(self.list_ids['connec']) == 0:
-                expr_filter = "\"connec_id\" =''"
+            ids_text = ", ".join(f"'{connec_id}'" for connec_id in self.list_ids['connec'])
+            expr_filter = f"\"connec_id\" IN ({ids_text})"
             # Check expression
             (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)
             if not is_valid:
                 return
 
-            # Select features of the layers filtering by @expr
-            self._select_features_group_layers(expr)
+            # Select features of the layers with these ids
+            self._select_features_group_layers(self.list_ids['connec'])
 
             # Reload table
             self._reload_table_connec(expr_filter)
@@ -1442,19 +1432,18 @@ class GwMincut:
                f" WHERE result_id = {result_mincut_id}")
         rows = tools_db.get_rows(sql)
         if rows:
-            expr_filter = "\"connec_id\" IN ("
-            for row in rows:
-                expr_filter += f"'{row[0]}', "
-            expr_filter = expr_filter[:-2] + ")"
+            connec_ids = [row[0] for row in rows]
+            expr_filter = "\"connec_id\" IN (" + ", ".join(f"'{connec_id}'" for connec_id in connec_ids) + ")"
             if len(self.list_ids['connec']) == 0:
+                connec_ids = ['']
                 expr_filter = "\"connec_id\" =''"
             # Check expression
             (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)
             if not is_valid:
                 return
 
-            # Select features of the layers filtering by @expr
-            self._select_features_group_layers(expr)
+            # Select features of the layers with these ids
+            self._select_features_group_layers(connec_ids)
 
         # Get list of 'hydrometer_id' belonging to current result_mincut
         result_mincut_id = tools_qt.get_text(self.dlg_hydro, self.result_mincut_id)
@@ -1499,16 +1488,12 @@ class GwMincut:
         if connec_id is None:
             return
 
-        # Iterate over all layers
-        for layer in self.layers_connec:
-            if layer.selectedFeatureCount() > 0:
-                # Get selected features of the layer
-                features = layer.selectedFeatures()
-                for feature in features:
-                    # Append 'connec_id' into 'connec_list'
-                    selected_id = feature.attribute("connec_id")
-                    if selected_id not in self.list_ids['connec']:
-                        self.list_ids['connec'].append(selected_id)
+        # Append 'connec_id' of selected features of all layers into 'connec_list'
+        list_ids = set(self.list_ids['connec'])
+        for selected_id in tools_qgis.get_selected_values(self.layers_connec, 'connec_id'):
+            if selected_id not in list_ids:
+                list_ids.add(selected_id)
+                self.list_ids['connec'].append(selected_id)
 
         # Show message if element is already in the list
         if connec_id in self.list_ids['connec']:
@@ -1523,23 +1508,16 @@ class GwMincut:
         if len(self.list_ids['connec']) > 0:
 
             # Set expression filter with 'connec_list'
-            expr_filter = "\"connec_id\" IN ("
-            for i in range(len(self.list_ids['connec'])):
-                expr_filter += f"'{self.list_ids['connec'][i]}', "
-            expr_filter = expr_filter[:-2] + ")"
-            if len(self.list_ids['connec']) == 0:
-                expr_filter = "\"connec_id\" =''"
+            ids_text = ", ".join(f"'{connec_id}'" for connec_id in self.list_ids['connec'])
+            expr_filter = f"\"connec_id\" IN ({ids_text})"
             # Check expression
             (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)
             if not is_valid:
                 return
 
-            # Select features with previous filter
+            # Select features with ids of 'connec_list'
             for layer in self.layers_connec:
-                # Build a list of feature id's and select them
-                it = layer.getFeatures(QgsFeatureRequest(expr))
-                id_list = [i.id() for i in it]
-                layer.selectByIds(id_list)
+                layer.selectByIds(tools_qgis.get_feature_ids(layer, 'connec_id', self.list_ids['connec']))
 
         # Reload contents of table 'connec'
         self._reload_table_connec(expr_filter)
@@ -1612,23 +1590,18 @@ class GwMincut:
             self.list_ids['connec'].remove(el)
 
         # Select features which are in the list
-        expr_filter = "\"connec_id\" IN ("
-        for i in range(len(self.list_ids['connec'])):
-            expr_filter += f"'{self.list_ids['connec'][i]}', "
-        expr_filter = expr_filter[:-2] + ")"
+        ids_text = ", ".join(f"'{connec_id}'" for connec_id in self.list_ids['connec'])
+        expr_filter = f"\"connec_id\" IN ({ids_text})"
 
         if len(self.list_ids['connec']) == 0:
             expr_filter = "connec_id=''"
 
         # Update model of the widget with selected expr_filter
-        expr = self._reload_table_connec(expr_filter)
+        self._reload_table_connec(expr_filter)
 
         # Reload selection
         for layer in self.layers_connec:
-            # Build a list of feature id's and select them
-            it = layer.getFeatures(QgsFeatureRequest(expr))
-            id_list = [i.id() for i in it]
-            layer.selectByIds(id_list)
+            layer.selectByIds(tools_qgis.get_feature_ids(layer, 'connec_id', self.list_ids['connec']))
 
         self.connect_signal_selection_changed("mincut_connec")
 
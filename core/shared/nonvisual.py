@@ -631,21 +631,19 @@ class GwNonVisual:
             global_vars.dao.rollback()
             return False
 
+        rows = []
         for row in values:
             if row == (['null'] * tbl_curve_value.columnCount()):
                 continue
+            rows.append([curve_id.strip("'")] + [x if x != 'null' else None for x in row])
 
-            sql = f"INSERT INTO v_edit_inp_curve_value (curve_id, x_value, y_value) " \
-                  f"VALUES ({curve_id}, "
-            for x in row:
-                sql += f"{x}, "
-            sql = sql.rstrip(', ') + ")"
-            result = tools_db.execute_sql(sql, commit=False)
-            if not result:
-                msg = "There was an error inserting curve value."
-                tools_qgis.show_warning(msg, dialog=dialog)
-                global_vars.dao.rollback()
-                return False
+        columns = ['curve_id', 'x_value', 'y_value']
+        result = tools_db.bulk_insert('v_edit_inp_curve_value', columns, rows, method='values', commit=False)
+        if result is None:
+            msg = "There was an error inserting curve value."
+            tools_qgis.show_warning(msg, dialog=dialog)
+            global_vars.dao.rollback()
+            return False
         return True
     # endregion
 
@@ -867,23 +865,19 @@ class GwNonVisual:
             global_vars.dao.rollback()
             return False
 
+        rows = []
         for row in values:
             if row == (['null'] * tbl_pattern_value.columnCount()):
                 continue
+            rows.append([pattern_id.strip("'")] + [x if x != 'null' else None for x in row])
 
-            sql = f"INSERT INTO v_edit_inp_pattern_value (pattern_id, factor_1, factor_2, factor_3, factor_4, factor_5, " \
-                  f"factor_6, factor_7, factor_8, factor_9, factor_10, factor_11, factor_12, factor_13, factor_14, " \
-                  f"factor_15, factor_16, factor_17, factor_18) " \
-                  f"VALUES ({pattern_id}, "
-            for x in row:
-                sql += f"{x}, "
-            sql = sql.rstrip(', ') + ")"
-            result = tools_db.execute_sql(sql, commit=False)
-            if not result:
-                msg = "There was an error inserting pattern value."
-                tools_qgis.show_warning(msg, dialog=dialog)
-                global_vars.dao.rollback()
-                return False
+        columns = ['pattern_id'] + [f"factor_{x}" for x in range(1, 19)]
+        result = tools_db.bulk_insert('v_edit_inp_pattern_value', columns, rows, method='values', commit=False)
+        if result is None:
+            msg = "There was an error inserting pattern value."
+            tools_qgis.show_warning(msg, dialog=dialog)
+            global_vars.dao.rollback()
+            return False
 
         return True
 
@@ -1786,6 +1780,7 @@ class GwNonVisual:
             global_vars.dao.rollback()
             return False
 
+        rows = []
         if times_type == 'ABSOLUTE':
             for row in values:
                 if row == (['null'] * tbl_timeseries_value.columnCount()):
@@ -1795,18 +1790,9 @@ class GwNonVisual:
                     tools_qgis.show_warning(msg, dialog=dialog)
                     global_vars.dao.rollback()
                     return False
-
-                sql = f"INSERT INTO v_edit_inp_timeseries_value (timser_id, date, hour, value) "
-                sql += f"VALUES ({timeseries_id}, {row[0]}, {row[1]}, {row[2]})"
-
-                result = tools_db.execute_sql(sql, commit=False)
-                if not result:
-                    msg = "There was an error inserting pattern value."
-                    tools_qgis.show_warning(msg, dialog=dialog)
-                    global_vars.dao.rollback()
-                    return False
+                rows.append([timeseries_id.strip("'")] + [self._unquote_value(x) for x in row[0:3]])
+            columns = ['timser_id', 'date', 'hour', 'value']
         elif times_type == 'RELATIVE':
-
             for row in values:
                 if row == (['null'] * tbl_timeseries_value.columnCount()):
                     continue
@@ -1815,16 +1801,17 @@ class GwNonVisual:
                     tools_qgis.show_warning(msg, dialog=dialog)
                     global_vars.dao.rollback()
                     return False
+                rows.append([timeseries_id.strip("'")] + [self._unquote_value(x) for x in row[1:3]])
+            columns = ['timser_id', 'time', 'value']
+        else:
+            return True
 
-                sql = f"INSERT INTO v_edit_inp_timeseries_value (timser_id, time, value) "
-                sql += f"VALUES ({timeseries_id}, {row[1]}, {row[2]})"
-
-                result = tools_db.execute_sql(sql, commit=False)
-                if not result:
-                    msg = "There was an error inserting pattern value."
-                    tools_qgis.show_warning(msg, dialog=dialog)
-                    global_vars.dao.rollback()
-                    return False
+        result = tools_db.bulk_insert('v_edit_inp_timeseries_value', columns, rows, method='values', commit=False)
+        if result is None:
+            msg = "There was an error inserting pattern value."
+            tools_qgis.show_warning(msg, dialog=dialog)
+            global_vars.dao.rollback()
+            return False
 
         return True
 
@@ -2252,6 +2239,16 @@ class GwNonVisual:
             table.setRowCount(table.rowCount()-1)
 
 
+    def _unquote_value(self, value):
+        """ Convert a value formatted as SQL literal ('text', number or null) to a bindable parameter """
+
+        if value == 'null':
+            return None
+        if isinstance(value, str):
+            return value.strip("'")
+        return value
+
+
     def _read_tbl_values(self, table, clear_nulls=False):
 
         values = list()
@@ -5,7 +5,6 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
-import csv
 import json
 import os
 import operator
@@ -685,35 +684,16 @@ class GwPsector:
 
     def generate_csv(self, path, viewname):
 
-        # Get columns name in order of the table
-        sql = (f"SELECT column_name FROM information_schema.columns"
-               f" WHERE table_name = '{viewname}'"
-               f" AND table_schema = '" + self.schema_name.replace('"', '') + "'"
-               f" ORDER BY ordinal_position")
-        rows = tools_db.get_rows(sql)
-        columns = []
-
-        if not rows or rows is None or rows == '':
+        # Check that the view exists before exporting it
+        if not tools_db.check_view(viewname, self.schema_name):
             message = "CSV not generated. Check fields from table or view"
             tools_qgis.show_warning(message, parameter=viewname, dialog=self.dlg_plan_psector)
             return
-        for i in range(0, len(rows)):
-            column_name = rows[i]
-            columns.append(str(column_name[0]))
 
+        # Stream rows from the server straight into the file. Nothing is written if the psector has no rows
         psector_id = f"{tools_qt.get_text(self.dlg_plan_psector, self.dlg_plan_psector.psector_id)}"
-        sql = f"SELECT * FROM {viewname} WHERE psector_id = '{psector_id}'"
-        rows = tools_db.get_rows(sql)
-        all_rows = []
-        all_rows.append(columns)
-        if not rows or rows is None or rows == '':
-            return
-        for i in rows:
-            all_rows.append(i)
-
-        with open(path, "w") as output:
-            writer = csv.writer(output, lineterminator='\n')
-            writer.writerows(all_rows)
+        sql = f"SELECT * FROM {viewname} WHERE psector_id = %s"
+        tools_db.export_to_csv(sql, path, params=[psector_id], skip_empty=True)
 
 
     def populate_budget(self, dialog, psector_id):
@@ -5,7 +5,6 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
-import csv
 import os
 import re
 import sys
@@ -54,20 +53,20 @@ class GwSearch:
             self.dlg_search.setProperty('class', self)
 
         # If dlg_mincut is None we are not opening from mincut
-        form = ""
+        form = {}
         if dlg_mincut:
             self.dlg_search = dlg_mincut
             self.is_mincut = True
-            form = f'"singleTab":"tab_address"'
+            form = {"singleTab": "tab_address"}
 
         self.dlg_search.lbl_msg.setStyleSheet("QLabel{color:red;}")
         self.dlg_search.lbl_msg.setVisible(False)
         qgis_project_add_schema = global_vars.project_vars['add_schema']
         if qgis_project_add_schema is None:
-            body = tools_gw.create_body(form=form)
+            body = tools_gw.build_body(form=form)
         else:
-            extras = f'"addSchema":"{qgis_project_add_schema}"'
-            body = tools_gw.create_body(form=form, extras=extras)
+            extras = {"addSchema": qgis_project_add_schema}
+            body = tools_gw.build_body(form=form, extras=extras)
         complet_list = tools_gw.execute_procedure('gw_fct_getsearch', body)
         if not complet_list or complet_list['status'] == 'Failed':
             return False
@@ -148,51 +147,34 @@ class GwSearch:
         if qtable_2:
             model_2 = qtable_2.model()
 
-        # Convert qtable values into list
-        all_rows = []
-        headers = []
-        for i in range(0, model_1.columnCount()):
-            headers.append(str(model_1.headerData(i, Qt.Horizontal)))
-        all_rows.append(headers)
-        for rows in range(0, model_1.rowCount()):
-            row = []
-            for col in range(0, model_1.columnCount()):
-                row.append(str(model_1.data(model_1.index(rows, col))))
-            all_rows.append(row)
-        if qtable_2 is not None:
-            headers = []
-            for i in range(0, model_2.columnCount()):
-                headers.append(str(model_2.headerData(i, Qt.Horizontal)))
-            all_rows.append(headers)
-            for rows in range(0, model_2.rowCount()):
-                row = []
-                for col in range(0, model_2.columnCount()):
-                    row.append(str(model_2.data(model_2.index(rows, col))))
-                all_rows.append(row)
-
-        # Write list into csv file
+        # Get the query of each table model, so rows are exported by the server instead of read from the models
+        queries = [self._get_model_sql(model_1)]
+        if model_2 is not None:
+            queries.append(self._get_model_sql(model_2))
+
+        # Write queries into csv file
         try:
             if os.path.exists(folder_path):
                 msg = "Are you sure you want to overwrite this file?"
                 answer = tools_qt.show_question(msg, "Overwrite")
                 if answer:
-                    self._write_to_csv(dialog, folder_path, all_rows)
+                    self._write_to_csv(dialog, folder_path, queries)
             else:
-                self._write_to_csv(dialog, folder_path, all_rows)
+                self._write_to_csv(dialog, folder_path, queries)
         except Exception:
             msg = "File path doesn't exist or you dont have permission or file is opened"
             tools_qgis.show_warning(msg, dialog=dialog)
 
 
     def refresh_tab(self, tab_name="tab_hydro"):
-        form = f'"singleTab":"{tab_name}"'
+        form = {"singleTab": tab_name}
 
         qgis_project_add_schema = global_vars.project_vars['add_schema']
         if qgis_project_add_schema is None:
-            body = tools_gw.create_body(form=form)
+            body = tools_gw.build_body(form=form)
         else:
-            extras = f'"addSchema":"{qgis_project_add_schema}"'
-            body = tools_gw.create_body(form=form, extras=extras)
+            extras = {"addSchema": qgis_project_add_schema}
+            body = tools_gw.build_body(form=form, extras=extras)
         complet_list = tools_gw.execute_procedure('gw_fct_getsearch', body)
 
         main_tab = self.dlg_search.findChild(QTabWidget, 'main_tab')
@@ -381,18 +363,16 @@ class GwSearch:
         """ Create a list of ids and populate widget (QLineEdit) """
 
         # Create 2 json, one for first QLineEdit and other for second QLineEdit
-        form_search = ''
-        extras_search = ''
-        form_search_add = ''
-        extras_search_add = ''
+        extras_search = {}
+        extras_search_add = {}
         result = None
         line_edit = None
         index = self.dlg_search.main_tab.currentIndex()
         combo_list = self.dlg_search.main_tab.widget(index).findChildren(QComboBox)
         line_list = self.dlg_search.main_tab.widget(index).findChildren(QLineEdit)
         chk_list = self.dlg_search.main_tab.widget(index).findChildren(QCheckBox)
-        form_search += f'"tabName":"{self.dlg_search.main_tab.widget(index).objectName()}"'
-        form_search_add += f'"tabName":"{self.dlg_search.main_tab.widget(index).objectName()}"'
+        form_search = {"tabName": self.dlg_search.main_tab.widget(index).objectName()}
+        form_search_add = {"tabName": self.dlg_search.main_tab.widget(index).objectName()}
 
         if combo_list:
             combo = combo_list[0]
@@ -400,11 +380,11 @@ class GwSearch:
             name = tools_qt.get_combo_value(self.dlg_search, combo, 1)
             try:
                 feature_type = tools_qt.get_combo_value(self.dlg_search, combo, 2)
-                extras_search += f'"searchType":"{feature_type}", '
+                extras_search["searchType"] = f"{feature_type}"
             except IndexError:
                 pass
-            extras_search += f'"{combo.property("columnname")}":{{"id":"{id}", "name":"{name}"}}, '
-            extras_search_add += f'"{combo.property("columnname")}":{{"id":"{id}", "name":"{name}"}}, '
+            extras_search[combo.property("columnname")] = {"id": f"{id}", "name": f"{name}"}
+            extras_search_add[combo.property("columnname")] = {"id": f"{id}", "name": f"{name}"}
 
         if line_list:
             line_edit = line_list[0]
@@ -417,13 +397,13 @@ class GwSearch:
                 return
 
             qgis_project_add_schema = global_vars.project_vars['add_schema']
-            extras_search += f'"{line_edit.property("columnname")}":{{"text":"{value}"}}, '
-            extras_search += f'"addSchema":"{qgis_project_add_schema}"'
+            extras_search[line_edit.property("columnname")] = {"text": f"{value}"}
+            extras_search["addSchema"] = f"{qgis_project_add_schema}"
             if chk_list:
                 chk_list = chk_list[0]
-                extras_search += f', "{chk_list.property("columnname")}":"{chk_list.isChecked()}"'
-            extras_search_add += f'"{line_edit.property("columnname")}":{{"text":"{value}"}}'
-            body = tools_gw.create_body(form=form_search, extras=extras_search)
+                extras_search[chk_list.property("columnname")] = f"{chk_list.isChecked()}"
+            extras_search_add[line_edit.property("columnname")] = {"text": f"{value}"}
+            body = tools_gw.build_body(form=form_search, extras=extras_search)
             result = tools_gw.execute_procedure('gw_fct_setsearch', body, rubber_band=self.rubber_band)
             if not result or result['status'] == 'Failed':
                 return False
@@ -459,8 +439,8 @@ class GwSearch:
             if str(value) == 'null':
                 return
 
-            extras_search_add += f', "{line_edit_add.property("columnname")}":{{"text":"{value}"}}'
-            body = tools_gw.create_body(form=form_search_add, extras=extras_search_add)
+            extras_search_add[line_edit_add.property("columnname")] = {"text": f"{value}"}
+            body = tools_gw.build_body(form=form_search_add, extras=extras_search_add)
             result = tools_gw.execute_procedure('gw_fct_setsearchadd', body, rubber_band=self.rubber_band)
             if not result or result['status'] == 'Failed':
                 return False
@@ -528,9 +508,9 @@ class GwSearch:
         # get sys variale
         qgis_project_infotype = global_vars.project_vars['info_type']
 
-        feature = f'"tableName":"{table_name}", "id":"{feature_id}"'
-        extras = f'"infoType":"{qgis_project_infotype}"'
-        body = tools_gw.create_body(feature=feature, extras=extras)
+        feature = {"tableName": f"{table_name}", "id": f"{feature_id}"}
+        extras = {"infoType": f"{qgis_project_infotype}"}
+        body = tools_gw.build_body(feature=feature, extras=extras)
         json_result = tools_gw.execute_procedure('gw_fct_getinfofromid', body)
         if json_result is None or json_result['status'] == 'Failed':
             return
@@ -664,9 +644,9 @@ class GwSearch:
         """ Take the current selector_expl and selector_state to restore them at the end of the operation """
 
         current_tab = tools_gw.get_config_parser('dialogs_tab', 'selector_basic', "user", "session")
-        form = f'"currentTab":"{current_tab}"'
-        extras = f'"selectorType":"selector_basic", "filterText":""'
-        body = tools_gw.create_body(form=form, extras=extras)
+        form = {"currentTab": f"{current_tab}"}
+        extras = {"selectorType": "selector_basic", "filterText": ""}
+        body = tools_gw.build_body(form=form, extras=extras)
         json_result = tools_gw.execute_procedure('gw_fct_getselectors', body)
         return json_result
 
@@ -687,10 +667,9 @@ class GwSearch:
                 field_id = 'id'
             for field in form_tab['fields']:
                 _id = field[field_id]
-                extras = (f'"selectorType":"{selector_type}", "tabName":"{tab_name}", '
-                          f'"id":"{_id}", "isAlone":"False", "value":"{field["value"]}", '
-                          f'"addSchema":"{qgis_project_add_schema}"')
-                body = tools_gw.create_body(extras=extras)
+                extras = {"selectorType": selector_type, "tabName": tab_name, "id": f"{_id}", "isAlone": "False",
+                          "value": f"{field['value']}", "addSchema": f"{qgis_project_add_schema}"}
+                body = tools_gw.build_body(extras=extras)
                 tools_gw.execute_procedure('gw_fct_setselectors', body)
         tools_qgis.refresh_map_canvas()
 
@@ -780,11 +759,37 @@ class GwSearch:
         qtable.model().select()
 
 
-    def _write_to_csv(self, dialog, folder_path=None, all_rows=None):
+    def _get_model_sql(self, model):
+        """ Return the query of QSqlTableModel @model, using its header labels as column aliases.
+        Rows are sorted as in the model, so they are exported in the order shown in the table """
+
+        columns = []
+        record = model.record()
+        for i in range(0, model.columnCount()):
+            field_name = record.fieldName(i).replace('"', '""')
+            header = str(model.headerData(i, Qt.Horizontal)).replace('"', '""')
+            columns.append(f'"{field_name}" AS "{header}"')
+        sql = f"SELECT {', '.join(columns)} FROM {model.tableName()}"
+        if model.filter():
+            sql += f" WHERE {model.filter()}"
+        # Clause of the sort set with setSort or by clicking the header (i.e. 'ORDER BY "table"."column" ASC').
+        # It's a protected method, only available for models created in python
+        try:
+            order_by = model.orderByClause()
+        except (AttributeError, RuntimeError):
+            order_by = None
+        if order_by:
+            sql += f" {order_by}"
+        return sql
+
 
-        with open(folder_path, "w") as output:
-            writer = csv.writer(output, lineterminator='\n')
-            writer.writerows(all_rows)
+    def _write_to_csv(self, dialog, folder_path=None, queries=None):
+
+        # Stream rows of every query into the file, one block after the other
+        for i, sql in enumerate(queries):
+            rows = tools_db.export_to_csv(sql, folder_path, append=(i > 0))
+            if rows is None:
+                return
         tools_gw.set_config_parser('btn_search', 'search_csv_path', f"{tools_qt.get_text(dialog, 'txt_path')}")
         message = "The csv file has been successfully exported"
         tools_qgis.show_info(message, dialog=dialog)
@@ -110,12 +110,13 @@ class GwSelector:
         if '"' in selector_type:
             selector_type = selector_type.strip('"')
         # Built querytext
-        form = f'"currentTab":"{current_tab}"'
-        extras = f'"selectorType":"{selector_type}", "filterText":"{text_filter}"'
+        form = {"currentTab": f"{current_tab}"}
+        extras = {"selectorType": f"{selector_type}", "filterText": f"{text_filter}"}
         if aux_params:
             tools_gw.set_config_parser("selector_mincut", f"aux_params", f"{aux_params}", "user", "session")
-            extras = f"{extras}, {aux_params}"
-        body = tools_gw.create_body(form=form, extras=extras)
+            # @aux_params are json members, i.e. '"ids":[1, 2]'
+            extras.update(json.loads(f"{{{aux_params}}}"))
+        body = tools_gw.build_body(form=form, extras=extras)
         json_result = tools_gw.execute_procedure('gw_fct_getselectors', body)
 
 
@@ -280,17 +281,17 @@ class GwSelector:
 
         if widget_all is None or (widget_all is not None and widget.objectName() != widget_all.objectName()):
             self.checkall = False
-            extras = (f'"selectorType":"{selector_type}", "tabName":"{tab_name}", "id":"{widget.objectName()}", '
-                      f'"isAlone":"{is_alone}", "disableParent":"{disable_parent}", '
-                      f'"value":"{tools_qt.is_checked(dialog, widget)}", '
-                      f'"addSchema":"{qgis_project_add_schema}"')
+            extras = {"selectorType": f"{selector_type}", "tabName": f"{tab_name}", "id": f"{widget.objectName()}",
+                      "isAlone": f"{is_alone}", "disableParent": f"{disable_parent}",
+                      "value": f"{tools_qt.is_checked(dialog, widget)}",
+                      "addSchema": f"{qgis_project_add_schema}"}
         else:
             check_all = tools_qt.is_checked(dialog, widget_all)
             self.checkall = check_all
-            extras = (f'"selectorType":"{selector_type}", "tabName":"{tab_name}", "checkAll":"{check_all}", '
-                      f'"addSchema":"{qgis_project_add_schema}"')
+            extras = {"selectorType": f"{selector_type}", "tabName": f"{tab_name}", "checkAll": f"{check_all}",
+                      "addSchema": f"{qgis_project_add_schema}"}
 
-        body = tools_gw.create_body(extras=extras)
+        body = tools_gw.build_body(extras=extras)
         json_result = tools_gw.execute_procedure('gw_fct_setselectors', body)
         if json_result is None or json_result['status'] == 'Failed':
             return
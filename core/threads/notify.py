@@ -25,6 +25,7 @@ class GwNotify(QObject):
     conn_failed = False
     list_channels = None
     log_sql = None
+    cache_channel = None        # Channel whose notifications invalidate the query cache. Payload: table names
     task_start = pyqtSignal()
     task_finished = pyqtSignal()
 
@@ -118,6 +119,12 @@ class GwNotify(QObject):
                     continue
                 executed_notifies.append(notify)
 
+                # Notifications of the query cache channel only carry the names of the modified tables
+                if notify.channel == self.cache_channel:
+                    tables = [table.strip() for table in notify.payload.split(',') if table.strip()]
+                    tools_db.invalidate_query_cache(tables or None)
+                    continue
+
                 # Check parameter 'log_sql'
                 log_sql = tools_gw.get_config_parser("log", f"log_sql", "user", "init", False, get_none=True)
                 self.log_sql = tools_os.set_boolean(log_sql, False)
@@ -137,7 +137,7 @@ class GwProjectCheckTask(GwTask):
         log_folder_volume = 0
         if global_vars.user_folder_dir:
             log_folder = f"{global_vars.user_folder_dir}{os.sep}core{os.sep}log"
-            size = tools_os.get_folder_size(log_folder)
+            size = tools_log.get_log_folder_size(log_folder)
             log_folder_volume = f"{round(size / (1024*1024), 2)} MB"
 
         extras = f'"version":"{plugin_version}"'
@@ -5,11 +5,15 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import time
+
 from qgis.PyQt.QtCore import pyqtSignal
 
 from .task import GwTask
 from ..utils import tools_gw
-from ...lib import tools_log, tools_qgis, tools_qt, tools_db
+from ..utils.layers_config_cache import GwLayersConfigCache
+from ... import global_vars
+from ...lib import tools_log, tools_qgis, tools_db
 
 
 class GwProjectLayersConfig(GwTask):
@@ -31,6 +35,7 @@ class GwProjectLayersConfig(GwTask):
         self.json_result = None
         self.vr_errors = None
         self.vr_missing = None
+        self.stats = None
 
 
     def run(self):
@@ -39,6 +44,7 @@ class GwProjectLayersConfig(GwTask):
         self.setProgress(0)
         self.vr_errors = set()
         self.vr_missing = set()
+        self.stats = {'layers': 0, 'configured': 0, 'cached': 0, 'fetch_time': 0, 'apply_time': 0}
         self._get_layers_to_config()
         self._set_layer_config(self.available_layers)
         self.setProgress(100)
@@ -56,6 +62,12 @@ class GwProjectLayersConfig(GwTask):
         sql += f");"
         tools_gw.manage_json_response(self.json_result, sql, None)
 
+        if self.stats:
+            tools_log.log_info(f"Layers configured: {self.stats['configured']} of {self.stats['layers']} "
+                               f"({self.stats['cached']} from cache). "
+                               f"Fetch: {self.stats['fetch_time']:.0f} ms, apply: {self.stats['apply_time']:.0f} ms")
+            tools_log.log_trace('layers_config', **self.stats)
+
         # If user cancel task
         if self.isCanceled():
             return
@@ -112,53 +124,67 @@ class GwProjectLayersConfig(GwTask):
     def _set_layer_config(self, layers):
         """ Set layer fields configured according to client configuration.
             At the moment manage:
-                Column names as alias, combos as ValueMap, typeahead as textedit"""
+                Column names as alias, combos as ValueMap, typeahead as textedit
+            Configuration of all layers is fetched in a single round trip and then applied layer by layer """
 
-        # Check only once if function 'gw_fct_getinfofromid' exists
-        row = tools_db.check_function('gw_fct_getinfofromid')
-        if row in (None, ''):
-            tools_qgis.show_warning("Function not found in database", parameter='gw_fct_getinfofromid')
+        # Get layers of the project to be configured
+        project_layers = []
+        for layer_name in layers:
+            layer = tools_qgis.get_layer_by_tablename(layer_name)
+            if layer:
+                project_layers.append((layer_name, layer))
+        self.stats['layers'] = len(project_layers)
+        if not project_layers or self.isCanceled():
             return False
 
-        msg_failed = ""
-        msg_key = ""
-        total_layers = len(layers)
-        layer_number = 0
-        for layer_name in layers:
+        # Get configuration of all layers: from cache if still valid, otherwise from database
+        start_time = time.perf_counter()
+        table_names = [layer_name for layer_name, layer in project_layers]
+        cache_key = self._get_cache_key()
+        layers_config = {}
+        if cache_key:
+            layers_config = global_vars.layers_config_cache.get(*cache_key, table_names)
+            self.stats['cached'] = len(layers_config)
+        missing_names = [table_name for table_name in table_names if table_name not in layers_config]
+        if missing_names:
+            missing_config = tools_gw.get_layers_config(missing_names, aux_conn=self.aux_conn, is_thread=True)
+            if missing_config is None:
+                return False
+            layers_config.update(missing_config)
+            if cache_key and missing_config:
+                global_vars.layers_config_cache.put(*cache_key, missing_config)
+        self.stats['fetch_time'] = (time.perf_counter() - start_time) * 1000
+
+        # Apply configuration of each layer
+        start_time = time.perf_counter()
+        total_layers = len(project_layers)
+        for layer_number, (layer_name, layer) in enumerate(project_layers, 1):
 
             if self.isCanceled():
                 return False
 
-            layer = tools_qgis.get_layer_by_tablename(layer_name)
-            if not layer:
+            self.setProgress((layer_number * 100) / total_layers)
+            json_result = layers_config.get(layer_name)
+            if json_result is None:
                 continue
 
-            layer_number = layer_number + 1
-            self.setProgress((layer_number * 100) / total_layers)
+            self.body = tools_gw.create_body(feature=f'"tableName":"{layer_name}", "isLayer":true')
+            self.json_result = json_result
+            tools_gw.config_layer_attributes(json_result, layer, layer_name, thread=self)
+            self.stats['configured'] += 1
+            self.stats['apply_time'] = (time.perf_counter() - start_time) * 1000
 
-            feature = f'"tableName":"{layer_name}", "isLayer":true'
-            self.body = tools_gw.create_body(feature=feature)
-            self.json_result = tools_gw.execute_procedure('gw_fct_getinfofromid', self.body, aux_conn=self.aux_conn,
-                                                          is_thread=True, check_function=False)
-            if not self.json_result:
-                continue
-            if 'status' not in self.json_result:
-                continue
-            if self.json_result['status'] == 'Failed':
-                continue
-            if 'body' not in self.json_result:
-                tools_log.log_info("Not 'body'")
-                continue
-            if 'data' not in self.json_result['body']:
-                tools_log.log_info("Not 'data'")
-                continue
+        return True
 
-            tools_gw.config_layer_attributes(self.json_result, layer, layer_name, thread=self)
 
-        if msg_failed != "":
-            tools_qt.show_exception_message("Execute failed.", msg_failed)
+    def _get_cache_key(self):
+        """ Return tuple (database, schema_name, key) of the cache of layers config, or None if it is disabled """
 
-        if msg_key != "":
-            tools_qt.show_exception_message("Key on returned json from ddbb is missed.", msg_key)
+        if global_vars.layers_config_cache is None:
+            return None
+        row = tools_db.get_row(GwLayersConfigCache.get_key_sql(), log_info=False, aux_conn=self.aux_conn)
+        if not row or row[1] in (None, ''):
+            return None
+        return row[0], self.schema_name.replace('"', ''), row[1]
 
     # endregion
@@ -5,6 +5,8 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import time
+
 from qgis.PyQt.QtCore import pyqtSignal, QObject
 from qgis.core import QgsTask
 from qgis.utils import iface
@@ -25,13 +27,21 @@ class GwTask(QgsTask, QObject):
         self.exception = None
         self.duration = duration
         self.aux_conn = None
+        self.start_time = None
 
 
     def run(self):
 
         global_vars.session_vars['threads'].append(self)
         self.aux_conn = global_vars.dao.get_aux_conn()
+        if isinstance(self.aux_conn, dict):
+            # No free connection in the pool (PoolError) or connection error: task is run with the main connection
+            tools_log.log_warning(f"Task '{self.description()}' without auxiliary connection: "
+                                  f"{self.aux_conn['last_error']}")
+            self.aux_conn = None
+        self.start_time = time.perf_counter()
         tools_log.log_info(f"Started task {self.description()}")
+        tools_log.log_trace('task_run', name=self.description())
         iface.actionOpenProject().setEnabled(False)
         iface.actionNewProject().setEnabled(False)
         return True
@@ -43,7 +53,10 @@ class GwTask(QgsTask, QObject):
             global_vars.session_vars['threads'].remove(self)
         except ValueError:
             pass
-        global_vars.dao.delete_aux_con(self.aux_conn)
+        # Give back auxiliary connection to the pool
+        if self.aux_conn is not None:
+            global_vars.dao.delete_aux_con(self.aux_conn)
+            self.aux_conn = None
         iface.actionOpenProject().setEnabled(True)
         iface.actionNewProject().setEnabled(True)
         if result:
@@ -54,10 +67,18 @@ class GwTask(QgsTask, QObject):
             else:
                 tools_log.log_info(f"Task '{self.description()}' Exception: {self.exception}")
 
+        if tools_log.is_trace_enabled():
+            duration = round((time.perf_counter() - self.start_time) * 1000, 1) if self.start_time else None
+            outcome = 'ok' if result else ('cancelled' if self.isCanceled() else 'failed')
+            tools_log.log_trace('task_finished', name=self.description(), duration=duration, outcome=outcome,
+                                error=str(self.exception) if self.exception is not None else None)
+
 
     def cancel(self):
 
-        pid = self.aux_conn.get_backend_pid()
+        pid = None
+        if self.aux_conn is not None and not isinstance(self.aux_conn, dict):
+            pid = self.aux_conn.get_backend_pid()
         if isinstance(pid, int):
             result = tools_db.cancel_pid(pid)
             if result['last_error'] is not None:
@@ -6,12 +6,13 @@ or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
 import os
+from functools import partial
 
 from qgis.PyQt.QtWidgets import QAction
 from qgis.PyQt.QtGui import QIcon
 
 from ... import global_vars
-from ...lib import tools_qgis
+from ...lib import tools_qgis, tools_log
 
 
 class GwAction:
@@ -38,6 +39,7 @@ class GwAction:
         self.action.setObjectName(action_name)
         self.action.setProperty('action_group', action_group)
         self.action.setCheckable(False)
+        self.action.triggered.connect(partial(tools_log.set_trace_action, action_name))
         self.action.triggered.connect(self.clicked_event)
 
         if toolbar is None:
@@ -6,6 +6,7 @@ or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
 import os
+from functools import partial
 
 from qgis.core import QgsWkbTypes
 from qgis.gui import QgsMapTool
@@ -16,7 +17,7 @@ from qgis.PyQt.QtWidgets import QAction
 from ..utils import tools_gw
 from ..utils.snap_manager import GwSnapManager
 from ... import global_vars
-from ...lib import tools_os
+from ...lib import tools_os, tools_log
 
 
 class GwMaptool(QgsMapTool):
@@ -77,6 +78,7 @@ class GwMaptool(QgsMapTool):
 
         self.action.setObjectName(action_name)
         self.action.setCheckable(True)
+        self.action.triggered.connect(partial(tools_log.set_trace_action, action_name))
         self.action.triggered.connect(self.clicked_event)
         toolbar.addAction(self.action)
         self.setAction(self.action)
@@ -843,18 +843,9 @@ class GwToolBoxButton(GwAction):
         else:
             return
 
-        # Convert qtable values into list
-        all_rows = []
-        headers = []
-        for i in range(0, model.columnCount()):
-            headers.append(str(model.headerData(i, Qt.Horizontal)))
-        all_rows.append(headers)
-        for rows in range(0, model.rowCount()):
-            row = []
-            for col in range(0, model.columnCount()):
-                value = str(model.data(model.index(rows, col)))
-                row.append(value)
-            all_rows.append(row)
+        # Report rows come from gw_fct_getreport (json) so there is no query to export with COPY.
+        # Generate qtable values lazily, so they are written to the file without building a list
+        all_rows = self._get_model_rows(model)
 
         # Write list into csv file
         try:
@@ -870,6 +861,14 @@ class GwToolBoxButton(GwAction):
             tools_qgis.show_warning(msg)
 
 
+    def _get_model_rows(self, model):
+        """ Yield headers and then every row of @model as lists of strings """
+
+        yield [str(model.headerData(i, Qt.Horizontal)) for i in range(0, model.columnCount())]
+        for row in range(0, model.rowCount()):
+            yield [str(model.data(model.index(row, col))) for col in range(0, model.columnCount())]
+
+
     def _write_to_csv(self, folder_path=None, all_rows=None):
 
         with open(folder_path, "w") as output:
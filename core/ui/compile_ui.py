@@ -0,0 +1,74 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Optional build step: compile every .ui file of this folder into a python module of folder 'compiled'.
+# Forms of ui_manager.py are imported from these modules instead of parsing the .ui files at runtime.
+# Modules older than their .ui file are ignored, so forms edited later are still loaded from the .ui file.
+# Requires the python interpreter of QGIS (i.e. OSGeo4W shell or 'python3' with qgis in PYTHONPATH):
+#     python compile_ui.py [--clean]
+import argparse
+import io
+import os
+import shutil
+import sys
+
+from qgis.PyQt import uic
+
+
+UI_FOLDER = os.path.dirname(os.path.abspath(__file__))
+COMPILED_FOLDER = os.path.join(UI_FOLDER, 'compiled')
+
+
+def get_module_name(ui_file_path):
+    """ Return name of the module of @ui_file_path, as expected by ui_manager._get_compiled_module_name """
+
+    relative_path = os.path.relpath(ui_file_path, UI_FOLDER)
+    return os.path.splitext(relative_path)[0].replace(os.sep, '__')
+
+
+def compile_ui_file(ui_file_path):
+    """ Write module of @ui_file_path. Its form class is exported as FORM_CLASS """
+
+    code = io.StringIO()
+    uic.compileUi(ui_file_path, code)
+    text = code.getvalue()
+    # Use the Qt bindings of QGIS, whatever the version of PyQt that has generated the code
+    for module in ('PyQt5', 'PyQt6'):
+        text = text.replace(f"from {module} import", "from qgis.PyQt import")
+    class_name = next(line.split()[1].split('(')[0] for line in text.splitlines() if line.startswith('class Ui_'))
+    text += f"\n\nFORM_CLASS = {class_name}\n"
+    with open(os.path.join(COMPILED_FOLDER, f"{get_module_name(ui_file_path)}.py"), 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Compile .ui files of Giswater forms into python modules")
+    parser.add_argument('--clean', action='store_true', help="Remove compiled modules and exit")
+    args = parser.parse_args()
+
+    if os.path.exists(COMPILED_FOLDER):
+        shutil.rmtree(COMPILED_FOLDER)
+    if args.clean:
+        sys.exit(0)
+
+    os.makedirs(COMPILED_FOLDER)
+    open(os.path.join(COMPILED_FOLDER, '__init__.py'), 'w').close()
+    errors = 0
+    ui_files = []
+    for folder, subfolders, files in os.walk(UI_FOLDER):
+        if folder.startswith(COMPILED_FOLDER):
+            continue
+        ui_files.extend(os.path.join(folder, file) for file in sorted(files) if file.endswith('.ui'))
+    for ui_file_path in ui_files:
+        try:
+            compile_ui_file(ui_file_path)
+        except Exception as e:
+            errors += 1
+            print(f"Error compiling {ui_file_path}: {e}")
+    print(f"{len(ui_files) - errors} of {len(ui_files)} .ui files compiled into {COMPILED_FOLDER}")
+    sys.exit(1 if errors else 0)
@@ -5,6 +5,7 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import importlib
 import os
 
 from qgis.PyQt import uic, QtCore
@@ -15,10 +16,13 @@ from .dialog import GwDialog
 from .docker import GwDocker
 from .main_window import GwMainWindow
 
+_form_classes = {}      # Key: path of .ui file. Value: its form class, created the first time a dialog is built
+
 # region private functions
 
 def _get_ui_class(ui_file_name, subfolder='shared'):
-    """ Get UI Python class from @ui_file_name """
+    """ Get UI Python class from @ui_file_name.
+    The .ui file is not read here: it is loaded the first time a dialog of the class is built (see _GwLazyForm) """
 
     # Folder that contains UI files
     if subfolder in ('basic', 'edit', 'epa', 'om', 'plan', 'utilities', 'toc'):
@@ -27,7 +31,55 @@ def _get_ui_class(ui_file_name, subfolder='shared'):
         ui_folder_path = os.path.dirname(__file__) + os.sep + subfolder
 
     ui_file_path = os.path.abspath(os.path.join(ui_folder_path, ui_file_name))
-    return uic.loadUiType(ui_file_path)[0]
+    return type(f"Ui_{os.path.splitext(ui_file_name)[0]}", (_GwLazyForm,), {'ui_file_path': ui_file_path})
+
+
+class _GwLazyForm(object):
+    """ Form class that gets the form class of its .ui file on first use and delegates to it """
+
+    ui_file_path = None
+
+    def setupUi(self, widget):
+        _get_form_class(self.ui_file_path).setupUi(self, widget)
+
+
+    def retranslateUi(self, widget):
+        _get_form_class(self.ui_file_path).retranslateUi(self, widget)
+
+
+def _get_form_class(ui_file_path):
+    """ Return form class of @ui_file_path. It is imported from its precompiled module if it is up to date
+    (see compile_ui.py), otherwise it is created parsing the .ui file. Only once for each file """
+
+    form_class = _form_classes.get(ui_file_path)
+    if form_class is None:
+        form_class = _import_compiled_form_class(ui_file_path)
+        if form_class is None:
+            form_class = uic.loadUiType(ui_file_path)[0]
+        _form_classes[ui_file_path] = form_class
+    return form_class
+
+
+def _import_compiled_form_class(ui_file_path):
+    """ Return form class of module of folder 'compiled' built from @ui_file_path, or None if it doesn't exist or
+    it is older than the .ui file """
+
+    module_name = _get_compiled_module_name(ui_file_path)
+    module_path = os.path.join(os.path.dirname(__file__), 'compiled', f"{module_name}.py")
+    try:
+        if os.path.getmtime(module_path) < os.path.getmtime(ui_file_path):
+            return None
+        module = importlib.import_module(f"{__package__}.compiled.{module_name}")
+    except (OSError, ImportError):
+        return None
+    return getattr(module, 'FORM_CLASS', None)
+
+
+def _get_compiled_module_name(ui_file_path):
+    """ Return name of the precompiled module of @ui_file_path (i.e. 'toolbars__basic__search') """
+
+    relative_path = os.path.relpath(ui_file_path, os.path.dirname(os.path.abspath(__file__)))
+    return os.path.splitext(relative_path)[0].replace(os.sep, '__')
 
 
 # endregion
@@ -0,0 +1,189 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+import collections
+import itertools
+
+import psycopg2
+import psycopg2.extensions
+from qgis.PyQt.QtCore import QObject, QSocketNotifier
+
+from ...lib import tools_log, tools_pgdao
+
+
+class GwAsyncManager(QObject):
+
+    def __init__(self, conn_string, set_search_path=None, stats=None):
+        """
+        Execute queries without blocking the Qt main thread. Queries are sent through a psycopg2 connection in
+        asynchronous mode and the answer is read when QSocketNotifier reports that its socket is ready.
+        Requests are executed one by one in order of arrival. A new request with the same 'key' as a queued or
+        running one supersedes it: the old one is cancelled and its response is dropped.
+        It must be used from the Qt main thread. An instance is stored in global_vars.async_manager
+        """
+
+        QObject.__init__(self)
+        self.conn_string = conn_string
+        self.set_search_path = set_search_path
+        self.aconn = tools_pgdao.GwPgAsyncConn(conn_string, set_search_path, stats)
+        self.queue = collections.deque()
+        self.current = None
+        self.notifiers = []
+        self._ids = itertools.count(1)
+
+
+    def execute(self, sql, callback, key=None):
+        """
+        Queue @sql and call @callback(row, error) when finished. @row is the first row of the result
+        :param key: Requests with the same key supersede each other (str)
+        :return: Id of the request, used to cancel it (int)
+        """
+
+        if key is not None:
+            self.cancel(key=key)
+        request = {'id': next(self._ids), 'sql': sql, 'callback': callback, 'key': key, 'cancelled': False}
+        self.queue.append(request)
+        self._execute_next()
+        return request['id']
+
+
+    def cancel(self, request_id=None, key=None):
+        """ Cancel request @request_id, or every request with @key, or all of them if both are None.
+        Callbacks of cancelled requests are never called """
+
+        def match(request):
+            if request_id is None and key is None:
+                return True
+            return request['id'] == request_id or (key is not None and request['key'] == key)
+
+        self.queue = collections.deque(request for request in self.queue if not match(request))
+        if self.current is not None and match(self.current) and not self.current['cancelled']:
+            self.current['cancelled'] = True
+            self.aconn.cancel()
+
+
+    def is_busy(self):
+        return self.current is not None or len(self.queue) > 0
+
+
+    def close(self):
+        """ Cancel every request and close the connection """
+
+        self.cancel()
+        self._set_notifiers(None)
+        self.aconn.close()
+        self.current = None
+
+
+    # region private functions
+
+    def _execute_next(self):
+
+        if self.current is not None or self.aconn.state == 'connect' or self.aconn.state == 'search_path':
+            return
+        if not self.queue:
+            return
+
+        try:
+            if self.aconn.is_closed():
+                self.aconn.connect()
+                self._create_notifiers()
+                self._poll()
+                return
+            self.current = self.queue.popleft()
+            self.aconn.execute(self.current['sql'])
+        except Exception as e:
+            self._manage_error(e)
+            return
+        self._poll()
+
+
+    def _poll(self, *args):
+
+        self._set_notifiers(None)
+        try:
+            result = self.aconn.poll()
+        except Exception as e:
+            self._manage_error(e)
+            return
+
+        if result == psycopg2.extensions.POLL_READ:
+            self._set_notifiers(QSocketNotifier.Read)
+            return
+        if result == psycopg2.extensions.POLL_WRITE:
+            self._set_notifiers(QSocketNotifier.Write)
+            return
+
+        # Connection established: execute first queued request
+        if self.current is None:
+            self._execute_next()
+            return
+
+        try:
+            row = self.aconn.fetchone()
+        except Exception as e:
+            self._manage_error(e)
+            return
+        self._finish(row, None)
+
+
+    def _finish(self, row, error):
+
+        request = self.current
+        self.current = None
+        if request is not None and not request['cancelled'] and request['callback']:
+            try:
+                request['callback'](row, error)
+            except Exception as e:
+                tools_log.log_warning(f"Exception in callback of async query: {e}")
+        self._execute_next()
+
+
+    def _manage_error(self, error):
+
+        if self.current is None:
+            # Connection failed: fail every queued request, otherwise they would try to connect again one by one
+            tools_log.log_warning(f"Async connection error: {error}")
+            self.aconn.close()
+            requests = list(self.queue)
+            self.queue.clear()
+            for request in requests:
+                if request['callback']:
+                    try:
+                        request['callback'](None, error)
+                    except Exception as e:
+                        tools_log.log_warning(f"Exception in callback of async query: {e}")
+            return
+
+        self.aconn.state = None
+        if self.aconn.conn is not None and self.aconn.conn.closed:
+            self.aconn.close()
+        if not (self.current['cancelled'] and isinstance(error, psycopg2.extensions.QueryCanceledError)):
+            tools_log.log_warning(f"Async query error: {error}")
+        self._finish(None, error)
+
+
+    def _create_notifiers(self):
+
+        for notifier in self.notifiers:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        fileno = self.aconn.fileno()
+        self.notifiers = [QSocketNotifier(fileno, QSocketNotifier.Read, self),
+                          QSocketNotifier(fileno, QSocketNotifier.Write, self)]
+        for notifier in self.notifiers:
+            notifier.setEnabled(False)
+            notifier.activated.connect(self._poll)
+
+
+    def _set_notifiers(self, notifier_type):
+        """ Enable only the notifier of type @notifier_type (or none of them if None) """
+
+        for notifier in self.notifiers:
+            notifier.setEnabled(notifier.type() == notifier_type)
+
+    # endregion
@@ -0,0 +1,125 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from ...lib import tools_log
+
+
+class GwLayersConfigCache(object):
+
+    def __init__(self, path, max_age=24):
+        """
+        Keep responses of gw_fct_getinfofromid used to configure project layers (see GwProjectLayersConfig) in a
+        SQLite file, so they are applied again in the next sessions without calling the database function.
+        Responses are stored by database and schema with a key (see get_key_sql): responses with another key are
+        not used and they are removed when new responses are stored.
+        Values of combos come from other tables, so responses older than @max_age hours (0 to disable) are not used.
+        A connection to the file is opened in each call, so it can be used from any thread
+        """
+
+        self.path = path
+        self.max_age = max_age
+
+
+    @staticmethod
+    def get_key_sql():
+        """ Return query of the cache key: database, and key made of the version of the schema, the current user and
+        a checksum of table config_form_fields. It is a single cheap query, executed before using the cache """
+
+        return ("SELECT current_database(), concat_ws('|', "
+                "(SELECT giswater FROM sys_version ORDER BY id DESC LIMIT 1), current_user, "
+                "(SELECT md5(string_agg(c::text, ',' ORDER BY c::text)) FROM config_form_fields c))")
+
+
+    def get(self, database, schema_name, key, table_names):
+        """ Return stored responses of @table_names with @key, keyed by table name (dict of json) """
+
+        layers_config = {}
+        min_created = time.time() - self.max_age * 3600 if self.max_age else 0
+        try:
+            with self._open() as conn:
+                rows = conn.execute("SELECT table_name, response FROM layers_config "
+                                    "WHERE database = ? AND schema_name = ? AND key = ? AND created >= ?",
+                                    (database, schema_name, key, min_created)).fetchall()
+        except sqlite3.Error as e:
+            tools_log.log_warning(f"Error reading layers config cache {self.path}: {e}")
+            return layers_config
+
+        table_names = set(table_names)
+        for table_name, response in rows:
+            if table_name not in table_names:
+                continue
+            try:
+                layers_config[table_name] = json.loads(zlib.decompress(response).decode('utf-8'))
+            except (zlib.error, ValueError):
+                continue
+        return layers_config
+
+
+    def put(self, database, schema_name, key, layers_config):
+        """ Store responses @layers_config (dict of json keyed by table name) with @key, removing the ones stored with
+        another key for the same database and schema """
+
+        created = time.time()
+        values = [(database, schema_name, table_name, key, created,
+                   zlib.compress(json.dumps(json_result).encode('utf-8')))
+                  for table_name, json_result in layers_config.items()]
+        try:
+            with self._open() as conn:
+                conn.execute("DELETE FROM layers_config WHERE database = ? AND schema_name = ? AND key <> ?",
+                             (database, schema_name, key))
+                conn.executemany("INSERT OR REPLACE INTO layers_config VALUES (?, ?, ?, ?, ?, ?)", values)
+        except sqlite3.Error as e:
+            tools_log.log_warning(f"Error writing layers config cache {self.path}: {e}")
+            return False
+        return True
+
+
+    def clear(self, database=None, schema_name=None):
+        """ Remove stored responses of @database and @schema_name. Every response if both are None """
+
+        if not os.path.exists(self.path):
+            return
+        conditions = {'database': database, 'schema_name': schema_name}
+        conditions = {column: value for column, value in conditions.items() if value is not None}
+        sql = "DELETE FROM layers_config"
+        if conditions:
+            sql += " WHERE " + " AND ".join(f"{column} = ?" for column in conditions)
+        try:
+            with self._open() as conn:
+                conn.execute(sql, tuple(conditions.values()))
+        except sqlite3.Error as e:
+            tools_log.log_warning(f"Error clearing layers config cache {self.path}: {e}")
+
+
+    # region private functions
+
+    @contextlib.contextmanager
+    def _open(self):
+        """ Open a connection to the SQLite file, creating it if not exists. Changes are committed and the connection
+        is closed when leaving the context """
+
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS layers_config (database TEXT, schema_name TEXT, "
+                             "table_name TEXT, key TEXT, created REAL, response BLOB, "
+                             "PRIMARY KEY (database, schema_name, table_name))")
+                yield conn
+        finally:
+            conn.close()
+
+    # endregion
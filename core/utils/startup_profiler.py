@@ -0,0 +1,216 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from ...lib import tools_db, tools_log
+
+
+class GwStartupProfiler(object):
+
+    def __init__(self, enabled=True, trace_allocations=False, history_size=50):
+        """
+        Record wall time, database round trips and python allocations of each phase of the load of a project
+        (see GwLoadProject.project_read). Each call to phase() ends the current phase and starts a new one.
+        Round trips are read from the statistics of executed queries (tools_db.get_query_totals), so queries of
+        tasks running at the same time are also counted, and they are not available if those statistics are disabled.
+        Allocations are traced with tracemalloc while profiling if @trace_allocations, which slows down the load.
+        When disabled, every method does nothing
+        """
+
+        self.enabled = enabled
+        self.trace_allocations = trace_allocations
+        self.history_size = history_size
+        self.phases = []
+        self.current = None
+        self.start_time = None
+        self.query_stats = True
+        self._started_tracemalloc = False
+
+
+    def start(self):
+        """ Start profiling. Time until the first phase is not assigned to any phase """
+
+        if not self.enabled:
+            return
+        self.phases = []
+        self.current = None
+        self.start_time = time.perf_counter()
+        self.query_stats = tools_db.is_query_stats_enabled()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+
+    def phase(self, name):
+        """ End current phase and start phase @name """
+
+        if not self.enabled or self.start_time is None:
+            return
+        self._end_phase()
+        self.current = {'name': name, 'start': time.perf_counter(), 'totals': tools_db.get_query_totals(),
+                        'memory': self._get_traced_memory()}
+        if self._started_tracemalloc and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+
+    def stop(self, status='ok'):
+        """ End profiling. Return report of the phases (dict) or None if disabled
+            :param status: Result of the load of the project, written into the report (i.e. 'ok', 'invalid') (String)
+        """
+
+        if not self.enabled or self.start_time is None:
+            return None
+        self._end_phase()
+        allocations = self._started_tracemalloc
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        report = {'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'status': status, 'allocations': allocations,
+                  'query_stats': self.query_stats,
+                  'time': (time.perf_counter() - self.start_time) * 1000,
+                  'round_trips': sum(phase['round_trips'] for phase in self.phases),
+                  'db_time': sum(phase['db_time'] for phase in self.phases),
+                  'phases': self.phases}
+        self.start_time = None
+        return report
+
+
+    def write_report(self, report, folder, **info):
+        """ Write @report into a new file of @folder and add it to the history of previous reports.
+        Log a warning if load time is much bigger than the usual one
+            :param info: Values identifying the project (i.e. schema name, plugin version), written into the report
+        """
+
+        if report is None:
+            return
+        report.update(info)
+        try:
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+            filepath = os.path.join(folder, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.log")
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(self._format_report(report))
+            tools_log.get_log_folder(folder).add_size(os.path.getsize(filepath))
+
+            history = self._update_history(os.path.join(folder, 'startup_history.json'), report)
+        except (OSError, ValueError) as e:
+            tools_log.log_warning(f"Error writing startup report: {e}")
+            return
+
+        self._check_regression(report, history)
+
+
+    # region private functions
+
+    def _end_phase(self):
+
+        if self.current is None:
+            return
+        totals = tools_db.get_query_totals()
+        memory, peak = self._get_traced_memory(), None
+        if self._started_tracemalloc:
+            peak = tracemalloc.get_traced_memory()[1]
+        start_totals = self.current['totals']
+        self.phases.append({
+            'name': self.current['name'],
+            'time': (time.perf_counter() - self.current['start']) * 1000,
+            'round_trips': max(totals['count'] - start_totals['count'], 0),
+            'db_time': max(totals['total'] - start_totals['total'], 0),
+            'memory_kb': (memory - self.current['memory']) / 1024 if memory is not None else None,
+            'peak_kb': peak / 1024 if peak is not None else None})
+        self.current = None
+
+
+    def _get_traced_memory(self):
+
+        if not self._started_tracemalloc:
+            return None
+        return tracemalloc.get_traced_memory()[0]
+
+
+    def _format_report(self, report):
+
+        lines = [f"Startup report {report['date']}"]
+        for key, value in report.items():
+            if key not in ('date', 'phases', 'time', 'round_trips', 'db_time', 'query_stats'):
+                lines.append(f"{key}: {value}")
+        if report['query_stats']:
+            lines.append(f"Total: {report['time']:.0f} ms, {report['round_trips']} round trips, "
+                         f"{report['db_time']:.0f} ms in database")
+        else:
+            lines.append(f"Total: {report['time']:.0f} ms")
+            lines.append("Round trips and database time not available: user parameter 'log_query_stats' is False")
+        lines.append("")
+        lines.append(f"{'phase':<30} {'time (ms)':>10} {'%':>6} {'round trips':>12} {'db (ms)':>10} "
+                     f"{'memory (KB)':>12} {'peak (KB)':>10}")
+        for phase in report['phases']:
+            percent = phase['time'] * 100 / report['time'] if report['time'] else 0
+            memory = f"{phase['memory_kb']:.0f}" if phase['memory_kb'] is not None else "-"
+            peak = f"{phase['peak_kb']:.0f}" if phase['peak_kb'] is not None else "-"
+            round_trips = f"{phase['round_trips']}" if report['query_stats'] else "-"
+            db_time = f"{phase['db_time']:.0f}" if report['query_stats'] else "-"
+            lines.append(f"{phase['name']:<30} {phase['time']:>10.0f} {percent:>6.1f} {round_trips:>12} "
+                         f"{db_time:>10} {memory:>12} {peak:>10}")
+        return "\n".join(lines) + "\n"
+
+
+    def _update_history(self, filepath, report):
+        """ Add summary of @report to history file @filepath, keeping the last 'history_size' ones.
+        Return previous history (list) """
+
+        history = []
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, encoding='utf-8') as f:
+                    history = json.load(f)
+            except ValueError:
+                history = []
+        previous = list(history)
+
+        summary = {key: value for key, value in report.items() if key != 'phases'}
+        summary['phases'] = {phase['name']: round(phase['time']) for phase in report['phases']}
+        history.append(summary)
+        history = history[-self.history_size:]
+        old_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(history, f)
+        tools_log.get_log_folder(os.path.dirname(filepath)).add_size(os.path.getsize(filepath) - old_size)
+        return previous
+
+
+    def _check_regression(self, report, history, factor=1.5, samples=10, min_samples=3):
+        """ Log a warning if load time of @report is @factor times the median of the last @samples ones of the same
+        project, naming the phases that have grown the most. Loads tracing allocations are only compared between them,
+        as tracing slows them down """
+
+        if report['status'] != 'ok':
+            return
+        same_project = [item for item in history if item.get('status') == 'ok'
+                        and all(item.get(key) == value for key, value in report.items()
+                                if key in ('schema_name', 'project_type', 'allocations'))][-samples:]
+        if len(same_project) < min_samples:
+            return
+        median = statistics.median(item['time'] for item in same_project)
+        if report['time'] <= median * factor:
+            return
+
+        growths = []
+        for phase in report['phases']:
+            usual = statistics.median(item['phases'].get(phase['name'], 0) for item in same_project)
+            growths.append((phase['time'] - usual, phase['name']))
+        growths.sort(reverse=True)
+        phases = ", ".join(f"{name} (+{growth:.0f} ms)" for growth, name in growths[:3] if growth >= 1)
+        tools_log.log_warning(f"Project load took {report['time']:.0f} ms, usually {median:.0f} ms. "
+                              f"Slower phases: {phases}")
+
+    # endregion
@@ -263,7 +263,18 @@ def update_catfeaturevalues(**kwargs):
                               "user":"'||current_user||'","schema":"'||v_schemaname||'"}');
                 IN TRIGGER -> gw_trg_cat_feature
     """
-    global_vars.feature_cat = tools_gw.manage_feature_cat()
+    global_vars.feature_cat = tools_gw.manage_feature_cat(force_reload=True)
+
+
+def invalidate_query_cache(**kwargs):
+    """
+    Remove results of the query cache that depend on the modified tables
+
+    Called from PostgreSQL -> PERFORM pg_notify(v_channel, '{"functionAction":{"functions":[
+                              {"name":"invalidate_query_cache", "parameters":{"tables":["cat_feature"]}}]}}');
+                              Without parameter 'tables' the whole cache is removed
+    """
+    tools_db.invalidate_query_cache(kwargs.get('tables'))
 
 
 def open_url(widget):
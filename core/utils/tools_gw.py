@@ -13,6 +13,7 @@ import random
 import re
 import sys
 import sqlite3
+import time
 import webbrowser
 
 if 'nt' in sys.builtin_module_names:
@@ -28,11 +29,12 @@ from qgis.PyQt.QtWidgets import QSpacerItem, QSizePolicy, QLineEdit, QLabel, QCo
     QCompleter, QPushButton, QTableView, QFrame, QCheckBox, QDoubleSpinBox, QSpinBox, QDateEdit, QTextEdit, \
     QToolButton, QWidget, QApplication, QDockWidget, QMenu
 from qgis.core import Qgis, QgsProject, QgsPointXY, QgsVectorLayer, QgsField, QgsFeature, QgsSymbol, \
-    QgsFeatureRequest, QgsSimpleFillSymbolLayer, QgsRendererCategory, QgsCategorizedSymbolRenderer,  QgsPointLocator, \
+    QgsSimpleFillSymbolLayer, QgsRendererCategory, QgsCategorizedSymbolRenderer,  QgsPointLocator, \
     QgsSnappingConfig, QgsCoordinateTransform, QgsCoordinateReferenceSystem, QgsApplication, QgsVectorFileWriter, \
     QgsCoordinateTransformContext, QgsFieldConstraints, QgsEditorWidgetSetup, QgsRasterLayer, QgsDataSourceUri, QgsProviderRegistry
 from qgis.gui import QgsDateTimeEdit, QgsRubberBand
 
+from ..models.body import GwBody
 from ..models.cat_feature import GwCatFeature
 from ..ui.dialog import GwDialog
 from ..ui.main_window import GwMainWindow
@@ -40,10 +42,12 @@ from ..ui.docker import GwDocker
 from ..ui.ui_manager import GwSelectorUi
 from . import tools_backend_calls
 from ..load_project_menu import GwMenuLoad
+from ..utils.async_manager import GwAsyncManager
 from ..utils.select_manager import GwSelectManager
 from ..utils.snap_manager import GwSnapManager
 from ... import global_vars
-from ...lib import tools_qgis, tools_qt, tools_log, tools_os, tools_db
+from ...lib import tools_qgis, tools_qt, tools_log, tools_os, tools_db, tools_pgdao
+from ...lib.tools_config import GwConfigStore
 from ...lib.tools_qt import GwHyperLinkLabel, GwHyperLinkLineEdit
 
 
@@ -98,8 +102,11 @@ def save_settings(dialog, plugin='core'):
 def initialize_parsers():
     """ Initialize parsers of configuration files: init, session, giswater, user_params """
 
+    store = _get_config_store()
     for config in global_vars.list_configs:
         filepath, parser = _get_parser_from_filename(config)
+        if parser is not None:
+            parser = store.get_parser(filepath)
         global_vars.configs[config][0] = filepath
         global_vars.configs[config][1] = parser
 
@@ -112,13 +119,11 @@ def get_config_parser(section: str, parameter: str, config_type, file_name, pref
         tools_log.log_warning(f"get_config_parser: Reference config_type = '{config_type}' it is not managed")
         return None
 
-    # Get configuration filepath and parser object
+    # Get configuration filepath
     path = global_vars.configs[file_name][0]
-    parser = global_vars.configs[file_name][1]
 
     if plugin != 'core':
         path = f"{global_vars.user_folder_dir}{os.sep}{plugin}{os.sep}config{os.sep}{file_name}.config"
-        parser = None
         chk_user_params = False
 
     # Needed to avoid errors with giswater plugins
@@ -126,28 +131,22 @@ def get_config_parser(section: str, parameter: str, config_type, file_name, pref
         tools_log.log_warning(f"get_config_parser: Config file is not set")
         return None
 
+    # Values are served from memory. Files edited outside the plugin are reloaded when their modification time changes
+    store = _get_config_store()
+    if force_reload:
+        store.reload(path)
+
     value = None
     raw_parameter = parameter
-    if parser is None:
-        if plugin == 'core':
-            tools_log.log_info(f"Creating parser for file: {path}")
-        parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
-        parser.read(path)
-
-    # If project has already been loaded and filename is 'init' or 'session', always read and parse file
-    if force_reload or (global_vars.project_loaded and file_name in ('init', 'session')):
-        parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
-        parser.read(path)
-
     if config_type == 'user' and prefix and global_vars.project_type is not None:
         parameter = f"{global_vars.project_type}_{parameter}"
 
-    if not parser.has_section(section) or not parser.has_option(section, parameter):
+    if not store.has_option(path, section, parameter):
         if chk_user_params and config_type in "user":
             value = _check_user_params(section, raw_parameter, file_name, prefix=prefix)
             set_config_parser(section, raw_parameter, value, config_type, file_name, prefix=prefix, chk_user_params=False)
     else:
-        value = parser[section][parameter]
+        value = store.get_value(path, section, parameter)
 
     # If there is a value and you don't want to get the comment, it only gets the value part
     if value is not None and not get_comment:
@@ -180,17 +179,13 @@ def set_config_parser(section: str, parameter: str, value: str = None, config_ty
 
     try:
 
-        parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
-        parser.read(path)
+        # Value is changed in memory and written to disk in background (see GwConfigStore)
+        store = _get_config_store()
 
         raw_parameter = parameter
         if config_type == 'user' and prefix and global_vars.project_type is not None:
             parameter = f"{global_vars.project_type}_{parameter}"
 
-        # Check if section exists in file
-        if section not in parser:
-            parser.add_section(section)
-
         # Cast to str because parser only allow strings
         value = f"{value}"
         if value is not None:
@@ -202,22 +197,25 @@ def set_config_parser(section: str, parameter: str, value: str = None, config_ty
                 prev = get_config_parser(section, parameter, config_type, file_name, False, True, False)
                 if prev is not None and "#" in prev:
                     value += f" #{prev.split('#')[1]}"
-            parser.set(section, parameter, value)
+            store.set_value(path, section, parameter, value)
             # Check if the parameter exists in the inventory, if not creates it
             if chk_user_params and config_type in "user":
                 _check_user_params(section, raw_parameter, file_name, prefix)
         else:
-            parser.set(section, parameter)  # This is just for writing comments
-
-        with open(path, 'w') as configfile:
-            parser.write(configfile)
-            configfile.close()
+            store.set_value(path, section, parameter, None)  # This is just for writing comments
 
     except Exception as e:
         tools_log.log_warning(f"set_config_parser exception [{type(e).__name__}]: {e}")
         return
 
 
+def flush_config_files():
+    """ Write to disk pending changes of configuration files made with set_config_parser """
+
+    if global_vars.config_store:
+        global_vars.config_store.flush()
+
+
 def save_current_tab(dialog, tab_widget, selector_name):
     """
     Save the name of current tab used by the user into QSettings()
@@ -263,6 +261,10 @@ def open_dialog(dlg, dlg_name=None, stay_on_top=True, title=None, hide_config_wi
     if hide_config_widgets:
         hide_widgets_form(dlg, dlg_name)
 
+    if tools_log.is_trace_enabled():
+        dlg.setProperty('trace_open_time', time.perf_counter())
+        tools_log.log_trace('dialog_open', name=dlg_name or dlg.objectName())
+
     # Open dialog
     if issubclass(type(dlg), GwDialog):
         dlg.open()
@@ -276,6 +278,10 @@ def close_dialog(dlg, delete_dlg=True, plugin='core'):
     """ Close dialog """
 
     save_settings(dlg, plugin=plugin)
+    if tools_log.is_trace_enabled():
+        open_time = dlg.property('trace_open_time')
+        duration = round((time.perf_counter() - open_time) * 1000, 1) if open_time is not None else None
+        tools_log.log_trace('dialog_close', name=dlg.objectName(), duration=duration)
     global_vars.session_vars['last_focus'] = None
     dlg.close()
     if delete_dlg:
@@ -387,6 +393,25 @@ def create_body(form='', feature='', filter_fields='', extras=None):
     return body
 
 
+def build_body(form=None, feature=None, filter_fields=None, extras=None, page_info=None):
+    """ Create and return parameters as body to functions. Unlike create_body, parameters are dictionaries and their
+    values are escaped, so it can be passed to execute_procedure with text typed by the user
+    :return: Body as parameter of execute_procedure (GwBody)
+    """
+
+    info_types = {'full': 1}
+    info_type = info_types.get(global_vars.project_vars['info_type'])
+    lang = QSettings().value('locale/globalLocale', QLocale().name())
+
+    client = {"device": 4, "lang": lang}
+    if info_type is not None:
+        client["infoType"] = info_type
+    if global_vars.project_epsg is not None:
+        client["epsg"] = global_vars.project_epsg
+
+    return GwBody(client, form, feature, filter_fields, extras, page_info)
+
+
 def refresh_legend():
     """ This function solves the bug generated by changing the type of feature.
     Mysteriously this bug is solved by checking and unchecking the categorization of the tables.
@@ -570,7 +595,7 @@ def add_layer_database(tablename=None, the_geom="the_geom", field_id="id", group
         if style_id in (None, "-1"):
             # Get style_id from tablename
             sql = f"SELECT id FROM sys_style WHERE idval = '{tablename_og}'"
-            row = tools_db.get_row(sql)
+            row = tools_db.get_row(sql, log_info=False, cache_ttl=3600)
             if row:
                 style_id = row[0]
 
@@ -667,23 +692,21 @@ def add_layer_temp(dialog, data, layer_name, force_tab=True, reset_text=True, ta
 
 
 def config_layer_attributes(json_result, layer, layer_name, thread=None):
+    """ Set fields of @layer configured according to @json_result of gw_fct_getinfofromid.
+    Attribute table and form configurations are collected for all fields and set once """
 
+    fields = layer.fields()
+    hidden_columns = {}     # Key: column name. Value: hidden (bool)
+    read_only_fields = {}   # Key: field index. Value: read only (bool)
     for field in json_result['body']['data']['fields']:
         valuemap_values = {}
 
         # Get column index
-        field_index = layer.fields().indexFromName(field['columnname'])
+        field_index = fields.indexFromName(field['columnname'])
 
         # Hide selected fields according table config_form_fields.hidden
         if 'hidden' in field:
-            config = layer.attributeTableConfig()
-            columns = config.columns()
-            for column in columns:
-                if column.name == str(field['columnname']):
-                    column.hidden = field['hidden']
-                    break
-            config.setColumns(columns)
-            layer.setAttributeTableConfig(config)
+            hidden_columns.setdefault(str(field['columnname']), field['hidden'])
 
         # Set alias column
         if field['label']:
@@ -703,16 +726,8 @@ def config_layer_attributes(json_result, layer, layer_name, thread=None):
                                      QgsFieldConstraints.ConstraintStrengthSoft)
 
         # Manage editability
-        # Get layer config
-        config = layer.editFormConfig()
-        try:
-            # Set field editability
-            config.setReadOnly(field_index, not field['iseditable'])
-        except KeyError:
-            pass
-        finally:
-            # Set layer config
-            layer.setEditFormConfig(config)
+        if 'iseditable' in field:
+            read_only_fields[field_index] = not field['iseditable']
 
         # delete old values on ValueMap
         editor_widget_setup = QgsEditorWidgetSetup('ValueMap', {'map': valuemap_values})
@@ -790,12 +805,64 @@ def config_layer_attributes(json_result, layer, layer_name, thread=None):
                 editor_widget_setup = QgsEditorWidgetSetup('TextEdit', {'IsMultiline': False})
             layer.setEditorWidgetSetup(field_index, editor_widget_setup)
 
+    # Set attribute table config
+    if hidden_columns:
+        config = layer.attributeTableConfig()
+        columns = config.columns()
+        for column in columns:
+            hidden = hidden_columns.pop(column.name, None)
+            if hidden is not None:
+                column.hidden = hidden
+        config.setColumns(columns)
+        layer.setAttributeTableConfig(config)
+
+    # Set field editability
+    config = layer.editFormConfig()
+    for field_index, read_only in read_only_fields.items():
+        config.setReadOnly(field_index, read_only)
+    layer.setEditFormConfig(config)
+
+
+def get_layers_config(table_names, aux_conn=None, is_thread=False, check_function=True):
+    """ Get field configuration of layers @table_names calling gw_fct_getinfofromid for all of them in a single
+    round trip (see execute_procedures_batch)
+    :param table_names: Table names of layers (list)
+    :param aux_conn: Auxiliar connection to database used by threads (psycopg2.connection)
+    :return: Valid responses keyed by table name, as expected by config_layer_attributes (dict of json)
+    """
+
+    if check_function:
+        row = tools_db.check_function('gw_fct_getinfofromid', aux_conn=aux_conn)
+        if row in (None, ''):
+            tools_qgis.show_warning("Function not found in database", parameter='gw_fct_getinfofromid')
+            return None
+
+    procedures = []
+    for table_name in table_names:
+        feature = f'"tableName":"{table_name}", "isLayer":true'
+        procedures.append(('gw_fct_getinfofromid', create_body(feature=feature)))
+    results = execute_procedures_batch(procedures, aux_conn=aux_conn, is_thread=is_thread, check_function=False)
+
+    layers_config = {}
+    for table_name, json_result in zip(table_names, results):
+        if not json_result or 'status' not in json_result or json_result['status'] == 'Failed':
+            continue
+        if 'body' not in json_result:
+            tools_log.log_info("Not 'body'", parameter=table_name)
+            continue
+        if 'data' not in json_result['body']:
+            tools_log.log_info("Not 'data'", parameter=table_name)
+            continue
+        layers_config[table_name] = json_result
+
+    return layers_config
+
 
 def load_missing_layers(filter, group="GW Layers", sub_group=None):
     """ Adds any missing Mincut layers to TOC """
 
     sql = f"SELECT id, alias FROM sys_table WHERE id LIKE '{filter}' AND alias IS NOT NULL"
-    rows = tools_db.get_rows(sql)
+    rows = tools_db.get_rows(sql, cache_ttl=3600)
     if rows:
         for tablename, alias in rows:
             lyr = tools_qgis.get_layer_by_tablename(tablename)
@@ -1097,38 +1164,15 @@ def set_style_mapzones():
                 lyr.triggerRepaint()
 
 
-def manage_feature_cat():
-    """ Manage records from table 'cat_feature' """
-
-    # Dictionary to keep every record of table 'cat_feature'
-    # Key: field tablename
-    # Value: Object of the class SysFeatureCat
-    feature_cat = {}
-
-    body = create_body()
-    result = execute_procedure('gw_fct_getcatfeaturevalues', body)
-    # If result ara none, probably the conection has broken so try again
-    if not result:
-        result = execute_procedure('gw_fct_getcatfeaturevalues', body)
-        if not result:
-            return None
-
-    msg = "Field child_layer of id: "
-    for value in result['body']['data']['values']:
-        tablename = value['child_layer']
-        if not tablename:
-            msg += f"{value['id']}, "
-            continue
-        elem = GwCatFeature(value['id'], value['system_id'], value['feature_type'], value['shortcut_key'],
-                            value['parent_layer'], value['child_layer'])
-
-        feature_cat[tablename] = elem
-
-    feature_cat = OrderedDict(sorted(feature_cat.items(), key=lambda t: t[0]))
-
-    if msg != "Field child_layer of id: ":
-        tools_qgis.show_warning(f"{msg} is not defined in table cat_feature")
+def manage_feature_cat(force_reload=False):
+    """ Manage records from table 'cat_feature'. Result is kept in the query cache """
 
+    if force_reload:
+        tools_db.invalidate_query_cache('cat_feature')
+    feature_cat = tools_db.get_cached((global_vars.schema_name, 'feature_cat'), _get_feature_cat, 600, ['cat_feature'])
+    # Callers get their own dictionary, not the cached one
+    if feature_cat is not None:
+        feature_cat = OrderedDict(feature_cat)
     return feature_cat
 
 
@@ -1621,12 +1665,10 @@ def fill_typeahead(completer, model, field, dialog, widget):
     if 'parentId' in field:
         parent_id = field["parentId"]
 
-    extras = f'"queryText":"{field["queryText"]}"'
-    extras += f', "queryTextFilter":"{field["queryTextFilter"]}"'
-    extras += f', "parentId":"{parent_id}"'
-    extras += f', "parentValue":"{tools_qt.get_text(dialog, "data_" + str(parent_id))}"'
-    extras += f', "textToSearch":"{tools_qt.get_text(dialog, widget)}"'
-    body = create_body(extras=extras)
+    extras = {"queryText": f"{field['queryText']}", "queryTextFilter": f"{field['queryTextFilter']}",
+              "parentId": f"{parent_id}", "parentValue": f"{tools_qt.get_text(dialog, 'data_' + str(parent_id))}",
+              "textToSearch": f"{tools_qt.get_text(dialog, widget)}"}
+    body = build_body(extras=extras)
     complet_list = execute_procedure('gw_fct_gettypeahead', body)
     if not complet_list or complet_list['status'] == 'Failed':
         return False
@@ -1816,18 +1858,15 @@ def get_expression_filter(feature_type, list_ids=None, layers=None):
         return None
 
     # Set expression filter with features in the list
-    expr_filter = field_id + " IN ("
-    for i in range(len(list_ids)):
-        expr_filter += f"'{list_ids[i]}', "
-    expr_filter = expr_filter[:-2] + ")"
+    expr_filter = field_id + " IN (" + ", ".join(f"'{feature_id}'" for feature_id in list_ids) + ")"
 
     # Check expression
     (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)
     if not is_valid:
         return None
 
-    # Select features of layers applying @expr
-    tools_qgis.select_features_by_ids(feature_type, expr, layers=layers)
+    # Select features of layers with these ids
+    tools_qgis.select_features_by_values(feature_type, list_ids, layers=layers)
 
     return expr_filter
 
@@ -1904,7 +1943,7 @@ def execute_procedure(function_name, parameters=None, schema_name=None, commit=T
         aux_conn=None, is_thread=False, check_function=True):
     """ Manage execution database function
     :param function_name: Name of function to call (text)
-    :param parameters: Parameters for function (json) or (query parameters)
+    :param parameters: Parameters for function (json), (query parameters) or as returned by build_body (GwBody)
     :param commit: Commit sql (bool)
     :param log_sql: Show query in qgis log (bool)
     :param aux_conn: Auxiliar connection to database used by threads (psycopg2.connection)
@@ -1918,76 +1957,170 @@ def execute_procedure(function_name, parameters=None, schema_name=None, commit=T
             tools_qgis.show_warning("Function not found in database", parameter=function_name)
             return None
 
-    # Manage schema_name and parameters
-    if schema_name:
-        sql = f"SELECT {schema_name}.{function_name}("
-    elif schema_name is None and global_vars.schema_name:
-        sql = f"SELECT {global_vars.schema_name}.{function_name}("
+    # Manage schema_name and parameters. A single body (GwBody) is sent as a bound parameter
+    params = None
+    if isinstance(parameters, GwBody):
+        sql = _get_procedure_sql(function_name, '%s::json', schema_name)
+        params = [parameters.to_json()]
     else:
-        sql = f"SELECT {function_name}("
-    if parameters:
-        sql += f"{parameters}"
-    sql += f");"
+        sql = _get_procedure_sql(function_name, parameters, schema_name)
 
     # Get log_sql for developers
     dev_log_sql = get_config_parser('log', 'log_sql', "user", "init", False)
     if dev_log_sql in ("True", "False"):
         log_sql = tools_os.set_boolean(dev_log_sql)
 
-    # Execute database function
-    row = tools_db.get_row(sql, commit=commit, log_sql=log_sql, aux_conn=aux_conn)
-    if not row or not row[0]:
-        tools_log.log_warning(f"Function error: {function_name}")
-        tools_log.log_warning(sql)
-        return None
+    # Execute database function. Hot functions with a single json body use a prepared statement
+    trace_start = time.perf_counter() if tools_log.is_trace_enabled() else None
+    body = _get_prepared_body(function_name, parameters)
+    if body is not None:
+        row = tools_db.execute_prepared(function_name, schema_name or global_vars.schema_name, body, log_sql=log_sql,
+                                        commit=commit, aux_conn=aux_conn)
+    else:
+        row = tools_db.get_row(sql, commit=commit, log_sql=log_sql, params=params, aux_conn=aux_conn)
+    if trace_start is not None:
+        duration = (time.perf_counter() - trace_start) * 1000
+        response_size = tools_pgdao.get_payload_size()
+
+    # Admin functions may create or drop database objects
+    if function_name.startswith('gw_fct_admin'):
+        tools_db.reload_catalog_cache(schema_name)
+        tools_db.invalidate_query_cache()
+    elif function_name == 'gw_fct_setconfig':
+        tools_db.invalidate_query_cache(['config_param_system', 'config_param_user'])
+
+    json_result = _manage_procedure_result(function_name, row, sql, log_sql, rubber_band, is_thread)
+    if trace_start is not None:
+        tools_log.log_trace('db_function', name=function_name, duration=round(duration, 1), rows=1 if row else 0,
+                            request_bytes=len(body if body is not None else sql), response_bytes=response_size,
+                            outcome=_get_procedure_outcome(json_result))
 
-    # Get json result
-    json_result = row[0]
+    return json_result
+
+
+def execute_procedure_async(function_name, parameters=None, callback=None, schema_name=None, log_sql=False,
+        rubber_band=None, key=None, check_function=True):
+    """ Manage execution database function without blocking the user interface. Must be called from main thread
+    :param function_name: Name of function to call (text)
+    :param parameters: Parameters for function (json) or (query parameters)
+    :param callback: Function called with the response of the function executed (json), as execute_procedure returns
+    :param key: Calls with the same key supersede each other: previous one is cancelled and its response is
+                dropped. By default @function_name (text)
+    :return: Id of the request, used in cancel_procedure_async (int)
+    """
+
+    # Check if function exists
+    if check_function:
+        row = tools_db.check_function(function_name, schema_name)
+        if row in (None, ''):
+            tools_qgis.show_warning("Function not found in database", parameter=function_name)
+            return None
+
+    sql = _get_procedure_sql(function_name, parameters, schema_name)
+
+    # Get log_sql for developers
+    dev_log_sql = get_config_parser('log', 'log_sql', "user", "init", False)
+    if dev_log_sql in ("True", "False"):
+        log_sql = tools_os.set_boolean(dev_log_sql)
     if log_sql:
-        tools_log.log_db(json_result, header="SERVER RESPONSE")
+        tools_log.log_db(sql, bold='b')
+
+    def on_result(row, error):
+        if error is not None:
+            global_vars.session_vars['last_error'] = error
+        json_result = _manage_procedure_result(function_name, row, sql, log_sql, rubber_band)
+        if callback:
+            callback(json_result)
+
+    if key is None:
+        key = function_name
+    return _get_async_manager().execute(sql, on_result, key)
+
+
+def execute_procedures_batch(procedures, schema_name=None, commit=True, log_sql=False, aux_conn=None, is_thread=False,
+        check_function=True):
+    """ Manage execution of several independent database functions in a single round trip.
+    Every function is executed, so don't batch functions whose execution depends on the result of another one
+    :param procedures: List of tuples (function_name, parameters). Parameters as in execute_procedure (list)
+    :param commit: Commit sql. If False, a failed batch is undone without discarding previous statements of the
+                   transaction (bool)
+    :param log_sql: Show query in qgis log (bool)
+    :param aux_conn: Auxiliar connection to database used by threads (psycopg2.connection)
+    :return: Response of each function executed, in the same order (list of json)
+    """
 
-    # All functions called from python should return 'status', if not, something has probably failed in postrgres
-    if 'status' not in json_result:
-        manage_json_exception(json_result, sql)
-        return False
+    results = [None] * len(procedures)
+    calls = []
+    for index, (function_name, parameters) in enumerate(procedures):
+        if check_function:
+            row = tools_db.check_function(function_name, schema_name, commit, aux_conn=aux_conn)
+            if row in (None, ''):
+                tools_qgis.show_warning("Function not found in database", parameter=function_name)
+                continue
+        calls.append((index, function_name, _get_procedure_call(function_name, parameters, schema_name)))
+    if not calls:
+        return results
 
-    # If failed, manage exception
-    if json_result.get('status') == 'Failed':
-        manage_json_exception(json_result, sql, is_thread=is_thread)
-        return json_result
+    # Get log_sql for developers
+    dev_log_sql = get_config_parser('log', 'log_sql', "user", "init", False)
+    if dev_log_sql in ("True", "False"):
+        log_sql = tools_os.set_boolean(dev_log_sql)
 
-    try:
-        if json_result["body"]["feature"]["geometry"] and global_vars.data_epsg != global_vars.project_epsg:
-            json_result = manage_json_geometry(json_result)
-    except Exception:
-        pass
+    # Each function is one column of the same row
+    sql = f"SELECT {', '.join(call for index, function_name, call in calls)};"
+    if not commit:
+        # Transaction is left to the caller: if the batch fails, only the batch is rolled back
+        sql = f"SAVEPOINT gw_batch; {sql}"
+    row = tools_db.get_row(sql, commit=commit, log_sql=log_sql, aux_conn=aux_conn, is_admin=True)
+    if not row:
+        if not commit:
+            global_vars.dao.rollback(aux_conn, savepoint='gw_batch')
+            if global_vars.session_vars['last_error']:
+                tools_qt.manage_exception_db(global_vars.session_vars['last_error'], sql)
+            return results
+        # Some function has raised an exception and the whole batch has been rolled back.
+        # Execute them one by one, so the rest of them get their response and the exception is shown
+        for index, function_name, call in calls:
+            results[index] = execute_procedure(function_name, procedures[index][1], schema_name, commit, log_sql,
+                                               aux_conn=aux_conn, is_thread=is_thread, check_function=False)
+        return results
 
-    if not is_thread:
-        manage_json_response(json_result, sql, rubber_band)
+    for column, (index, function_name, call) in enumerate(calls):
+        if function_name.startswith('gw_fct_admin'):
+            tools_db.reload_catalog_cache(schema_name)
+            tools_db.invalidate_query_cache()
+        results[index] = _manage_procedure_result(function_name, [row[column]], f"SELECT {call};", log_sql,
+                                                  is_thread=is_thread)
 
-    return json_result
+    return results
 
 
-def manage_json_geometry(json_result):
+def cancel_procedure_async(request_id=None, key=None):
+    """ Cancel database functions called with execute_procedure_async. Their callbacks will not be called """
 
-    # Set QgsCoordinateReferenceSystem
-    data_epsg = QgsCoordinateReferenceSystem(str(global_vars.data_epsg))
-    project_epsg = QgsCoordinateReferenceSystem(str(global_vars.project_epsg))
+    if global_vars.async_manager:
+        global_vars.async_manager.cancel(request_id, key)
 
-    tform = QgsCoordinateTransform(data_epsg, project_epsg, QgsProject.instance())
 
-    list_coord = re.search('\((.*)\)', str(json_result['body']['feature']['geometry']['st_astext']))
-    points = tools_qgis.get_geometry_vertex(list_coord)
+def manage_json_geometry(json_result):
+    """ Transform geometry of @json_result from data epsg to project epsg.
+    Its WKT is parsed once and transformed as a whole, whatever the number of vertices """
 
-    for point in points:
-        if str(global_vars.data_epsg) == '2052' and str(global_vars.project_epsg) == '102566':
+    geometry = json_result['body']['feature']['geometry']
+    wkt = geometry['st_astext']
+    if wkt is None:
+        return json_result
+
+    if str(global_vars.data_epsg) == '2052' and str(global_vars.project_epsg) == '102566':
+        list_coord = re.search(r'\((.*)\)', str(wkt))
+        if list_coord:
             clear_list = list_coord.group(1)
             updated_list = list_coord.group(1).replace('-', '').replace(' ', ' -')
-            json_result['body']['feature']['geometry']['st_astext'] = json_result['body']['feature']['geometry']['st_astext'].replace(clear_list, updated_list)
-        elif str(global_vars.data_epsg) != str(global_vars.project_epsg):
-            new_coords = tform.transform(point)
-            json_result['body']['feature']['geometry']['st_astext'] = json_result['body']['feature']['geometry']['st_astext'].replace(str(point.x()), str(new_coords.x()))
-            json_result['body']['feature']['geometry']['st_astext'] = json_result['body']['feature']['geometry']['st_astext'].replace(str(point.y()), str(new_coords.y()))
+            geometry['st_astext'] = str(wkt).replace(clear_list, updated_list)
+    elif str(global_vars.data_epsg) != str(global_vars.project_epsg):
+        new_geometry = tools_qgis.get_transformed_geometry(wkt, global_vars.data_epsg, global_vars.project_epsg)
+        if new_geometry is not None:
+            geometry['st_astext'] = tools_qgis.get_postgis_wkt(new_geometry)
 
     return json_result
 
@@ -2330,7 +2463,10 @@ def get_config_value(parameter='', columns='value', table='config_param_user', s
     if table == 'config_param_user':
         sql += " AND cur_user = current_user"
     sql += ";"
-    row = tools_db.get_row(sql, log_info=log_info)
+
+    # Values of config_param_system are only changed by administrators: keep them in the query cache
+    cache_ttl = 300 if table == 'config_param_system' else None
+    row = tools_db.get_row(sql, log_info=log_info, cache_ttl=cache_ttl)
     return row
 
 
@@ -2441,37 +2577,25 @@ def selection_changed(class_object, dialog, table_object, query=False, lazy_widg
     tools_qgis.disconnect_signal_selection_changed()
     field_id = f"{class_object.feature_type}_id"
 
-    ids = []
     if class_object.layers is None:
         return
 
-    # Iterate over all layers of the group
-    for layer in class_object.layers[class_object.feature_type]:
-        if layer.selectedFeatureCount() > 0:
-            # Get selected features of the layer
-            features = layer.selectedFeatures()
-            for feature in features:
-                # Append 'feature_id' into the list
-                selected_id = feature.attribute(field_id)
-                if selected_id not in ids:
-                    ids.append(selected_id)
+    # Get ids of selected features of all layers of the group
+    ids = tools_qgis.get_selected_values(class_object.layers[class_object.feature_type], field_id)
 
     class_object.list_ids[class_object.feature_type] = ids
 
     expr_filter = None
     if len(ids) > 0:
         # Set 'expr_filter' with features that are in the list
-        expr_filter = f'"{field_id}" IN ('
-        for i in range(len(ids)):
-            expr_filter += f"'{ids[i]}', "
-        expr_filter = expr_filter[:-2] + ")"
+        expr_filter = f'"{field_id}" IN (' + ", ".join(f"'{selected_id}'" for selected_id in ids) + ")"
 
         # Check expression
         (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)  # @UnusedVariable
         if not is_valid:
             return
 
-        tools_qgis.select_features_by_ids(class_object.feature_type, expr, class_object.layers)
+        tools_qgis.select_features_by_values(class_object.feature_type, ids, class_object.layers)
 
     # Reload contents of table 'tbl_@table_object_x_@feature_type'
     if query:
@@ -2507,46 +2631,37 @@ def insert_feature(class_object, dialog, table_object, query=False, remove_ids=T
     if not is_valid:
         return None
 
-    # Select features of layers applying @expr
-    tools_qgis.select_features_by_ids(feature_type, expr, layers=class_object.layers)
+    # Select features of layers with entered id
+    tools_qgis.select_features_by_values(feature_type, [feature_id], layers=class_object.layers)
 
     if feature_id == 'null':
         message = "You need to enter a feature id"
         tools_qt.show_info_box(message)
         return
 
-    # Iterate over all layers of the group
-    for layer in class_object.layers[feature_type]:
-        if layer.selectedFeatureCount() > 0:
-            # Get selected features of the layer
-            features = layer.selectedFeatures()
-            for feature in features:
-                # Append 'feature_id' into the list
-                selected_id = feature.attribute(field_id)
-                if selected_id not in class_object.ids:
-                    class_object.ids.append(selected_id)
-        if feature_id not in class_object.ids:
-            # If feature id doesn't exist in list -> add
-            class_object.ids.append(str(feature_id))
+    # Append ids of selected features of all layers of the group into the list
+    ids = set(class_object.ids)
+    for selected_id in tools_qgis.get_selected_values(class_object.layers[feature_type], field_id):
+        if selected_id not in ids:
+            ids.add(selected_id)
+            class_object.ids.append(selected_id)
+    if feature_id not in ids:
+        # If feature id doesn't exist in list -> add
+        class_object.ids.append(str(feature_id))
 
     # Set expression filter with features in the list
-    expr_filter = f'"{field_id}" IN (  '
-    for i in range(len(class_object.ids)):
-        expr_filter += f"'{class_object.ids[i]}', "
-    expr_filter = expr_filter[:-2] + ")"
+    expr_filter = f'"{field_id}" IN (' + ", ".join(f"'{selected_id}'" for selected_id in class_object.ids) + ")"
 
     # Check expression
     (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)
     if not is_valid:
         return
 
-    # Select features with previous filter
-    # Build a list of feature id's and select them
+    # Select features with ids of the list
     for layer in class_object.layers[feature_type]:
-        it = layer.getFeatures(QgsFeatureRequest(expr))
-        id_list = [i.id() for i in it]
-        if len(id_list) > 0:
-            layer.selectByIds(id_list)
+        feature_ids = tools_qgis.get_feature_ids(layer, field_id, class_object.ids)
+        if len(feature_ids) > 0:
+            layer.selectByIds(feature_ids)
 
     # Reload contents of table 'tbl_xxx_xxx_@feature_type'
     if query:
@@ -2998,14 +3113,10 @@ def delete_records(class_object, dialog, table_object, query=False, lazy_widget=
         return
 
     expr_filter = None
-    expr = None
     if len(class_object.ids) > 0:
 
         # Set expression filter with features in the list
-        expr_filter = f'"{field_id}" IN ('
-        for i in range(len(class_object.ids)):
-            expr_filter += f"'{class_object.ids[i]}', "
-        expr_filter = expr_filter[:-2] + ")"
+        expr_filter = f'"{field_id}" IN (' + ", ".join(f"'{feature_id}'" for feature_id in class_object.ids) + ")"
 
         # Check expression
         (is_valid, expr) = tools_qt.check_expression_filter(expr_filter)  # @UnusedVariable
@@ -3020,9 +3131,8 @@ def delete_records(class_object, dialog, table_object, query=False, lazy_widget=
         load_tablename(dialog, table_object, feature_type, expr_filter)
         tools_qt.set_lazy_init(table_object, lazy_widget=lazy_widget, lazy_init_function=lazy_init_function)
 
-    # Select features with previous filter
-    # Build a list of feature id's and select them
-    tools_qgis.select_features_by_ids(feature_type, expr, layers=class_object.layers)
+    # Select features with ids of the list
+    tools_qgis.select_features_by_values(feature_type, class_object.ids, layers=class_object.layers)
 
     if query:
         class_object.layers = remove_selection(layers=class_object.layers)
@@ -3285,6 +3395,8 @@ def remove_deprecated_config_vars():
     if global_vars.user_folder_dir is None:
         return
 
+    # Files are edited directly: write pending changes before and reload them after
+    flush_config_files()
     init_parser = configparser.ConfigParser()
     session_parser = configparser.ConfigParser()
     path_folder = os.path.join(tools_os.get_datadir(), global_vars.user_folder_dir)
@@ -3376,6 +3488,8 @@ def remove_deprecated_config_vars():
         session_parser.write(configfile)
         configfile.close()
 
+    _get_config_store().reload()
+
 
 def hide_widgets_form(dialog, dlg_name):
 
@@ -3545,6 +3659,26 @@ def _check_user_params(section, parameter, file_name, prefix=False):
         return check_value
 
 
+def _get_config_store():
+    """ Return instance of GwConfigStore shared by every configuration file """
+
+    if global_vars.config_store is None:
+        global_vars.config_store = GwConfigStore(on_error=tools_log.log_warning, on_reload=_set_config_parser_instance)
+        # Changes are written by a daemon thread, which is killed on exit: write pending ones before QGIS quits
+        app = QgsApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(flush_config_files)
+    return global_vars.config_store
+
+
+def _set_config_parser_instance(path, parser):
+    """ Replace parser of global_vars.configs read from @path by @parser, the one read again by GwConfigStore """
+
+    for config in global_vars.configs.values():
+        if config[0] == path and config[1] is not None:
+            config[1] = parser
+
+
 def _get_parser_from_filename(filename):
     """ Get parser of file @filename.config """
 
@@ -3567,4 +3701,141 @@ def _get_parser_from_filename(filename):
 
     return filepath, parser
 
+
+def _get_procedure_sql(function_name, parameters=None, schema_name=None):
+    """ Return query calling database function @function_name """
+
+    return f"SELECT {_get_procedure_call(function_name, parameters, schema_name)};"
+
+
+def _get_procedure_call(function_name, parameters=None, schema_name=None):
+    """ Return expression calling database function @function_name """
+
+    if schema_name:
+        sql = f"{schema_name}.{function_name}("
+    elif schema_name is None and global_vars.schema_name:
+        sql = f"{global_vars.schema_name}.{function_name}("
+    else:
+        sql = f"{function_name}("
+    if parameters:
+        sql += f"{parameters}"
+    sql += f")"
+    return sql
+
+
+def _get_procedure_outcome(json_result):
+    """ Return outcome of a database function as written into trace log: ok, failed, invalid or error """
+
+    if json_result is None:
+        return 'error'
+    if json_result is False:
+        return 'invalid'
+    if json_result.get('status') == 'Failed':
+        return 'failed'
+    return 'ok'
+
+
+def _manage_procedure_result(function_name, row, sql, log_sql=False, rubber_band=None, is_thread=False):
+    """ Manage row returned by database function @function_name. Return its json result """
+
+    if not row or not row[0]:
+        tools_log.log_warning(f"Function error: {function_name}")
+        tools_log.log_warning(sql)
+        return None
+
+    # Get json result
+    json_result = row[0]
+    if log_sql:
+        tools_log.log_db(json_result, header="SERVER RESPONSE")
+
+    # All functions called from python should return 'status', if not, something has probably failed in postrgres
+    if 'status' not in json_result:
+        manage_json_exception(json_result, sql)
+        return False
+
+    # If failed, manage exception
+    if json_result.get('status') == 'Failed':
+        manage_json_exception(json_result, sql, is_thread=is_thread)
+        return json_result
+
+    try:
+        if json_result["body"]["feature"]["geometry"] and global_vars.data_epsg != global_vars.project_epsg:
+            json_result = manage_json_geometry(json_result)
+    except Exception:
+        pass
+
+    if not is_thread:
+        manage_json_response(json_result, sql, rubber_band)
+
+    return json_result
+
+
+def _get_async_manager():
+    """ Return instance of GwAsyncManager connected with the parameters of the current connection """
+
+    dao = global_vars.dao
+    manager = global_vars.async_manager
+    if manager is not None and (manager.conn_string != dao.conn_string
+                                or manager.set_search_path != dao.set_search_path):
+        manager.close()
+        manager = None
+    if manager is None:
+        manager = GwAsyncManager(dao.conn_string, dao.set_search_path, dao.stats)
+        global_vars.async_manager = manager
+    return manager
+
+
+def _get_prepared_body(function_name, parameters):
+    """ Return json body of @parameters if @function_name has to be executed through a prepared statement.
+    Only a single body (GwBody or quoted with $$ as returned by create_body) can be sent as a bound parameter """
+
+    if function_name not in global_vars.prepared_functions:
+        return None
+    if isinstance(parameters, GwBody):
+        return parameters.to_json()
+    if not isinstance(parameters, str):
+        return None
+    parameters = parameters.strip()
+    if not (parameters.startswith('$$') and parameters.endswith('$$')) or len(parameters) < 4:
+        return None
+    body = parameters[2:-2]
+    if '$$' in body:
+        return None
+    return body
+
+
+def _get_feature_cat():
+    """ Get records of table 'cat_feature' calling gw_fct_getcatfeaturevalues """
+
+    # Dictionary to keep every record of table 'cat_feature'
+    # Key: field tablename
+    # Value: Object of the class SysFeatureCat
+    feature_cat = {}
+
+    body = create_body()
+    result = execute_procedure('gw_fct_getcatfeaturevalues', body)
+    # If result ara none, probably the conection has broken so try again
+    if not result:
+        result = execute_procedure('gw_fct_getcatfeaturevalues', body)
+        if not result:
+            return None
+
+    msg = "Field child_layer of id: "
+    for value in result['body']['data']['values']:
+        tablename = value['child_layer']
+        if not tablename:
+            msg += f"{value['id']}, "
+            continue
+        elem = GwCatFeature(value['id'], value['system_id'], value['feature_type'], value['shortcut_key'],
+                            value['parent_layer'], value['child_layer'])
+
+        feature_cat[tablename] = elem
+
+    feature_cat = OrderedDict(sorted(feature_cat.items(), key=lambda t: t[0]))
+
+    if msg != "Field child_layer of id: ":
+        tools_qgis.show_warning(f"{msg} is not defined in table cat_feature")
+
+    return feature_cat
+
 # endregion
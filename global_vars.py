@@ -42,7 +42,11 @@ qgis_db_credentials = None              # Instance of class QSqlDatabase (QPSQL)
 dao = None                              # Instance of class GwPgDao. Found in "/lib/tools_db.py"
 dao_db_credentials = None               # Credentials used to establish the connection with PostgreSql. Saving {db, schema, table, service, host, port, user, password, sslmode}
 notify = None                           # Instance of class GwNotify. Found in "/core/threads/notify.py"
+async_manager = None                    # Instance of class GwAsyncManager. Found in "/core/utils/async_manager.py"
+config_store = None                     # Instance of class GwConfigStore. Found in "/lib/tools_config.py"
+layers_config_cache = None              # Instance of class GwLayersConfigCache. Found in "/core/utils/layers_config_cache.py"
 exec_procedure_max_retries = None       # Maximum number of execution retries of a PostgreSQL function
+prepared_functions = []                 # Database functions executed through server-side prepared statements
 project_vars = {}                       # Project variables from QgsProject related to Giswater
 project_vars['info_type'] = None        # gwInfoType
 project_vars['add_schema'] = None       # gwAddSchema
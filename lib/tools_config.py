@@ -0,0 +1,226 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+import configparser
+import io
+import os
+import threading
+import time
+
+
+class GwConfigStore(object):
+
+    def __init__(self, check_interval=2, flush_delay=1, on_error=None, on_reload=None):
+        """
+        Keep configuration files (.config) in memory. Each file is read once and its values are served from memory.
+        Changes are written to disk in a background thread @flush_delay seconds after the last one (write-behind),
+        through a temporary file renamed over the original one, so a file is never left half written.
+        Files edited by other programs are reloaded when their modification time changes. It is checked at most once
+        every @check_interval seconds, so reading values doesn't access the disk.
+        Pending changes must be written calling flush() before exit
+            :param on_error: Function called with the message of errors writing files (function)
+            :param on_reload: Function called with the path and the new parser of a file read again (function)
+        """
+
+        self.check_interval = check_interval
+        self.flush_delay = flush_delay
+        self.on_error = on_error
+        self.on_reload = on_reload
+        self.files = {}                     # Key: filepath. Value: dict with parser, mtime, checked and dirty values
+        self.lock = threading.RLock()
+        self.flush_lock = threading.Lock()
+        self.timer = None
+        self.last_change = 0
+        self.stats = {'reads': 0, 'writes': 0, 'checks': 0}
+
+
+    def has_option(self, path, section, option):
+
+        with self.lock:
+            parser = self._get_file(path)['parser']
+            return parser.has_section(section) and parser.has_option(section, option)
+
+
+    def get_value(self, path, section, option, fallback=None):
+        """ Return raw value of @option (with its inline comment), or @fallback if it doesn't exist """
+
+        with self.lock:
+            parser = self._get_file(path)['parser']
+            if not parser.has_section(section) or not parser.has_option(section, option):
+                return fallback
+            return parser[section][option]
+
+
+    def get_parser(self, path):
+        """ Return parser of file @path. It must be used only to read values: use set_value to change them """
+
+        with self.lock:
+            return self._get_file(path)['parser']
+
+
+    def set_value(self, path, section, option, value):
+        """ Set @value (str or None) of @option and schedule writing file @path """
+
+        with self.lock:
+            config_file = self._get_file(path)
+            self._set_parser_value(config_file['parser'], section, option, value)
+            config_file['dirty'][(section, option)] = value
+            self._schedule_flush()
+
+
+    def reload(self, path=None):
+        """ Read again file @path (or every file) from disk, keeping changes not written yet """
+
+        with self.lock:
+            paths = [path] if path is not None else list(self.files)
+            for filepath in paths:
+                if filepath in self.files:
+                    self._read_file(filepath, self.files[filepath])
+
+
+    def flush(self, path=None):
+        """ Write changes of file @path (or every file) to disk. Return False if some file has failed """
+
+        with self.flush_lock:
+            with self.lock:
+                if path is None and self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                pending = []
+                paths = [path] if path is not None else list(self.files)
+                for filepath in paths:
+                    config_file = self.files.get(filepath)
+                    if not config_file or not config_file['dirty']:
+                        continue
+                    text = io.StringIO()
+                    config_file['parser'].write(text)
+                    pending.append((filepath, text.getvalue(), dict(config_file['dirty'])))
+                    config_file['dirty'].clear()
+
+            status = True
+            for filepath, text, dirty in pending:
+                try:
+                    self._write_file(filepath, text)
+                except Exception as e:
+                    status = False
+                    with self.lock:
+                        # Keep values, so they are written in the next flush
+                        dirty.update(self.files[filepath]['dirty'])
+                        self.files[filepath]['dirty'] = dirty
+                    if self.on_error:
+                        self.on_error(f"Error writing config file {filepath} [{type(e).__name__}]: {e}")
+            return status
+
+
+    def close(self):
+        """ Write pending changes and forget every file """
+
+        self.flush()
+        with self.lock:
+            self.files.clear()
+
+
+    # region private functions
+
+    def _get_file(self, path):
+        """ Return data of file @path, reading it if not loaded yet or modified by another program """
+
+        config_file = self.files.get(path)
+        if config_file is None:
+            config_file = {'parser': None, 'mtime': None, 'checked': 0, 'dirty': {}}
+            self.files[path] = config_file
+            self._read_file(path, config_file)
+            return config_file
+
+        now = time.monotonic()
+        if now - config_file['checked'] >= self.check_interval:
+            config_file['checked'] = now
+            self.stats['checks'] += 1
+            if self._get_mtime(path) != config_file['mtime']:
+                self._read_file(path, config_file)
+
+        return config_file
+
+
+    def _read_file(self, path, config_file):
+
+        reloaded = config_file['parser'] is not None
+        parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
+        config_file['mtime'] = self._get_mtime(path)
+        config_file['checked'] = time.monotonic()
+        try:
+            parser.read(path)
+        except configparser.Error as e:
+            if self.on_error:
+                self.on_error(f"Error parsing config file {path}: {e}")
+        self.stats['reads'] += 1
+
+        # Apply changes not written yet over the values of the file
+        for (section, option), value in config_file['dirty'].items():
+            self._set_parser_value(parser, section, option, value)
+        config_file['parser'] = parser
+        if reloaded and self.on_reload:
+            self.on_reload(path, parser)
+
+
+    def _write_file(self, path, text):
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.stats['writes'] += 1
+        with self.lock:
+            config_file = self.files.get(path)
+            if config_file is not None:
+                config_file['mtime'] = self._get_mtime(path)
+
+
+    def _set_parser_value(self, parser, section, option, value):
+
+        if not parser.has_section(section):
+            parser.add_section(section)
+        parser.set(section, option, value)
+
+
+    def _schedule_flush(self):
+        """ Write changes @flush_delay seconds after the last one (debounce): a burst of changes is written once """
+
+        self.last_change = time.monotonic()
+        if self.timer is None:
+            self._start_timer(self.flush_delay)
+
+
+    def _start_timer(self, delay):
+
+        self.timer = threading.Timer(delay, self._on_timer)
+        self.timer.daemon = True
+        self.timer.start()
+
+
+    def _on_timer(self):
+
+        with self.lock:
+            remaining = self.last_change + self.flush_delay - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+                return
+            self.timer = None
+        self.flush()
+
+
+    def _get_mtime(self, path):
+
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    # endregion
@@ -5,6 +5,14 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
 from qgis.PyQt.QtSql import QSqlDatabase
 from qgis.core import QgsCredentials, QgsDataSourceUri
 from qgis.PyQt.QtCore import QSettings
@@ -13,6 +21,28 @@ from .. import global_vars
 from . import tools_log, tools_qt, tools_qgis, tools_pgdao, tools_os
 
 
+# Catalog of each schema (functions, tables, views, columns and SRIDs) loaded once from pg_catalog.
+# Used to answer check_function, check_table, check_view, check_column, get_columns_list and get_srid without
+# round trips. Key: schema name. Value: dictionary with its 'sys_version' and catalog objects
+_catalog_cache = {}
+_catalog_lock = threading.Lock()
+
+# Results of lookup queries of tables that rarely change, and of other values stored with get_cached.
+# Ordered from least to most recently used. Key: (schema name, query) or key of get_cached.
+# Value: dictionary with 'expires' (time.monotonic), 'tables' (set of lowercase table names) and 'value'
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+_query_cache_params = {'max_size': 256}
+_query_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+_re_read_tables = re.compile(r'\b(?:FROM|JOIN)\s+((?:"?\w+"?\.)?"?\w+"?)', re.IGNORECASE)
+_re_write_tables = re.compile(r'\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|COPY)\s+'
+                              r'((?:"?\w+"?\.)?"?\w+"?)', re.IGNORECASE)
+
+# Latency, rows and payload statistics of the queries executed by every connection of the session.
+# Shared by all the instances of GwPgDao, so they are kept when connecting again
+_query_stats = tools_pgdao.GwQueryStats(on_slow=tools_log.log_slow_query)
+
+
 def create_list_for_completer(sql):
     """
     Prepare a list with the necessary items for the completer
@@ -53,6 +83,10 @@ def check_table(tablename, schemaname=None):
                 return None
 
     schemaname = schemaname.replace('"', '')
+    catalog = _get_catalog(schemaname)
+    if catalog:
+        return True if tablename in catalog['tables'] else None
+
     sql = "SELECT * FROM pg_tables WHERE schemaname = %s AND tablename = %s"
     params = [schemaname, tablename]
     row = get_row(sql, log_info=False, params=params)
@@ -66,6 +100,10 @@ def check_view(viewname, schemaname=None):
         schemaname = global_vars.schema_name
 
     schemaname = schemaname.replace('"', '')
+    catalog = _get_catalog(schemaname)
+    if catalog:
+        return True if viewname in catalog['views'] else None
+
     sql = ("SELECT * FROM pg_views "
            "WHERE schemaname = %s AND viewname = %s ")
     params = [schemaname, viewname]
@@ -80,6 +118,10 @@ def check_column(tablename, columname, schemaname=None):
         schemaname = global_vars.schema_name
 
     schemaname = schemaname.replace('"', '')
+    catalog = _get_catalog(schemaname)
+    if catalog:
+        return True if columname in catalog['columns'].get(tablename, ()) else None
+
     sql = ("SELECT * FROM information_schema.columns "
            "WHERE table_schema = %s AND table_name = %s AND column_name = %s")
     params = [schemaname, tablename, columname]
@@ -165,6 +207,11 @@ def get_columns_list(tablename, schemaname=None):
         schemaname = global_vars.schema_name
 
     schemaname = schemaname.replace('"', '')
+    catalog = _get_catalog(schemaname)
+    if catalog:
+        columns = catalog['columns'].get(tablename)
+        return [(column_name,) for column_name in columns] if columns else None
+
     sql = ("SELECT column_name FROM information_schema.columns "
            "WHERE table_schema = %s AND table_name = %s "
            "ORDER BY ordinal_position")
@@ -180,6 +227,10 @@ def get_srid(tablename, schemaname=None):
         schemaname = global_vars.schema_name
 
     schemaname = schemaname.replace('"', '')
+    catalog = _get_catalog(schemaname)
+    if catalog and (tablename, 'the_geom') in catalog['srids']:
+        return catalog['srids'][(tablename, 'the_geom')]
+
     srid = None
     sql = "SELECT Find_SRID(%s, %s, 'the_geom');"
     params = [schemaname, tablename]
@@ -193,7 +244,11 @@ def get_srid(tablename, schemaname=None):
 def set_database_connection():
     """ Set database connection """
 
+    # Close auxiliary connections of the previous connection
+    if global_vars.dao:
+        global_vars.dao.close_pool()
     global_vars.dao = None
+    invalidate_query_cache()
     global_vars.session_vars['last_error'] = None
     global_vars.session_vars['logged_status'] = False
     global_vars.current_user = None
@@ -271,6 +326,7 @@ def connect_to_database(host, port, db, user, pwd, sslmode):
 
     # psycopg2 connection
     global_vars.dao = tools_pgdao.GwPgDao()
+    global_vars.dao.stats = _query_stats
     global_vars.dao.set_params(host, port, db, user, pwd, sslmode)
     status = global_vars.dao.init_db()
     tools_log.log_info(f"PostgreSQL PID: {global_vars.dao.pid}")
@@ -312,6 +368,7 @@ def connect_to_database_service(service, sslmode=None):
 
         # psycopg2 connection
         global_vars.dao = tools_pgdao.GwPgDao()
+        global_vars.dao.stats = _query_stats
         global_vars.dao.set_conn_string(conn_string)
         status = global_vars.dao.init_db()
         tools_log.log_info(f"PostgreSQL PID: {global_vars.dao.pid}")
@@ -336,15 +393,25 @@ def get_postgis_version():
     return postgis_version
 
 
-def get_row(sql, log_info=True, log_sql=False, commit=True, params=None, aux_conn=None, is_admin=None):
-    """ Execute SQL. Check its result in log tables, and show it to the user """
+def get_row(sql, log_info=True, log_sql=False, commit=True, params=None, aux_conn=None, is_admin=None,
+            lazy_json=False, cache_ttl=None):
+    """ Execute SQL. Check its result in log tables, and show it to the user.
+    If @lazy_json is True, json values are returned as GwLazyJson (decoded on first access, raw text in 'text').
+    If @cache_ttl is set, result is kept in the query cache for @cache_ttl seconds (see invalidate_query_cache) """
 
     if global_vars.dao is None:
         tools_log.log_warning("The connection to the database is broken.", parameter=sql)
         return None
     sql = _get_sql(sql, log_sql, params)
-    row = global_vars.dao.get_row(sql, commit, aux_conn=aux_conn)
+    if cache_ttl:
+        hit, row = _get_cache_value((global_vars.schema_name, sql))
+        if hit:
+            global_vars.session_vars['last_error'] = None
+            return row
+    row = global_vars.dao.get_row(sql, commit, aux_conn=aux_conn, lazy_json=lazy_json)
     global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    if cache_ttl and global_vars.session_vars['last_error'] is None:
+        _set_cache_value((global_vars.schema_name, sql), row, cache_ttl, _get_tables(sql))
 
     if not row and not is_admin:
         # Check if any error has been raised
@@ -356,16 +423,45 @@ def get_row(sql, log_info=True, log_sql=False, commit=True, params=None, aux_con
     return row
 
 
-def get_rows(sql, log_info=True, log_sql=False, commit=True, params=None, add_empty_row=False):
-    """ Execute SQL. Check its result in log tables, and show it to the user """
+def execute_prepared(function_name, schema_name, body, log_sql=False, commit=True, aux_conn=None):
+    """ Execute database function @function_name through a prepared statement, sending @body (json text) as a
+    bound parameter. Check its result in log tables, and show it to the user """
+
+    if global_vars.dao is None:
+        tools_log.log_warning("The connection to the database is broken.", parameter=function_name)
+        return None
+    if log_sql:
+        tools_log.log_db(f"EXECUTE {function_name}({body})", bold='b', stack_level_increase=1)
+    row = global_vars.dao.execute_prepared(function_name, schema_name, body, commit, aux_conn=aux_conn)
+    global_vars.session_vars['last_error'] = global_vars.dao.last_error
+
+    if not row and global_vars.session_vars['last_error']:
+        tools_qt.manage_exception_db(global_vars.session_vars['last_error'], f"{function_name}({body})")
+
+    return row
+
+
+def get_rows(sql, log_info=True, log_sql=False, commit=True, params=None, add_empty_row=False, lazy_json=False,
+             cache_ttl=None):
+    """ Execute SQL. Check its result in log tables, and show it to the user.
+    If @lazy_json is True, json values are returned as GwLazyJson (decoded on first access, raw text in 'text').
+    If @cache_ttl is set, result is kept in the query cache for @cache_ttl seconds (see invalidate_query_cache) """
 
     if global_vars.dao is None:
         tools_log.log_warning("The connection to the database is broken.", parameter=sql)
         return None
     sql = _get_sql(sql, log_sql, params)
     rows = None
-    rows2 = global_vars.dao.get_rows(sql, commit)
-    global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    hit = False
+    if cache_ttl:
+        hit, rows2 = _get_cache_value((global_vars.schema_name, sql))
+    if hit:
+        global_vars.session_vars['last_error'] = None
+    else:
+        rows2 = global_vars.dao.get_rows(sql, commit, lazy_json=lazy_json)
+        global_vars.session_vars['last_error'] = global_vars.dao.last_error
+        if cache_ttl and global_vars.session_vars['last_error'] is None:
+            _set_cache_value((global_vars.schema_name, sql), rows2, cache_ttl, _get_tables(sql))
     if not rows2:
         # Check if any error has been raised
         if global_vars.session_vars['last_error']:
@@ -382,6 +478,31 @@ def get_rows(sql, log_info=True, log_sql=False, commit=True, params=None, add_em
     return rows
 
 
+def iter_rows(sql, params=None, batch_size=2000, named=False, log_sql=False, aux_conn=None, show_exception=True):
+    """
+    Execute SQL and yield its rows lazily, fetched in chunks through a server-side cursor.
+    Use it instead of get_rows for large result sets (exports, dumps) to keep memory usage flat
+        :param batch_size: Number of rows fetched from the server on each round trip (int)
+        :param named: If True yield namedtuples, else plain tuples (bool)
+        :param aux_conn: Connection used instead of one leased from the pool. Its transaction is left to the caller
+    Errors are shown (if @show_exception) and raised to the consumer, so a truncated result is never taken as a
+    complete one
+    """
+
+    if global_vars.dao is None:
+        tools_log.log_warning("The connection to the database is broken.", parameter=sql)
+        return
+    sql = _get_sql(sql, log_sql, params)
+    try:
+        yield from global_vars.dao.iter_rows(sql, batch_size, named, aux_conn=aux_conn)
+    except Exception as e:
+        global_vars.session_vars['last_error'] = e
+        if show_exception:
+            tools_qt.manage_exception_db(e, sql)
+        raise
+    global_vars.session_vars['last_error'] = None
+
+
 def execute_sql(sql, log_sql=False, log_error=False, commit=True, filepath=None, is_thread=False, show_exception=True):
     """ Execute SQL. Check its result in log tables, and show it to the user """
 
@@ -389,6 +510,8 @@ def execute_sql(sql, log_sql=False, log_error=False, commit=True, filepath=None,
         tools_log.log_db(sql, stack_level_increase=1)
     result = global_vars.dao.execute_sql(sql, commit)
     global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    if _query_cache:
+        invalidate_query_cache(_get_tables(sql, _re_write_tables))
     if not result:
         if log_error:
             tools_log.log_info(sql, stack_level_increase=1)
@@ -399,6 +522,67 @@ def execute_sql(sql, log_sql=False, log_error=False, commit=True, filepath=None,
     return True
 
 
+def bulk_insert(table, columns, rows, method='copy', chunk_size=None, commit=True, aux_conn=None, is_thread=False,
+                show_exception=True):
+    """
+    Insert multiple rows in a few round trips. Check its result and show it to the user
+        :param table: Name of the table, optionally qualified with its schema (string)
+        :param columns: Names of the columns to fill (list)
+        :param rows: Values of each row in the same order as @columns (iterable of tuples)
+        :param method: 'copy' (COPY FROM STDIN) or 'values' (INSERT ... VALUES with execute_values)
+        :return: Number of inserted rows or None if failed (int)
+    """
+
+    if global_vars.dao is None:
+        tools_log.log_warning("The connection to the database is broken.", parameter=table)
+        return None
+    count = global_vars.dao.bulk_insert(table, columns, rows, method, chunk_size, commit, aux_conn)
+    global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    if _query_cache:
+        invalidate_query_cache(_get_tables(f"INSERT INTO {table}", _re_write_tables))
+    if count is None:
+        if show_exception and not is_thread:
+            tools_qt.manage_exception_db(global_vars.session_vars['last_error'], f"INSERT INTO {table}")
+        return None
+
+    return count
+
+
+def export_to_csv(sql, path, params=None, delimiter=',', encoding='utf-8', null_string='', header=True, append=False,
+                  skip_empty=False, log_sql=False, show_exception=True):
+    """
+    Export the result of the query into CSV file @path. Rows are streamed from the server straight to disk,
+    into a temporary file that only replaces (or is appended to) @path if the export succeeds
+        :param append: If True, add rows at the end of the file instead of overwriting it (bool)
+        :param skip_empty: If True, @path is not written when the query returns no rows (bool)
+        :return: Number of exported rows or None if failed (int)
+    """
+
+    if global_vars.dao is None:
+        tools_log.log_warning("The connection to the database is broken.", parameter=sql)
+        return None
+    sql = _get_sql(sql, log_sql, params)
+    fd, tmp_path = tempfile.mkstemp(suffix='.csv', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as csv_file:
+            rows = global_vars.dao.export_to_csv(sql, csv_file, delimiter, encoding, null_string, header)
+        if rows is None or (rows == 0 and skip_empty):
+            pass
+        elif append:
+            with open(tmp_path, 'rb') as tmp_file, open(path, 'ab') as csv_file:
+                shutil.copyfileobj(tmp_file, csv_file)
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    if rows is None and show_exception:
+        tools_qt.manage_exception_db(global_vars.session_vars['last_error'], sql)
+
+    return rows
+
+
 def cancel_pid(pid):
     """ Cancel one process by pid """
     return global_vars.dao.cancel_pid(pid)
@@ -411,6 +595,8 @@ def execute_returning(sql, log_sql=False, log_error=False, commit=True):
         tools_log.log_db(sql, stack_level_increase=1)
     value = global_vars.dao.execute_returning(sql, commit)
     global_vars.session_vars['last_error'] = global_vars.dao.last_error
+    if _query_cache:
+        invalidate_query_cache(_get_tables(sql, _re_write_tables))
     if not value:
         if log_error:
             tools_log.log_info(sql, stack_level_increase=1)
@@ -426,6 +612,9 @@ def set_search_path(schema_name):
     sql = f"SET search_path = {schema_name}, public;"
     execute_sql(sql)
     global_vars.dao.set_search_path = sql
+    # Open pool connections with the new 'search_path' before tasks ask for them
+    if not global_vars.dao.init_pool():
+        tools_log.log_warning(f"Error initializing connection pool: {global_vars.dao.last_error}")
 
 
 def check_function(function_name, schema_name=None, commit=True, aux_conn=None):
@@ -435,6 +624,10 @@ def check_function(function_name, schema_name=None, commit=True, aux_conn=None):
         schema_name = global_vars.schema_name
 
     schema_name = schema_name.replace('"', '')
+    catalog = _get_catalog(schema_name, commit=commit, aux_conn=aux_conn)
+    if catalog:
+        return True if function_name in catalog['functions'] else None
+
     sql = (f"SELECT routine_name "
            f"FROM information_schema.routines "
            f"WHERE lower(routine_schema) = '{schema_name}' "
@@ -443,6 +636,127 @@ def check_function(function_name, schema_name=None, commit=True, aux_conn=None):
     return row
 
 
+def reload_catalog_cache(schema_name=None):
+    """ Invalidate catalog cache of @schema_name (or of all schemas if None). It will be loaded again on next check """
+
+    with _catalog_lock:
+        if schema_name is None:
+            _catalog_cache.clear()
+        else:
+            _catalog_cache.pop(schema_name.replace('"', ''), None)
+
+
+def check_catalog_version(schema_name, sys_version):
+    """ Invalidate catalog cache of @schema_name if it was loaded with a version different from @sys_version """
+
+    schema_name = schema_name.replace('"', '')
+    with _catalog_lock:
+        catalog = _catalog_cache.get(schema_name)
+        if catalog and catalog['sys_version'] != sys_version:
+            _catalog_cache.pop(schema_name, None)
+
+
+def get_cached(key, function, ttl=300, tables=None, cache_none=False):
+    """ Return value stored in the query cache with @key. If not found or expired, get it calling @function() and
+    store it for @ttl seconds. It will be invalidated when any of @tables is invalidated.
+    None values are only stored if @cache_none is True """
+
+    hit, value = _get_cache_value(key)
+    if hit:
+        return value
+    value = function()
+    if value is not None or cache_none:
+        _set_cache_value(key, value, ttl, tables)
+    return value
+
+
+def invalidate_query_cache(tables=None):
+    """ Remove from the query cache the results that depend on @tables (table name or list of names, with or
+    without schema). If @tables is None, remove all of them """
+
+    if isinstance(tables, str):
+        tables = [tables]
+    with _query_cache_lock:
+        if tables is None:
+            _query_cache_stats['invalidations'] += len(_query_cache)
+            _query_cache.clear()
+            return
+        tables = {table.replace('"', '').split('.')[-1].lower() for table in tables}
+        if not tables:
+            return
+        for key in [key for key, item in _query_cache.items() if item['tables'] & tables]:
+            del _query_cache[key]
+            _query_cache_stats['invalidations'] += 1
+
+
+def get_query_cache_stats():
+    """ Return dictionary with number of 'hits', 'misses', 'evictions', 'invalidations' and current 'size' """
+
+    with _query_cache_lock:
+        stats = dict(_query_cache_stats)
+        stats['size'] = len(_query_cache)
+    return stats
+
+
+def set_query_cache_params(max_size=None):
+    """ Set maximum number of results kept in the query cache """
+
+    try:
+        _query_cache_params['max_size'] = max(int(max_size), 0)
+    except (TypeError, ValueError):
+        return
+    with _query_cache_lock:
+        while len(_query_cache) > _query_cache_params['max_size']:
+            _query_cache.popitem(last=False)
+            _query_cache_stats['evictions'] += 1
+
+
+def get_query_stats(order_by='total', limit=None):
+    """ Return list of dictionaries with the statistics of the executed queries, grouped by function or statement:
+    'name', 'count', 'total', 'mean', 'p50', 'p95', 'p99', 'max' (milliseconds), 'rows', 'bytes' and 'slow' """
+
+    return _query_stats.get_report(order_by, limit)
+
+
+def get_query_totals():
+    """ Return number of executed queries, their total time (milliseconds) and bytes received (dict) """
+
+    return _query_stats.get_totals()
+
+
+def is_query_stats_enabled():
+    """ Return True if statistics of the executed queries are collected (user parameter 'log_query_stats') """
+
+    return _query_stats.enabled
+
+
+def reset_query_stats():
+    """ Remove the statistics of the executed queries """
+
+    _query_stats.reset()
+
+
+def set_query_stats_params(enabled=True, slow_threshold=None):
+    """ Enable or disable the statistics of the executed queries and set threshold (milliseconds) of the
+    slow query log. If @slow_threshold is None, slow queries are not logged """
+
+    try:
+        slow_threshold = float(slow_threshold)
+    except (TypeError, ValueError):
+        slow_threshold = None
+    _query_stats.enabled = enabled
+    _query_stats.slow_threshold = slow_threshold
+
+
+def set_json_codec(codec='auto'):
+    """ Set decoder of the json values received from the database: 'orjson', 'ujson', 'json' or 'auto' """
+
+    selected = tools_pgdao.set_json_codec(codec)
+    if codec not in (None, 'auto') and selected != codec:
+        tools_log.log_info(f"JSON decoder '{codec}' not installed. Using '{selected}'")
+    return selected
+
+
 def connect_to_database_credentials(credentials, conn_info=None, max_attempts=2):
     """ Connect to database with selected database @credentials """
 
@@ -573,6 +887,138 @@ def get_uri():
 # region private functions
 
 
+def _get_catalog(schema_name, commit=True, aux_conn=None):
+    """ Return catalog of @schema_name, loading it from database the first time. Return None if it can't be loaded """
+
+    if schema_name in (None, 'null', '') or global_vars.dao is None:
+        return None
+
+    catalog = _catalog_cache.get(schema_name)
+    if catalog:
+        return catalog
+
+    with _catalog_lock:
+        catalog = _catalog_cache.get(schema_name)
+        if catalog is None:
+            catalog = _load_catalog(schema_name, commit, aux_conn)
+            if catalog:
+                _catalog_cache[schema_name] = catalog
+
+    return catalog
+
+
+def _load_catalog(schema_name, commit=True, aux_conn=None):
+    """ Load functions, relations, columns and SRIDs of @schema_name from pg_catalog """
+
+    dao = global_vars.dao
+    catalog = {'sys_version': None, 'functions': set(), 'tables': set(), 'views': set(), 'columns': {}, 'srids': {}}
+
+    sql = dao.mogrify("SELECT oid FROM pg_namespace WHERE nspname = %s", [schema_name])
+    rows = dao.get_rows(sql, commit=commit, aux_conn=aux_conn)
+    if not rows:
+        return None
+    schema_oid = rows[0][0]
+
+    sql = f"SELECT DISTINCT lower(proname) FROM pg_proc WHERE pronamespace = {schema_oid}"
+    rows = dao.get_rows(sql, commit=commit, aux_conn=aux_conn)
+    if rows is None:
+        return None
+    catalog['functions'] = {row[0] for row in rows}
+
+    sql = (f"SELECT c.relname, c.relkind, a.attname "
+           f"FROM pg_class c "
+           f"LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped "
+           f"WHERE c.relnamespace = {schema_oid} AND c.relkind IN ('r', 'p', 'v', 'm', 'f') "
+           f"ORDER BY c.relname, a.attnum")
+    rows = dao.get_rows(sql, commit=commit, aux_conn=aux_conn)
+    if rows is None:
+        return None
+    for relname, relkind, attname in rows:
+        if relkind in ('r', 'p'):
+            catalog['tables'].add(relname)
+        elif relkind == 'v':
+            catalog['views'].add(relname)
+        columns = catalog['columns'].setdefault(relname, [])
+        if attname is not None:
+            columns.append(attname)
+
+    # View geometry_columns only exists if PostGIS is installed
+    rows = dao.get_rows("SELECT to_regclass('geometry_columns')", commit=commit, aux_conn=aux_conn)
+    if rows and rows[0][0]:
+        sql = dao.mogrify("SELECT f_table_name, f_geometry_column, srid FROM geometry_columns "
+                          "WHERE f_table_schema = %s", [schema_name])
+        rows = dao.get_rows(sql, commit=commit, aux_conn=aux_conn)
+        if rows:
+            catalog['srids'] = {(row[0], row[1]): row[2] for row in rows}
+
+    if 'sys_version' in catalog['tables']:
+        sql = f'SELECT giswater FROM "{schema_name}".sys_version ORDER BY id DESC LIMIT 1'
+        rows = dao.get_rows(sql, commit=commit, aux_conn=aux_conn)
+        if rows:
+            catalog['sys_version'] = rows[0][0]
+
+    tools_log.log_info(f"Catalog cache loaded for schema '{schema_name}' (version {catalog['sys_version']})")
+    return catalog
+
+
+def _get_cache_value(key):
+    """ Return tuple (True, value) if @key is in the query cache and has not expired, otherwise (False, None) """
+
+    with _query_cache_lock:
+        item = _query_cache.get(key)
+        if item is None or item['expires'] < time.monotonic():
+            if item is not None:
+                del _query_cache[key]
+            _query_cache_stats['misses'] += 1
+            return False, None
+        _query_cache.move_to_end(key)
+        _query_cache_stats['hits'] += 1
+        value = item['value']
+
+    return True, _copy_value(value)
+
+
+def _set_cache_value(key, value, ttl, tables=None):
+
+    if _query_cache_params['max_size'] <= 0:
+        return
+    if isinstance(tables, str):
+        tables = [tables]
+    tables = {table.replace('"', '').split('.')[-1].lower() for table in tables or []}
+    value = _copy_value(value)
+    with _query_cache_lock:
+        _query_cache[key] = {'expires': time.monotonic() + float(ttl), 'tables': tables, 'value': value}
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > _query_cache_params['max_size']:
+            _query_cache.popitem(last=False)
+            _query_cache_stats['evictions'] += 1
+
+
+def _copy_value(value):
+    """ Return a copy of @value if it is a list of rows or a row, so callers can modify it without modifying the cache.
+    Rows keep their type: rows of DictCursor (psycopg2.extras.DictRow) are still readable by column name """
+
+    if not isinstance(value, list):
+        return value
+    if type(value) is list:
+        return [_copy_value(item) for item in value]
+
+    row = type(value).__new__(type(value))
+    if hasattr(value, '__setstate__'):
+        row.__setstate__(value.__getstate__())
+    else:
+        row.extend(value)
+    return row
+
+
+def _get_tables(sql, regex=_re_read_tables):
+    """ Return names of the tables read (or written, depending on @regex) by @sql """
+
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    return [match.group(1) for match in regex.finditer(sql)]
+
+
 def _get_sql(sql, log_sql=False, params=None):
     """ Generate SQL with params. Useful for debugging """
 
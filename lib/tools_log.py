@@ -5,9 +5,15 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import datetime
+import gzip
 import logging
-import inspect
+import logging.handlers
 import os
+import queue
+import shutil
+import sys
+import threading
 import time
 import json
 
@@ -17,6 +23,17 @@ from .. import global_vars
 from . import tools_qt, tools_os
 
 
+_slow_query_logger = None       # Instance of class GwLogger used to write the slow query log file
+_slow_query_lock = threading.Lock()
+_log_folders = {}               # Key: normalized path of a log folder. Value: instance of class GwLogFolder
+_log_folders_lock = threading.Lock()
+_log_rotation_params = {'max_file_bytes': 20 * 1024 * 1024, 'max_folder_bytes': 500 * 1024 * 1024, 'max_days': 30}
+_log_extensions = ('.log', '.jsonl', '.log.gz', '.jsonl.gz')    # Files of log folders removed by retention policy
+_trace_logger = None            # Instance of class GwTraceLogger used to write the trace log file
+_trace_lock = threading.Lock()
+_trace_params = {'enabled': False, 'action': None, 'session': None}
+
+
 class GwLogger(object):
 
     def __init__(self, log_name, log_level, log_suffix, folder_has_tstamp=False, file_has_tstamp=True,
@@ -26,6 +43,7 @@ class GwLogger(object):
         self.logger_file = logging.getLogger(log_name)
         self.logger_file.setLevel(int(log_level))
         self.min_log_level = int(log_level)
+        self.min_message_level = 0
         self.log_limit_characters = None
         self.log_db_limit_characters = None
         self.tab_python = f"{global_vars.plugin_name.capitalize()} PY"
@@ -41,11 +59,10 @@ class GwLogger(object):
             os.makedirs(log_folder)
 
         # Define filename
-        filepath = log_folder + log_name
-        if file_has_tstamp:
-            tstamp = str(time.strftime(log_suffix))
-            filepath += "_" + tstamp
-        filepath += ".log"
+        self.log_folder = log_folder
+        self.log_name = log_name
+        self.log_suffix = log_suffix if file_has_tstamp else None
+        filepath = self.get_filepath()
 
         log_info(f"Log file: {filepath}", logger_file=False, tab_name=self.tab_python)
         if remove_previous and os.path.exists(filepath):
@@ -83,21 +100,27 @@ class GwLogger(object):
 
 
     def add_file_handler(self):
-        """ Add file handler """
+        """ Add file handler. Records are queued and written to file by a background thread (QueueListener),
+        so logging never waits for the disk """
 
         log_format = '%(asctime)s [%(levelname)s] - %(message)s\n'
         log_date = '%d/%m/%Y %H:%M:%S'
         formatter = logging.Formatter(log_format, log_date)
-        self.fh = logging.FileHandler(self.filepath)
+        self.fh = GwLogFileHandler(self.filepath, get_log_folder(self.log_folder), self.get_filepath)
         self.fh.setFormatter(formatter)
-        self.logger_file.addHandler(self.fh)
+        log_queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, self.fh)
+        self.listener.start()
+        self.logger_file.addHandler(self.queue_handler)
 
 
     def close_logger(self):
-        """ Remove file handler """
+        """ Remove file handler, writing pending records """
 
         try:
-            self.logger_file.removeHandler(self.fh)
+            self.logger_file.removeHandler(self.queue_handler)
+            self.listener.stop()
             self.fh.flush()
             self.fh.close()
             del self.fh
@@ -105,6 +128,22 @@ class GwLogger(object):
             pass
 
 
+    def get_filepath(self):
+        """ Return path of the log file for current date. When date changes, log file handler switches to a new file """
+
+        filepath = self.log_folder + self.log_name
+        if self.log_suffix:
+            tstamp = str(time.strftime(self.log_suffix))
+            filepath += "_" + tstamp
+        filepath += ".log"
+        return filepath
+
+
+    def is_enabled(self, log_level):
+        """ Return True if messages of @log_level are written into logger file """
+        return log_level >= self.min_log_level
+
+
     def debug(self, msg=None, stack_level=2, stack_level_increase=0):
         """ Logger message into logger file with level DEBUG (10) """
         self._log(msg, logging.DEBUG, stack_level + stack_level_increase + 1)
@@ -145,12 +184,16 @@ class GwLogger(object):
             if log_level < self.min_log_level:
                 return
 
-            if stack_level >= len(inspect.stack()):
-                stack_level = len(inspect.stack()) - 1
-            module_path = inspect.stack()[stack_level][1]
-            file_name = os.path.basename(module_path)
-            function_line = inspect.stack()[stack_level][2]
-            function_name = inspect.stack()[stack_level][3]
+            # Get caller from the frame object: unlike inspect.stack(), it doesn't read source code of every frame
+            frame = sys._getframe(1)
+            for i in range(stack_level - 1):
+                if frame.f_back is None:
+                    break
+                frame = frame.f_back
+            file_name = os.path.basename(frame.f_code.co_filename)
+            function_line = frame.f_lineno
+            function_name = frame.f_code.co_name
+            del frame
             header = "{" + file_name + " | Line " + str(function_line) + " (" + str(function_name) + ")}"
             text = header
             if msg:
@@ -163,6 +206,243 @@ class GwLogger(object):
             log_warning(f"Error logging: {e}", logger_file=False)
 
 
+class GwLogFolder(object):
+
+    def __init__(self, folder):
+        """
+        Manage size of log folder @folder. Its size is computed once and then updated as files are written,
+        rolled over, compressed and removed, so it never needs to be recomputed walking the folder.
+        Rolled files are compressed with gzip and retention policy is applied by a background thread, that runs
+        these tasks one after the other so two of them never handle the same file
+        """
+
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.active_files = set()
+        self.tasks = queue.Queue()
+        self.worker = None
+        self.size = tools_os.get_folder_size(folder)
+        self._start_maintenance()
+
+
+    def add_size(self, size):
+
+        with self.lock:
+            self.size += size
+
+
+    def roll_over(self, filepath):
+        """ Compress @filepath (not written anymore) and apply retention policy in a background thread """
+        self._start_maintenance([filepath])
+
+
+    def check_retention(self):
+        """ Apply retention policy in a background thread """
+        self._start_maintenance([])
+
+
+    def apply_retention(self):
+        """ Remove log files older than 'max_days' and then the oldest ones while folder exceeds 'max_folder_bytes'.
+        Files written by a logger and files that are not log files (i.e. startup_history.json) are kept """
+
+        max_days = _log_rotation_params['max_days']
+        max_folder_bytes = _log_rotation_params['max_folder_bytes']
+        files = []
+        for filepath in self._get_files():
+            if filepath in self.active_files or not filepath.endswith(_log_extensions) or not os.path.isfile(filepath):
+                continue
+            stat = os.stat(filepath)
+            files.append((stat.st_mtime, filepath, stat.st_size))
+
+        files.sort()
+        limit_time = time.time() - max_days * 86400 if max_days else None
+        for mtime, filepath, size in files:
+            if not (limit_time and mtime < limit_time) and not (max_folder_bytes and self.size > max_folder_bytes):
+                break
+            try:
+                os.remove(filepath)
+                self.add_size(-size)
+            except OSError:
+                pass
+
+
+    # region private functions
+
+    def _start_maintenance(self, rolled_files=None):
+
+        with self.lock:
+            self.tasks.put(rolled_files)
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run_worker, daemon=True)
+                self.worker.start()
+
+
+    def _run_worker(self):
+        """ Run maintenance tasks in order of arrival """
+
+        while True:
+            self._maintenance(self.tasks.get())
+            self.tasks.task_done()
+
+
+    def _get_files(self):
+        """ Return path of every file of the log folder, including the ones of its subfolders """
+
+        for folder, subfolders, files in os.walk(self.folder):
+            for file in files:
+                yield os.path.join(folder, file)
+
+
+    def _maintenance(self, rolled_files=None):
+
+        try:
+            if rolled_files is None:
+                # First time: compress files of previous days. Today files may be written again by this session
+                today = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+                rolled_files = [filepath for filepath in self._get_files()
+                                if filepath.endswith(('.log', '.jsonl')) and os.path.getmtime(filepath) < today]
+            for filepath in rolled_files:
+                if filepath not in self.active_files:
+                    self._compress(filepath)
+            self.apply_retention()
+        except Exception as e:
+            log_warning(f"Error managing log folder: {e}", logger_file=False)
+
+
+    def _compress(self, filepath):
+
+        if not os.path.isfile(filepath):
+            return
+        size = os.path.getsize(filepath)
+        gz_filepath = f"{filepath}.gz"
+        gz_size = os.path.getsize(gz_filepath) if os.path.exists(gz_filepath) else 0
+        # Append mode: if there is already a compressed file with this name, file is added as a new gzip member
+        with open(filepath, 'rb') as f_in, gzip.open(gz_filepath, 'ab') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(filepath)
+        self.add_size(os.path.getsize(gz_filepath) - gz_size - size)
+
+    # endregion
+
+
+class GwLogFileHandler(logging.FileHandler):
+
+    def __init__(self, filepath, log_folder, get_filepath=None):
+        """
+        File handler that rolls over its file when it exceeds 'max_file_bytes' or when @get_filepath returns a
+        different path (i.e. date has changed). Rolled files are compressed by @log_folder (GwLogFolder)
+        """
+
+        logging.FileHandler.__init__(self, filepath)
+        self.log_folder = log_folder
+        self.get_filepath = get_filepath
+        self.file_size = self.stream.tell() if self.stream else 0
+        self.log_folder.active_files.add(self.baseFilename)
+
+
+    def emit(self, record):
+
+        try:
+            self._check_rollover()
+        except Exception:
+            self.handleError(record)
+        logging.FileHandler.emit(self, record)
+        if self.stream:
+            position = self.stream.tell()
+            self.log_folder.add_size(position - self.file_size)
+            self.file_size = position
+
+
+    def close(self):
+
+        self.log_folder.active_files.discard(self.baseFilename)
+        logging.FileHandler.close(self)
+
+
+    # region private functions
+
+    def _check_rollover(self):
+
+        new_filepath = os.path.abspath(self.get_filepath()) if self.get_filepath else self.baseFilename
+        if new_filepath != self.baseFilename:
+            # New day: previous file is compressed and new records go to a new file
+            self._close_stream()
+            self.log_folder.active_files.discard(self.baseFilename)
+            self.log_folder.roll_over(self.baseFilename)
+            self.baseFilename = new_filepath
+            self.log_folder.active_files.add(new_filepath)
+        elif _log_rotation_params['max_file_bytes'] and self.file_size >= _log_rotation_params['max_file_bytes']:
+            # File too big: rename it with the first free number, i.e. giswater_20240101.1.log
+            self._close_stream()
+            root, extension = os.path.splitext(self.baseFilename)
+            index = 1
+            while os.path.exists(f"{root}.{index}{extension}") or os.path.exists(f"{root}.{index}{extension}.gz"):
+                index += 1
+            rolled_filepath = f"{root}.{index}{extension}"
+            os.rename(self.baseFilename, rolled_filepath)
+            self.log_folder.roll_over(rolled_filepath)
+
+
+    def _close_stream(self):
+
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.file_size = 0
+
+    # endregion
+
+
+class GwTraceLogger(object):
+
+    def __init__(self, log_name, buffer_capacity=100):
+        """
+        Write events as json lines (a json object per line) into file {log_name}_YYYYMMDD.jsonl of log folder.
+        Lines are buffered and written by a background thread, @buffer_capacity lines at once.
+        Files are rolled over, compressed and removed as the other log files (see GwLogFileHandler)
+        """
+
+        self.logger_file = logging.getLogger(log_name)
+        self.logger_file.setLevel(logging.INFO)
+        self.logger_file.propagate = False
+        self.log_name = log_name
+        main_folder = os.path.join(tools_os.get_datadir(), global_vars.user_folder_dir)
+        self.log_folder = f"{main_folder}{os.sep}core{os.sep}log{os.sep}"
+        if not os.path.exists(self.log_folder):
+            os.makedirs(self.log_folder)
+        self.filepath = self.get_filepath()
+
+        self.fh = GwLogFileHandler(self.filepath, get_log_folder(self.log_folder), self.get_filepath)
+        self.fh.setFormatter(logging.Formatter('%(message)s'))
+        self.buffer = logging.handlers.MemoryHandler(buffer_capacity, logging.CRITICAL, self.fh)
+        log_queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, self.buffer)
+        self.listener.start()
+        self.logger_file.addHandler(self.queue_handler)
+
+
+    def get_filepath(self):
+        return f"{self.log_folder}{self.log_name}_{time.strftime('%Y%m%d')}.jsonl"
+
+
+    def write(self, event):
+        """ Write @event (dict) as a json line """
+        self.logger_file.info(json.dumps(event, default=str))
+
+
+    def close_logger(self):
+        """ Remove handlers, writing pending lines """
+
+        try:
+            self.logger_file.removeHandler(self.queue_handler)
+            self.listener.stop()
+            self.buffer.close()
+            self.fh.close()
+        except Exception:
+            pass
+
+
 def set_logger(logger_name, min_log_level=20):
     """ Set logger class. This class will generate new logger file """
 
@@ -173,9 +453,140 @@ def set_logger(logger_name, min_log_level=20):
         global_vars.logger.min_message_level = values.get(int(min_log_level), 0)
 
 
+def log_slow_query(name, elapsed, rows=None, size=None, sql=None):
+    """ Write query that took @elapsed milliseconds into the slow query log file. It can be called from any thread """
+
+    global _slow_query_logger
+    try:
+        with _slow_query_lock:
+            if _slow_query_logger is None:
+                _slow_query_logger = GwLogger(f"{global_vars.plugin_name}_slow_query", logging.INFO, '%Y%m%d')
+        text = f"{name} | {elapsed:.1f} ms | rows: {rows} | bytes: {size}"
+        if sql:
+            if isinstance(sql, bytes):
+                sql = sql.decode('utf-8', 'replace')
+            text += f"\n{sql[:2000]}"
+        _slow_query_logger.logger_file.info(text)
+    except Exception as e:
+        log_warning(f"Error logging slow query: {e}", logger_file=False)
+
+
+def close_slow_query_logger():
+    """ Remove file handler of the slow query log file """
+
+    global _slow_query_logger
+    with _slow_query_lock:
+        if _slow_query_logger is not None:
+            _slow_query_logger.close_logger()
+            _slow_query_logger = None
+
+
+def get_slow_query_filepath():
+    """ Return path of the slow query log file, or None if no slow query has been logged yet """
+
+    if _slow_query_logger is None:
+        return None
+    return _slow_query_logger.fh.baseFilename
+
+
+def get_log_folder(folder):
+    """ Return instance of GwLogFolder that manages @folder """
+
+    key = os.path.normcase(os.path.abspath(folder))
+    with _log_folders_lock:
+        if key not in _log_folders:
+            _log_folders[key] = GwLogFolder(os.path.abspath(folder))
+        return _log_folders[key]
+
+
+def get_log_folder_size(folder):
+    """ Return size (bytes) of files of @folder. If it is managed by a logger its size is known without walking it """
+
+    log_folder = _log_folders.get(os.path.normcase(os.path.abspath(folder)))
+    if log_folder is None:
+        return tools_os.get_folder_size(folder)
+    return log_folder.size
+
+
+def set_log_rotation_params(max_file_mb=None, max_folder_mb=None, max_days=None):
+    """ Set rotation of log files: maximum size of a file, maximum size of log folder and maximum age of files.
+    Zero or negative values disable the corresponding limit """
+
+    for key, value, factor in (('max_file_bytes', max_file_mb, 1024 * 1024),
+                               ('max_folder_bytes', max_folder_mb, 1024 * 1024), ('max_days', max_days, 1)):
+        try:
+            _log_rotation_params[key] = max(int(float(value) * factor), 0)
+        except (TypeError, ValueError):
+            pass
+
+    with _log_folders_lock:
+        for log_folder in _log_folders.values():
+            log_folder.check_retention()
+
+
+def set_trace_params(enabled=None, session=None):
+    """ Enable or disable trace log file (json lines). Values of @session (dict), like plugin version, are written
+    in the first line of each session, so traces of different versions can be compared """
+
+    if enabled is not None:
+        _trace_params['enabled'] = enabled
+    if session is not None:
+        _trace_params['session'] = session
+    if not _trace_params['enabled']:
+        close_trace_logger()
+
+
+def is_trace_enabled():
+    return _trace_params['enabled']
+
+
+def set_trace_action(action_name, *args):
+    """ Set @action_name (i.e. button clicked) as current action of next trace events. Arguments of signals are ignored """
+
+    _trace_params['action'] = action_name
+    log_trace('action')
+
+
+def log_trace(event, **fields):
+    """ Write @event with @fields into the trace log file, if enabled. It can be called from any thread
+        :param event: Type of event (i.e. 'db_function', 'dialog_open', 'task_finished') (String)
+        :param fields: Values of the event (i.e. name, duration in milliseconds, rows, bytes, outcome)
+    """
+
+    global _trace_logger
+    if not _trace_params['enabled']:
+        return
+
+    try:
+        with _trace_lock:
+            if _trace_logger is None:
+                _trace_logger = GwTraceLogger(f"{global_vars.plugin_name}_trace")
+                session = {'ts': datetime.datetime.now().isoformat(timespec='milliseconds'), 'event': 'session'}
+                session.update(_trace_params['session'] or {})
+                _trace_logger.write(session)
+        record = {'ts': datetime.datetime.now().isoformat(timespec='milliseconds'), 'event': event,
+                  'action': _trace_params['action'], 'thread': threading.current_thread().name}
+        record.update(fields)
+        _trace_logger.write(record)
+    except Exception as e:
+        log_warning(f"Error writing trace log: {e}", logger_file=False)
+
+
+def close_trace_logger():
+    """ Write pending lines and remove handlers of the trace log file """
+
+    global _trace_logger
+    with _trace_lock:
+        if _trace_logger is not None:
+            _trace_logger.close_logger()
+            _trace_logger = None
+
+
 def log_debug(text=None, context_name=None, parameter=None, logger_file=True, stack_level_increase=0, tab_name=None):
     """ Write debug message into QGIS Log Messages Panel """
 
+    if not _is_log_enabled(0, logging.DEBUG, logger_file):
+        return
     msg = _qgis_log_message(text, 0, context_name, parameter, tab_name)
     if global_vars.logger and logger_file:
         global_vars.logger.debug(msg, stack_level_increase=stack_level_increase)
@@ -184,6 +595,8 @@ def log_debug(text=None, context_name=None, parameter=None, logger_file=True, st
 def log_info(text=None, context_name=None, parameter=None, logger_file=True, stack_level_increase=0, tab_name=None):
     """ Write information message into QGIS Log Messages Panel """
 
+    if not _is_log_enabled(0, logging.INFO, logger_file):
+        return
     msg = _qgis_log_message(text, 0, context_name, parameter, tab_name)
     if global_vars.logger and logger_file:
         global_vars.logger.info(msg, stack_level_increase=stack_level_increase)
@@ -209,6 +622,8 @@ def log_db(text=None, color="black", bold='', header="SERVER EXECUTION", message
         stack_level_increase=0):
     """ Write information message into QGIS Log Messages Panel (tab Giswater DB) """
 
+    if not _is_log_enabled(message_level, logging.INFO, logger_file):
+        return
     if type(text) is dict:
         text = json.dumps(text)
 
@@ -228,6 +643,16 @@ def log_db(text=None, color="black", bold='', header="SERVER EXECUTION", message
         global_vars.logger.info(text, stack_level_increase=stack_level_increase)
 
 
+def _is_log_enabled(message_level, log_level, logger_file=True):
+    """ Check if a message would be shown in QGIS Log Messages Panel or written into logger file.
+    If not, it can be discarded before translating or formatting it """
+
+    logger = global_vars.logger
+    if logger is None:
+        return False
+    return message_level >= logger.min_message_level or (logger_file and logger.is_enabled(log_level))
+
+
 def _qgis_log_message(text=None, message_level=0, context_name=None, parameter=None, tab_name=None):
     """
     Write message into QGIS Log Messages Panel with selected message level
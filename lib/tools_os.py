@@ -119,16 +119,17 @@ def check_python_function(module, function_name):
 
 
 def get_folder_size(folder):
-    """ Get folder size """
+    """ Get folder size, including files of its subfolders """
 
     if not os.path.exists(folder):
         return 0
 
     size = 0
-    for file in os.listdir(folder):
-        filepath = os.path.join(folder, file)
-        if os.path.isfile(filepath):
-            size += os.path.getsize(filepath)
+    for subfolder, subfolders, files in os.walk(folder):
+        for file in files:
+            filepath = os.path.join(subfolder, file)
+            if os.path.isfile(filepath):
+                size += os.path.getsize(filepath)
 
     return size
 
@@ -5,8 +5,531 @@ General Public License as published by the Free Software Foundation, either vers
 or (at your option) any later version.
 """
 # -*- coding: utf-8 -*-
+import collections.abc
+import io
+import itertools
+import json
+import math
+import re
+import threading
+import time
+import weakref
+
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2 import sql as pgsql
+
+
+_cursor_names = itertools.count(1)      # Counter used to give a unique name to server-side cursors
+_payload = threading.local()            # Size of the JSON payload decoded by the current thread
+_json_codec = 'json'                    # Name of the module used to decode and encode json values. See set_json_codec
+_json_loads = json.loads
+_json_dumps = None
+_re_function = re.compile(r'\b(gw_(?:fct|trg|api)_\w+)\s*\(', re.IGNORECASE)
+_re_table = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+((?:"?\w+"?\.)?"?\w+"?)', re.IGNORECASE)
+
+
+class GwLazyJson(collections.abc.Mapping):
+    """ json/jsonb value decoded the first time it is accessed. Attribute 'text' keeps the text received from the
+    server, so it can be written or forwarded without being decoded and encoded again.
+    It only behaves as a mapping when the value is a json object: arrays and scalars are read from 'value' or 'text' """
+
+    __slots__ = ('text', '_value', '_decoded')
+
+    def __init__(self, text):
+
+        self.text = text
+        self._value = None
+        self._decoded = False
+
+
+    @property
+    def value(self):
+        """ Decoded value (dict or list) """
+
+        if not self._decoded:
+            self._value = _json_loads(self.text)
+            self._decoded = True
+        return self._value
+
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+
+    def __iter__(self):
+        return iter(self._get_mapping())
+
+
+    def __len__(self):
+        return len(self._get_mapping())
+
+
+    def __str__(self):
+        return self.text
+
+
+    def __repr__(self):
+        return f"GwLazyJson({self.text[:50]!r})"
+
+
+    def _get_mapping(self):
+
+        value = self.value
+        if not isinstance(value, dict):
+            raise TypeError(f"json {type(value).__name__} is not a mapping, use attribute 'value' or 'text'")
+        return value
+
+
+class GwQueryStats(object):
+    """ Thread-safe latency, rows and payload statistics of executed queries, grouped by statement name.
+    Percentiles are computed over the last @max_samples executions of each statement """
+
+    def __init__(self, max_samples=1000, slow_threshold=None, on_slow=None):
+
+        self.max_samples = max_samples
+        self.slow_threshold = slow_threshold    # Milliseconds. Slower queries are sent to @on_slow
+        self.on_slow = on_slow                  # Function(name, elapsed, rows, size, sql)
+        self.enabled = True
+        self._stats = {}
+        self._lock = threading.Lock()
+
+
+    def record(self, name, elapsed, rows=None, size=0, sql=None):
+        """ Add one execution of statement @name that took @elapsed milliseconds """
+
+        is_slow = self.slow_threshold is not None and elapsed >= self.slow_threshold
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = {'count': 0, 'total': 0.0, 'max': 0.0, 'rows': 0, 'bytes': 0, 'slow': 0,
+                        'samples': collections.deque(maxlen=self.max_samples)}
+                self._stats[name] = stat
+            stat['count'] += 1
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+            stat['rows'] += rows or 0
+            stat['bytes'] += size or 0
+            stat['samples'].append(elapsed)
+            if is_slow:
+                stat['slow'] += 1
+
+        if is_slow and self.on_slow:
+            try:
+                self.on_slow(name, elapsed, rows, size, sql)
+            except Exception:
+                pass
+
+
+    def get_report(self, order_by='total', limit=None):
+        """ Return list of dictionaries with the statistics of each statement, sorted descending by @order_by """
+
+        with self._lock:
+            stats = [(name, dict(stat), sorted(stat['samples'])) for name, stat in self._stats.items()]
+
+        report = []
+        for name, stat, samples in stats:
+            report.append({'name': name, 'count': stat['count'], 'total': stat['total'],
+                           'mean': stat['total'] / stat['count'], 'p50': _percentile(samples, 50),
+                           'p95': _percentile(samples, 95), 'p99': _percentile(samples, 99), 'max': stat['max'],
+                           'rows': stat['rows'], 'bytes': stat['bytes'], 'slow': stat['slow']})
+        report.sort(key=lambda item: item.get(order_by) or 0, reverse=True)
+        if limit:
+            report = report[:limit]
+        return report
+
+
+    def get_totals(self):
+        """ Return number of executions, total time (milliseconds) and bytes of all the statements (dict) """
+
+        totals = {'count': 0, 'total': 0.0, 'bytes': 0}
+        with self._lock:
+            for stat in self._stats.values():
+                totals['count'] += stat['count']
+                totals['total'] += stat['total']
+                totals['bytes'] += stat['bytes']
+        return totals
+
+
+    def reset(self):
+        """ Remove all the statistics """
+
+        with self._lock:
+            self._stats = {}
+
+
+class GwPgPool(object):
+    """ Bounded and thread-safe pool of auxiliary psycopg2 connections used by tasks """
+
+    def __init__(self, conn_string, set_search_path=None, min_size=1, max_size=4, max_idle=300, ping_interval=30,
+                 timeout=5, on_reset=None):
+        """
+        Network operations (connect, health check, reset) are done outside the lock, reserving their connection
+        in @_pending, so they don't block other threads.
+        When the pool is exhausted, getconn waits @timeout seconds for a free connection and then raises PoolError,
+        so no more than @max_size connections are open at the same time.
+        Connections are reset (DISCARD ALL) when given back, calling @on_reset(conn) so callers can forget the state
+        they keep for the connection (i.e. prepared statements)
+        """
+
+        self.conn_string = conn_string
+        self.set_search_path = set_search_path
+        self.min_size = max(int(min_size), 0)
+        self.max_size = max(int(max_size), self.min_size, 1)
+        self.max_idle = max_idle
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self.on_reset = on_reset
+        self.closed = False
+        self._idle = []           # List of tuples (connection, time of return to the pool)
+        self._used = set()        # Set of connections leased to the callers
+        self._pending = 0         # Number of connections being opened, checked or reset outside the lock
+        self._search_path = {}    # Dictionary of the 'search_path' query applied to each connection
+        self._cond = threading.Condition(threading.Lock())
+
+
+    def prewarm(self):
+        """ Open connections until reaching @min_size """
+
+        with self._cond:
+            if self.closed:
+                return
+            missing = self.min_size - (len(self._idle) + len(self._used) + self._pending)
+            if missing <= 0:
+                return
+            self._pending += missing
+
+        conns = []
+        try:
+            for i in range(missing):
+                conns.append(self._connect())
+        finally:
+            with self._cond:
+                self._pending -= missing
+                for conn in conns:
+                    if self.closed:
+                        self._discard(conn)
+                    else:
+                        self._idle.append((conn, time.monotonic()))
+                self._cond.notify_all()
+
+
+    def getconn(self, timeout=None):
+        """ Lease one connection from the pool. If the pool is exhausted, wait @timeout seconds for a free one and
+        then raise PoolError """
+
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            candidate = None
+            with self._cond:
+                while True:
+                    if self.closed:
+                        raise psycopg2.pool.PoolError("connection pool is closed")
+                    self._evict_idle()
+                    if self._idle:
+                        candidate, last_used = self._idle.pop()
+                        break
+                    if len(self._used) + self._pending < self.max_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise psycopg2.pool.PoolError(f"connection pool exhausted: {self.max_size} connections in use")
+                    self._cond.wait(remaining)
+                self._pending += 1
+
+            if candidate is not None:
+                # Health check outside the lock
+                valid = self._check_conn(candidate, last_used)
+                with self._cond:
+                    self._pending -= 1
+                    if valid:
+                        self._used.add(candidate)
+                        return candidate
+                    self._discard(candidate)
+                    self._cond.notify()
+                continue
+
+            # Open new connection outside the lock so other threads are not blocked by the handshake
+            conn = None
+            try:
+                conn = self._connect()
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    if conn is not None:
+                        self._used.add(conn)
+                    else:
+                        self._cond.notify()
+            return conn
+
+
+    def putconn(self, conn):
+        """ Give back one leased connection to the pool. It is reset before being leased again """
+
+        with self._cond:
+            if conn not in self._used:
+                # Connection not leased by this pool (i.e. leased before the pool was recreated)
+                self._discard(conn)
+                return
+            self._used.discard(conn)
+            total = len(self._idle) + len(self._used) + self._pending
+            if conn.closed or self.closed or total >= self.max_size:
+                # Connection closed, pool closed or pool already full
+                self._discard(conn)
+                self._cond.notify()
+                return
+            self._pending += 1
+
+        # Reset outside the lock
+        valid = self._reset(conn)
+        with self._cond:
+            self._pending -= 1
+            if valid and not self.closed:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._discard(conn)
+            self._cond.notify()
+
+
+    def set_search_path_sql(self, set_search_path):
+        """ Set 'search_path' query applied to the connections on checkout """
+
+        with self._cond:
+            self.set_search_path = set_search_path
+
+
+    def closeall(self):
+        """ Close idle connections of the pool. Leased ones will be closed when given back """
+
+        with self._cond:
+            self.closed = True
+            for conn, last_used in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+
+    def get_stats(self):
+        """ Return number of idle and leased connections """
+
+        with self._cond:
+            return {'idle': len(self._idle), 'used': len(self._used), 'max_size': self.max_size}
+
+
+    # region private functions
+
+    def _connect(self):
+
+        conn = psycopg2.connect(self.conn_string)
+        _register_json(conn)
+        self._apply_search_path(conn)
+        return conn
+
+
+    def _apply_search_path(self, conn):
+        """ Execute 'search_path' query if the connection doesn't have the current one """
+
+        with self._cond:
+            set_search_path = self.set_search_path
+            if not set_search_path or self._search_path.get(id(conn)) == set_search_path:
+                return
+        cursor = conn.cursor()
+        cursor.execute(set_search_path)
+        cursor.close()
+        conn.commit()
+        with self._cond:
+            self._search_path[id(conn)] = set_search_path
+
+
+    def _reset(self, conn):
+        """ Discard session state of @conn (settings, temporary tables, prepared statements...) and set its
+        'search_path' again, in a single round trip. Return False if it failed """
+
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            with self._cond:
+                set_search_path = self.set_search_path
+                self._search_path.pop(id(conn), None)
+            sql = "DISCARD ALL"
+            if set_search_path:
+                sql += f"; {set_search_path}"
+            # DISCARD ALL can't be executed inside a transaction
+            conn.autocommit = True
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql)
+                cursor.close()
+            finally:
+                conn.autocommit = False
+            if set_search_path:
+                with self._cond:
+                    self._search_path[id(conn)] = set_search_path
+            if self.on_reset is not None:
+                self.on_reset(conn)
+            return True
+        except Exception:
+            return False
+
+
+    def _check_conn(self, conn, last_used):
+        """ Health check of one idle connection before leasing it """
+
+        try:
+            if conn.closed:
+                return False
+            if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if time.monotonic() - last_used > self.ping_interval:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                conn.rollback()
+            self._apply_search_path(conn)
+            return True
+        except Exception:
+            return False
+
+
+    def _evict_idle(self):
+        """ Close connections idle for more than @max_idle seconds, keeping at least @min_size """
+
+        if not self.max_idle:
+            return
+        now = time.monotonic()
+        keep = []
+        total = len(self._idle) + len(self._used)
+        # Oldest connections are at the beginning of the list
+        for conn, last_used in self._idle:
+            if now - last_used > self.max_idle and total > self.min_size:
+                self._discard(conn)
+                total -= 1
+            else:
+                keep.append((conn, last_used))
+        self._idle = keep
+
+
+    def _discard(self, conn):
+        """ Close @conn. Called holding the lock """
+
+        self._search_path.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # endregion
+
+
+class GwPgAsyncConn(object):
+    """ psycopg2 connection in asynchronous mode. Queries are sent without waiting for the server answer and the
+    caller drives them calling poll() each time the socket (fileno) is ready. Connection is always in autocommit """
+
+    def __init__(self, conn_string, set_search_path=None, stats=None):
+
+        self.conn_string = conn_string
+        self.set_search_path = set_search_path
+        self.stats = stats
+        self.conn = None
+        self.cursor = None
+        self.sql = None
+        self.state = None       # Operation in progress: 'connect', 'search_path', 'execute' or None
+        self._start = None
+
+
+    def connect(self):
+        """ Start connecting to the server. Call poll() until it returns POLL_OK """
+
+        self.conn = psycopg2.connect(self.conn_string, async_=True)
+        _register_json(self.conn)
+        self.state = 'connect'
+
+
+    def execute(self, sql, params=None):
+        """ Send query to the server. Call poll() until it returns POLL_OK and then fetchone() """
+
+        self.sql = sql
+        self._start = time.perf_counter()
+        self.cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        self.cursor.execute(sql, params)
+        self.state = 'execute'
+
+
+    def poll(self):
+        """ Advance the operation in progress. Return POLL_READ or POLL_WRITE if it must be called again when the
+        socket is ready to be read or written, or POLL_OK when finished. Raise psycopg2 errors of the operation """
+
+        result = self.conn.poll()
+        if result != psycopg2.extensions.POLL_OK:
+            return result
+
+        if self.state == 'connect' and self.set_search_path:
+            self.cursor = self.conn.cursor()
+            self.cursor.execute(self.set_search_path)
+            self.state = 'search_path'
+            return self.poll()
+        if self.state == 'execute':
+            self.state = 'fetch'
+        else:
+            self.state = None
+        return result
+
+
+    def fetchone(self):
+        """ Return the first row of the finished query """
+
+        _payload.size = 0
+        row = self.cursor.fetchone() if self.cursor.description else None
+        self.state = None
+        if self.stats is not None and self.stats.enabled:
+            elapsed = (time.perf_counter() - self._start) * 1000
+            self.stats.record(_get_statement_name(self.sql), elapsed, 1 if row else 0,
+                              getattr(_payload, 'size', 0) + len(self.sql), self.sql)
+        return row
+
+
+    def fileno(self):
+        return self.conn.fileno()
+
+
+    def is_ready(self):
+        """ Return True if connection is open and there is no operation in progress """
+        return self.conn is not None and not self.conn.closed and self.state is None
+
+
+    def is_closed(self):
+        return self.conn is None or self.conn.closed != 0
+
+
+    def cancel(self):
+        """ Ask the server to cancel the query in progress. poll() will raise QueryCanceledError.
+        The request opens a new connection to the server, so it is sent from a background thread """
+
+        if self.state == 'execute' and self.conn is not None:
+            threading.Thread(target=self._send_cancel, args=(self.conn,), daemon=True).start()
+
+
+    def close(self):
+
+        try:
+            if self.conn is not None:
+                self.conn.close()
+        except Exception:
+            pass
+        self.state = None
+
+
+    def _send_cancel(self, conn):
+
+        try:
+            conn.cancel()
+        except Exception:
+            pass
 
 
 class GwPgDao(object):
@@ -18,6 +541,10 @@ class GwPgDao(object):
         self.conn = None
         self.cursor = None
         self.pid = None
+        self.pool = None
+        self.pool_params = {'min_size': 1, 'max_size': 4, 'max_idle': 300}
+        self.prepared = weakref.WeakKeyDictionary()     # Names of the statements prepared on each connection
+        self.stats = None                               # Instance of GwQueryStats
 
 
     def init_db(self):
@@ -25,6 +552,7 @@ class GwPgDao(object):
 
         try:
             self.conn = psycopg2.connect(self.conn_string)
+            _register_json(self.conn)
             self.cursor = self.get_cursor()
             self.pid = self.conn.get_backend_pid()
             status = True
@@ -40,6 +568,7 @@ class GwPgDao(object):
 
         try:
             status = True
+            self.close_pool()
             if self.cursor:
                 self.cursor.close()
             if self.conn:
@@ -145,38 +674,151 @@ class GwPgDao(object):
             return query
 
 
-    def get_rows(self, sql, commit=False):
-        """ Get multiple rows from selected query """
+    def get_rows(self, sql, commit=False, aux_conn=None, lazy_json=False):
+        """ Get multiple rows from selected query.
+        If @lazy_json is True, json/jsonb values are returned as GwLazyJson and only decoded when accessed """
 
         self.last_error = None
         rows = None
         try:
-            cursor = self.get_cursor()
+            start = self._start_query()
+            cursor = self.get_cursor(aux_conn)
+            if lazy_json:
+                _register_lazy_json(cursor)
             cursor.execute(sql)
             rows = cursor.fetchall()
+            self._record_query(sql, start, len(rows))
             if commit:
-                self.commit()
+                self.commit(aux_conn)
         except Exception as e:
             self.last_error = e
             if commit:
-                self.rollback()
+                self.rollback(aux_conn)
         finally:
             return rows
 
 
-    def get_row(self, sql, commit=False, aux_conn=None):
-        """ Get single row from selected query """
+    def iter_rows(self, sql, batch_size=2000, named=False, aux_conn=None):
+        """ Yield rows of selected query fetched in batches of @batch_size through a server-side cursor.
+        If @aux_conn is not set, a connection is leased from the pool so commits of the main connection
+        don't invalidate the cursor while it is being consumed.
+        Rows are tuples, or namedtuples if @named is True.
+        Errors are raised to the consumer, so it doesn't take a truncated result as a complete one """
+
+        self.last_error = None
+        conn = aux_conn
+        pool = None
+        cursor = None
+        elapsed = 0.0
+        count = 0
+        size = 0
+        try:
+            if conn is None:
+                pool = self._get_pool()
+                conn = pool.getconn()
+            cursor_factory = psycopg2.extras.NamedTupleCursor if named else None
+            cursor = conn.cursor(name=f"gw_iter_{next(_cursor_names)}", cursor_factory=cursor_factory)
+            cursor.itersize = batch_size
+            cursor.execute(sql)
+            while True:
+                # Only the time spent fetching is accounted, not the time spent by the consumer
+                start = self._start_query()
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - start
+                size += getattr(_payload, 'size', 0)
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+            if self.stats is not None:
+                self.stats.record(_get_statement_name(sql), elapsed * 1000, count, size + len(sql), sql)
+        except Exception as e:
+            self.last_error = e
+            raise
+        finally:
+            try:
+                if cursor is not None:
+                    cursor.close()
+            except Exception:
+                pass
+            if pool is not None and conn is not None:
+                pool.putconn(conn)
+
+
+    def get_row(self, sql, commit=False, aux_conn=None, lazy_json=False):
+        """ Get single row from selected query.
+        If @lazy_json is True, json/jsonb values are returned as GwLazyJson and only decoded when accessed """
 
         self.last_error = None
         row = None
         try:
-            if aux_conn is not None:
+            start = self._start_query()
+            if aux_conn is not None or lazy_json:
+                if aux_conn is None:
+                    self.check_cursor()
                 cursor = self.get_cursor(aux_conn)
+                if lazy_json:
+                    _register_lazy_json(cursor)
                 cursor.execute(sql)
                 row = cursor.fetchone()
             else:
                 self.cursor_execute(sql)
                 row = self.cursor.fetchone()
+            self._record_query(sql, start, 1 if row else 0)
+            if commit:
+                self.commit(aux_conn)
+        except Exception as e:
+            self.last_error = e
+            if commit:
+                self.rollback(aux_conn)
+        finally:
+            return row
+
+
+    def execute_prepared(self, function_name, schema_name, body, commit=False, aux_conn=None):
+        """ Execute function @function_name(json) through a server-side prepared statement, binding @body as
+        parameter. The statement is prepared once per connection and prepared again if the server lost it
+        (i.e. after reset_db) """
+
+        self.last_error = None
+        row = None
+        conn = aux_conn
+        try:
+            if conn is None:
+                self.check_cursor()
+                conn = self.conn
+            stmt_name = f"gw_prep_{schema_name}_{function_name}"[:63] if schema_name else f"gw_prep_{function_name}"
+            stmt = pgsql.Identifier(stmt_name)
+            prepared = self.prepared.setdefault(conn, set())
+            cursor = self.get_cursor(conn)
+            start = self._start_query()
+            # Only retry if there is no pending work in the transaction that a rollback would discard
+            can_retry = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            for attempt in range(2):
+                try:
+                    if stmt_name not in prepared:
+                        if schema_name:
+                            function = pgsql.SQL('.').join([pgsql.Identifier(schema_name), pgsql.Identifier(function_name)])
+                        else:
+                            function = pgsql.Identifier(function_name)
+                        cursor.execute(pgsql.SQL("PREPARE {}(json) AS SELECT {}($1)").format(stmt, function))
+                        prepared.add(stmt_name)
+                    cursor.execute(pgsql.SQL("EXECUTE {}(%s)").format(stmt), (body,))
+                    break
+                except psycopg2.errors.InvalidSqlStatementName:
+                    # Prepared statement not found in this session: forget it and prepare it again
+                    prepared.discard(stmt_name)
+                    if not can_retry or attempt == 1:
+                        raise
+                    conn.rollback()
+                except psycopg2.errors.DuplicatePreparedStatement:
+                    # Prepared statement already exists in this session: just execute it
+                    prepared.add(stmt_name)
+                    if not can_retry or attempt == 1:
+                        raise
+                    conn.rollback()
+            row = cursor.fetchone()
+            self._record_query(body, start, 1 if row else 0, name=function_name)
             if commit:
                 self.commit(aux_conn)
         except Exception as e:
@@ -193,8 +835,10 @@ class GwPgDao(object):
         self.last_error = None
         status = True
         try:
+            start = self._start_query()
             cursor = self.get_cursor()
             cursor.execute(sql)
+            self._record_query(sql, start, max(cursor.rowcount, 0))
             if commit:
                 self.commit()
         except Exception as e:
@@ -212,9 +856,11 @@ class GwPgDao(object):
         self.last_error = None
         value = None
         try:
+            start = self._start_query()
             cursor = self.get_cursor()
             cursor.execute(sql)
             value = cursor.fetchone()
+            self._record_query(sql, start, max(cursor.rowcount, 0))
             if commit:
                 self.commit()
         except Exception as e:
@@ -224,6 +870,56 @@ class GwPgDao(object):
             return value
 
 
+    def bulk_insert(self, table, columns, rows, method='copy', chunk_size=None, commit=True, aux_conn=None):
+        """ Insert @rows (iterable of tuples) into @table through COPY FROM STDIN or execute_values.
+        Values are sent as bound parameters, None is inserted as NULL.
+        Use method 'values' for views with INSTEAD OF triggers on old PostgreSQL versions
+            :param chunk_size: Number of rows sent on each COPY or INSERT statement (int)
+            :return: Number of inserted rows, or None if failed (int)
+        """
+
+        self.last_error = None
+        count = 0
+        if chunk_size is None:
+            chunk_size = 10000 if method == 'copy' else 1000
+        try:
+            if aux_conn is not None:
+                cursor = self.get_cursor(aux_conn)
+            else:
+                self.check_cursor()
+                cursor = self.get_cursor()
+            table_sql = pgsql.SQL('.').join([pgsql.Identifier(part) for part in table.split('.')])
+            columns_sql = pgsql.SQL(', ').join([pgsql.Identifier(column) for column in columns])
+            if method == 'copy':
+                query = pgsql.SQL("COPY {} ({}) FROM STDIN").format(table_sql, columns_sql).as_string(cursor)
+            elif method == 'values':
+                query = pgsql.SQL("INSERT INTO {} ({}) VALUES %s").format(table_sql, columns_sql).as_string(cursor)
+            else:
+                raise ValueError(f"Bulk insert method not supported: {method}")
+
+            start = self._start_query()
+            rows = iter(rows)
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                if method == 'copy':
+                    cursor.copy_expert(query, _copy_buffer(chunk))
+                else:
+                    psycopg2.extras.execute_values(cursor, query, chunk, page_size=len(chunk))
+                count += len(chunk)
+            self._record_query(query, start, count, name=f"{method.upper()} {table.split('.')[-1]}")
+            if commit:
+                self.commit(aux_conn)
+        except Exception as e:
+            self.last_error = e
+            count = None
+            if commit:
+                self.rollback(aux_conn)
+        finally:
+            return count
+
+
     def commit(self, aux_conn=None):
         """ Commit current database transaction """
 
@@ -236,10 +932,13 @@ class GwPgDao(object):
             pass
 
 
-    def rollback(self, aux_conn=None):
-        """ Rollback current database transaction """
+    def rollback(self, aux_conn=None, savepoint=None):
+        """ Rollback current database transaction, or only the statements executed after @savepoint """
 
         try:
+            if savepoint is not None:
+                self.get_cursor(aux_conn).execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                return
             if aux_conn is not None:
                 aux_conn.rollback()
                 return
@@ -248,45 +947,149 @@ class GwPgDao(object):
             pass
 
 
-    def export_to_csv(self, sql, csv_file):
-        """ Dumps contents of the query to selected CSV file """
+    def export_to_csv(self, sql, csv_file, delimiter=',', encoding='utf-8', null_string='', header=True,
+                      aux_conn=None):
+        """ Stream the result of the query to @csv_file (binary file handle) using COPY ... TO STDOUT.
+        Data is written in chunks and encoded by the server, so it never gets loaded in memory
+            :return: Number of exported rows, or None if failed (int)
+        """
 
+        self.last_error = None
+        rows = None
         try:
-            cursor = self.get_cursor()
-            cursor.export_to_csv(sql, csv_file)
-            return None
+            if isinstance(sql, bytes):
+                sql = sql.decode()
+            sql = sql.strip().rstrip(';')
+            if aux_conn is not None:
+                cursor = self.get_cursor(aux_conn)
+            else:
+                self.check_cursor()
+                cursor = self.get_cursor()
+            query = pgsql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER {}, DELIMITER {}, NULL {}, ENCODING {})")
+            query = query.format(pgsql.SQL(sql), pgsql.SQL('true' if header else 'false'), pgsql.Literal(delimiter),
+                                 pgsql.Literal(null_string), pgsql.Literal(encoding))
+            start = self._start_query()
+            cursor.copy_expert(query.as_string(cursor), csv_file, size=65536)
+            rows = cursor.rowcount
+            self._record_query(sql, start, rows, name=f"COPY TO {_get_statement_name(sql)}")
+            cursor.close()
+            self.commit(aux_conn)
         except Exception as e:
-            return e
+            self.last_error = e
+            self.rollback(aux_conn)
+        finally:
+            return rows
+
+
+    def set_pool_params(self, min_size=None, max_size=None, max_idle=None):
+        """ Set size and idle timeout (seconds) of the pool of auxiliary connections """
+
+        for key, value in (('min_size', min_size), ('max_size', max_size), ('max_idle', max_idle)):
+            try:
+                self.pool_params[key] = int(value)
+            except (TypeError, ValueError):
+                pass
+
+
+    def init_pool(self):
+        """ Create the pool of auxiliary connections and open @min_size connections with 'search_path' set """
+
+        try:
+            self._get_pool().prewarm()
+            status = True
+        except Exception as e:
+            self.last_error = e
+            status = False
+
+        return status
+
+
+    def close_pool(self):
+        """ Close every connection of the pool """
+
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+
+    def _start_query(self):
+        """ Reset the JSON payload counter of the current thread and return the start time of the query """
+
+        _payload.size = 0
+        return time.perf_counter()
+
+
+    def _record_query(self, sql, start, rows=None, name=None):
+        """ Add the execution time of @sql since @start to the statistics, if enabled """
+
+        if self.stats is None or not self.stats.enabled:
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        try:
+            if not isinstance(sql, (str, bytes)):
+                sql = str(sql)
+            if name is None:
+                name = _get_statement_name(sql)
+            self.stats.record(name, elapsed, rows, getattr(_payload, 'size', 0) + len(sql), sql)
+        except Exception:
+            pass
+
+
+    def _forget_prepared(self, conn):
+        """ Forget statements prepared on @conn, called when the pool has reset it """
+
+        self.prepared.pop(conn, None)
+
+
+    def _get_pool(self):
+
+        if self.pool is None or self.pool.closed:
+            self.pool = GwPgPool(self.conn_string, self.set_search_path, on_reset=self._forget_prepared,
+                                 **self.pool_params)
+        elif self.pool.set_search_path != self.set_search_path:
+            self.pool.set_search_path_sql(self.set_search_path)
+        return self.pool
 
 
     def cancel_pid(self, pid):
         """ Cancel one process by pid """
 
-        # Create an auxiliary connection with the intention of being able to cancel processes of the main connection
+        # Lease an auxiliary connection with the intention of being able to cancel processes of the main connection
         last_error = None
+        aux_conn = None
+        pool = None
         try:
-            aux_conn = psycopg2.connect(self.conn_string)
+            try:
+                # Don't wait for a free connection: every pooled one may be running the process we want to cancel
+                pool = self._get_pool()
+                aux_conn = pool.getconn(timeout=0)
+            except psycopg2.pool.PoolError:
+                pool = None
+                aux_conn = psycopg2.connect(self.conn_string)
             cursor = self.get_cursor(aux_conn)
             cursor.execute(f"SELECT pg_cancel_backend({pid})")
             status = True
             cursor.close()
-            aux_conn.close()
             del cursor
-            del aux_conn
         except Exception as e:
             last_error = e
             status = False
+        finally:
+            if aux_conn is not None:
+                if pool is not None:
+                    pool.putconn(aux_conn)
+                else:
+                    aux_conn.close()
 
         return {'status': status, 'last_error': last_error}
 
 
     def get_aux_conn(self):
+        """ Lease an auxiliary connection from the pool """
 
         try:
-            aux_conn = psycopg2.connect(self.conn_string)
-            cursor = self.get_cursor(aux_conn)
-            if self.set_search_path:
-                cursor.execute(self.set_search_path)
+            aux_conn = self._get_pool().getconn()
             return aux_conn
         except Exception as e:
             last_error = e
@@ -296,12 +1099,168 @@ class GwPgDao(object):
 
 
     def delete_aux_con(self, aux_conn):
+        """ Give back an auxiliary connection to the pool """
 
         try:
-            aux_conn.close()
+            if self.pool is not None and not isinstance(aux_conn, dict):
+                self.pool.putconn(aux_conn)
+            elif not isinstance(aux_conn, dict):
+                aux_conn.close()
             del aux_conn
             return
         except Exception as e:
             last_error = e
             status = False
         return {'status': status, 'last_error': last_error}
+
+
+def _copy_buffer(rows):
+    """ Return a file-like object with @rows serialized in COPY text format """
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_value(value):
+    """ Escape one value for COPY text format """
+
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def _get_statement_name(sql):
+    """ Return the name used to group the statistics of @sql: name of the gw function called, if any, otherwise
+    statement type and table name (i.e. 'SELECT cat_feature') """
+
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    head = sql[:500]
+    match = _re_function.search(head)
+    if match:
+        return match.group(1).lower()
+
+    words = head.split(None, 1)
+    statement = words[0].upper() if words else ''
+    match = _re_table.search(head)
+    if match:
+        table = match.group(1).replace('"', '').split('.')[-1]
+        return f"{statement} {table}"
+    return statement
+
+
+def _percentile(samples, percent):
+    """ Return the nearest-rank @percent percentile of sorted list @samples """
+
+    if not samples:
+        return None
+    index = max(int(math.ceil(percent / 100 * len(samples))) - 1, 0)
+    return samples[min(index, len(samples) - 1)]
+
+
+def get_json_codecs():
+    """ Return names of the installed json decoders, from fastest to slowest """
+
+    return [codec for codec in ('orjson', 'ujson', 'json') if _import_json_codec(codec) is not None]
+
+
+def get_payload_size():
+    """ Return size of the json values received by the last query of the current thread """
+    return getattr(_payload, 'size', 0)
+
+
+def get_json_codec():
+    """ Return name of the json decoder in use """
+    return _json_codec
+
+
+def set_json_codec(codec='auto'):
+    """ Set decoder of the json/jsonb values received from the server: 'orjson', 'ujson', 'json' (standard library)
+    or 'auto' (fastest one installed). If @codec is not installed, 'auto' is used
+        :return: Name of the decoder in use (str)
+    """
+
+    global _json_codec, _json_loads, _json_dumps
+    functions = None
+    if codec not in (None, 'auto'):
+        functions = _import_json_codec(codec)
+    if functions is None:
+        codec = get_json_codecs()[0]
+        functions = _import_json_codec(codec)
+    _json_codec = codec
+    _json_loads, _json_dumps = functions
+    return codec
+
+
+def dumps_json(value, sort_keys=False):
+    """ Encode @value as compact json text with the codec in use. With @sort_keys, equal values always get the same
+    text, so it can be used as a key """
+
+    try:
+        if _json_dumps is not None:
+            return _json_dumps(value, sort_keys)
+    except TypeError:
+        pass
+    # Values not supported by the codec (i.e. QDate) are encoded as their string representation
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys, default=str)
+
+
+def _import_json_codec(codec):
+    """ Return tuple with functions 'loads' and 'dumps' of module @codec, or None if it is not installed """
+
+    try:
+        if codec == 'orjson':
+            import orjson
+
+            def dumps(value, sort_keys):
+                option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+                return orjson.dumps(value, option=option).decode()
+
+            return orjson.loads, dumps
+        if codec == 'ujson':
+            import ujson
+
+            def dumps(value, sort_keys):
+                return ujson.dumps(value, ensure_ascii=False, sort_keys=sort_keys, escape_forward_slashes=False)
+
+            return ujson.loads, dumps
+        if codec == 'json':
+            return json.loads, None
+    except ImportError:
+        pass
+    return None
+
+
+def _loads_json(data):
+    """ Decode json/jsonb values received from the server, accounting their size in the current thread """
+
+    _payload.size = getattr(_payload, 'size', 0) + len(data)
+    return _json_loads(data)
+
+
+def _loads_lazy_json(data):
+    """ Wrap json/jsonb values received from the server into GwLazyJson, accounting their size in the current thread """
+
+    _payload.size = getattr(_payload, 'size', 0) + len(data)
+    return GwLazyJson(data)
+
+
+def _register_json(conn):
+    """ Decode json/jsonb values of @conn with _loads_json. Registered by connection, so connections of other plugins
+    keep the typecasters of psycopg2 """
+
+    psycopg2.extras.register_default_json(conn, loads=_loads_json)
+    psycopg2.extras.register_default_jsonb(conn, loads=_loads_json)
+
+
+def _register_lazy_json(cursor):
+
+    psycopg2.extras.register_default_json(cursor, loads=_loads_lazy_json)
+    psycopg2.extras.register_default_jsonb(cursor, loads=_loads_lazy_json)
@@ -10,7 +10,6 @@ from functools import partial
 
 import console
 import os.path
-import shlex
 import sys
 from random import randrange
 
@@ -20,7 +19,7 @@ from qgis.PyQt.QtWidgets import QDockWidget, QApplication, QPushButton
 from qgis.core import QgsExpressionContextUtils, QgsProject, QgsPointLocator, \
     QgsSnappingUtils, QgsTolerance, QgsPointXY, QgsFeatureRequest, QgsRectangle, QgsSymbol, \
     QgsLineSymbol, QgsRendererCategory, QgsCategorizedSymbolRenderer, QgsGeometry, QgsCoordinateReferenceSystem, \
-    QgsCoordinateTransform
+    QgsCoordinateTransform, QgsDataSourceUri, QgsExpression, NULL
 from qgis.core import QgsVectorLayer
 from qgis.utils import iface
 
@@ -30,6 +29,53 @@ from .. import global_vars
 # List of user parameters (optionals)
 user_parameters = {'log_sql': None, 'show_message_durations': None, 'aux_context': 'ui_message'}
 
+_layer_index = None             # Key: table name of project layers. Value: list of tuples (layer_id, schema_name)
+_layer_index_tables = {}        # Key: layer id. Value: table name indexed in _layer_index
+_layer_index_slots = {}         # Key: layer id. Value: function connected to its signals dataSourceChanged
+                                # and subsetStringChanged
+_layer_sources = {}             # Key: layer id. Value: GwLayerSource of project layers, removed when source changes
+_feature_id_maps = {}           # Key: tuple (layer id, field name). Value: tuple (dict of feature ids by field value,
+                                # dict of field value by feature id) of project layers, removed when data changes
+_feature_id_slots = {}          # Key: layer id. Value: function connected to its signal dataChanged
+_feature_id_map_min_values = 50 # Minimum number of values to build a map of feature ids. Fewer values are requested
+                                # to the data provider with a filter
+
+
+class GwLayerSource(object):
+    """ Data source of a layer, parsed once with QgsDataSourceUri """
+
+    def __init__(self, layer):
+
+        self.provider = layer.providerType()
+        uri_text = layer.dataProvider().dataSourceUri()
+        uri = QgsDataSourceUri(uri_text)
+        self.host = uri.host() or None
+        self.port = uri.port() or None
+        self.db = uri.database() or None
+        self.service = uri.service() or None
+        self.user = uri.username() or None
+        self.password = uri.password() or None
+        self.sslmode = QgsDataSourceUri.encodeSslMode(uri.sslMode()) if 'sslmode=' in uri_text else None
+        self.schema = uri.schema() or None
+        self.table = uri.table() or None
+        self.geometry_column = uri.geometryColumn() or None
+        self.key = uri.keyColumn() or None
+        self.sql = uri.sql() or None
+        self.uri = uri_text
+
+
+    def as_dict(self):
+        """ Return database connection parameters as returned by get_layer_source """
+
+        layer_source = {'db': None, 'schema': None, 'table': None, 'service': None, 'host': None, 'port': None,
+                        'user': None, 'password': None, 'sslmode': None}
+        if self.provider != 'postgres':
+            return layer_source
+        for key in layer_source.keys():
+            layer_source[key] = getattr(self, key)
+        return layer_source
+
+
 
 def show_message(text, message_level=1, duration=10, context_name=None, parameter=None, title="", logger_file=True,
                  dialog=iface):
@@ -301,40 +347,27 @@ def find_toc_group(root, group, case_sensitive=False):
 def get_layer_source(layer):
     """ Get database connection paramaters of @layer """
 
-    # Initialize variables
-    layer_source = {'db': None, 'schema': None, 'table': None, 'service': None, 'host': None, 'port': None,
-                    'user': None, 'password': None, 'sslmode': None}
-
     if layer is None:
-        return layer_source
-
-    if layer.providerType() != 'postgres':
-        return layer_source
+        return {'db': None, 'schema': None, 'table': None, 'service': None, 'host': None, 'port': None,
+                'user': None, 'password': None, 'sslmode': None}
 
-    # Get dbname, host, port, user and password
-    uri = layer.dataProvider().dataSourceUri()
+    return get_layer_source_descriptor(layer).as_dict()
 
-    # split with quoted substrings preservation
-    splt = shlex.split(uri)
 
-    list_uri = []
-    for v in splt:
-        if '=' in v:
-            elem_uri = tuple(v.split('='))
-            if len(elem_uri) == 2:
-                list_uri.append(elem_uri)
+def get_layer_source_descriptor(layer):
+    """ Return data source of @layer (GwLayerSource). Data source of project layers is parsed only once and
+    cached by layer id until it changes """
 
-    splt_dct = dict(list_uri)
-    if 'service' in splt_dct:
-        splt_dct['service'] = splt_dct['service']
-    if 'dbname' in splt_dct:
-        splt_dct['db'] = splt_dct['dbname']
-    if 'table' in splt_dct:
-        splt_dct['schema'], splt_dct['table'] = splt_dct['table'].split('.')
-
-    for key in layer_source.keys():
-        layer_source[key] = splt_dct.get(key)
+    layer_id = layer.id()
+    layer_source = _layer_sources.get(layer_id)
+    if layer_source is not None:
+        return layer_source
 
+    layer_source = GwLayerSource(layer)
+    # Only cache layers whose changes are notified by signals (see _add_layers_to_index)
+    _get_layer_index()
+    if layer_id in _layer_index_slots:
+        _layer_sources[layer_id] = layer_source
     return layer_source
 
 
@@ -344,7 +377,11 @@ def get_layer_source_table_name(layer):
     if layer is None:
         return None
 
-    uri = layer.dataProvider().dataSourceUri().lower()
+    layer_source = get_layer_source_descriptor(layer)
+    if layer_source.table is not None:
+        return layer_source.table.lower()
+
+    uri = layer_source.uri.lower()
     pos_ini = uri.find('table=')
     total = len(uri)
     pos_end_schema = uri.rfind('.')
@@ -365,44 +402,36 @@ def get_layer_schema(layer):
     if layer is None:
         return None
 
-    table_schema = None
-    uri = layer.dataProvider().dataSourceUri().lower()
-
-    pos_ini = uri.find('table=')
-    pos_end_schema = uri.rfind('.')
-    pos_fi = uri.find('" ')
-    if pos_ini != -1 and pos_fi != -1:
-        table_schema = uri[pos_ini + 7:pos_end_schema - 1]
+    layer_source = get_layer_source_descriptor(layer)
+    if layer_source.schema is None or layer_source.table is None:
+        return None
 
-    return table_schema
+    return layer_source.schema.lower()
 
 
 def get_primary_key(layer=None):
     """ Get primary key of selected layer """
 
-    uri_pk = None
     if layer is None:
         layer = iface.activeLayer()
     if layer is None:
-        return uri_pk
-    uri = layer.dataProvider().dataSourceUri().lower()
-    pos_ini = uri.find('key=')
-    pos_end = uri.rfind('srid=')
-    if pos_ini != -1:
-        uri_pk = uri[pos_ini + 5:pos_end - 2]
+        return None
+
+    key = get_layer_source_descriptor(layer).key
+    if key is None:
+        return None
 
-    return uri_pk
+    return key.lower()
 
 
 def get_layer_by_tablename(tablename, show_warning_=False, log_info=False, schema_name=None):
-    """ Iterate over all layers and get the one with selected @tablename """
+    """ Get the layer with selected @tablename. If there are several ones, the first one listed in TOC.
+    Layers are looked up in an index of the project layers by table name (see _get_layer_index) """
 
     # Check if we have any layer loaded
-    layers = get_project_layers()
-    if len(layers) == 0:
+    if QgsProject.instance().count() == 0:
         return None
 
-    # Iterate over all layers
     layer = None
     if schema_name is None:
         if 'main_schema' in global_vars.project_vars:
@@ -410,12 +439,18 @@ def get_layer_by_tablename(tablename, show_warning_=False, log_info=False, schem
         else:
             tools_log.log_warning("Key not found", parameter='main_schema')
 
-    for cur_layer in layers:
-        uri_table = get_layer_source_table_name(cur_layer)
-        table_schema = get_layer_schema(cur_layer)
-        if (uri_table is not None and uri_table == tablename) and schema_name in ('', None, table_schema):
-            layer = cur_layer
-            break
+    layer_ids = [layer_id for layer_id, table_schema in _get_layer_index().get(tablename, ())
+                 if schema_name in ('', None, table_schema)]
+    root = QgsProject.instance().layerTreeRoot()
+    if len(layer_ids) == 1:
+        tree_layer = root.findLayer(layer_ids[0])
+        if tree_layer is not None:
+            layer = tree_layer.layer()
+    elif layer_ids:
+        for tree_layer in root.findLayers():
+            if tree_layer.layerId() in layer_ids and tree_layer.layer() is not None:
+                layer = tree_layer.layer()
+                break
 
     if layer is None and show_warning_:
         show_warning("Layer not found", parameter=tablename)
@@ -426,6 +461,37 @@ def get_layer_by_tablename(tablename, show_warning_=False, log_info=False, schem
     return layer
 
 
+def reset_layer_index():
+    """ Disconnect and remove index of project layers by table name. It will be built again when needed """
+
+    global _layer_index
+    if _layer_index is None:
+        return
+    project = QgsProject.instance()
+    try:
+        project.layersAdded.disconnect(_add_layers_to_index)
+        project.layersRemoved.disconnect(_remove_layers_from_index)
+    except TypeError:
+        pass
+    for layer_id, slot in _layer_index_slots.items():
+        layer = project.mapLayer(layer_id)
+        if layer is not None:
+            _disconnect_layer_source_signals(layer, slot)
+    for layer_id, slot in _feature_id_slots.items():
+        layer = project.mapLayer(layer_id)
+        if layer is not None:
+            try:
+                layer.dataChanged.disconnect(slot)
+            except (TypeError, AttributeError):
+                pass
+    _layer_index = None
+    _layer_index_tables.clear()
+    _layer_index_slots.clear()
+    _layer_sources.clear()
+    _feature_id_maps.clear()
+    _feature_id_slots.clear()
+
+
 def manage_snapping_layer(layername, snapping_type=0, tolerance=15.0):
     """ Manage snapping of @layername """
 
@@ -464,6 +530,80 @@ def select_features_by_ids(feature_type, expr, layers=None):
                 layer.removeSelection()
 
 
+def select_features_by_values(feature_type, values, layers=None, field_name=None):
+    """ Select features of layers of group @feature_type whose @field_name (default '@feature_type_id') is in @values.
+    Features are found as in get_feature_ids """
+
+    if layers is None:
+        return
+
+    if feature_type not in layers:
+        return
+
+    if field_name is None:
+        field_name = f"{feature_type}_id"
+    for layer in layers[feature_type]:
+        feature_ids = get_feature_ids(layer, field_name, values) if values else []
+        if len(feature_ids) > 0:
+            layer.selectByIds(feature_ids)
+        else:
+            layer.removeSelection()
+
+
+def get_feature_ids(layer, field_name, values):
+    """ Return list of ids of features of @layer whose @field_name is in @values.
+    Values are compared as text, so ids of database (i.e. arc_id) can be passed as int or str.
+    Many values are found in a map of field values to feature ids of the layer (see _get_feature_id_map).
+    Few values, and values not found in the map (i.e. features inserted by a database function), are requested
+    to the data provider with a filter """
+
+    values = {str(value) for value in values}
+    build = len(values) >= _feature_id_map_min_values
+    feature_id_map = _get_feature_id_map(layer, field_name, build)
+    feature_ids = set()
+    if feature_id_map is not None:
+        ids_by_value = feature_id_map[0]
+        for value in [value for value in values if value in ids_by_value]:
+            feature_ids.update(ids_by_value[value])
+            values.discard(value)
+    if values:
+        feature_ids.update(_request_feature_ids(layer, field_name, values))
+    return list(feature_ids)
+
+
+def get_selected_values(layers, field_name):
+    """ Return list of distinct values of @field_name of selected features of @layers, in order of layers """
+
+    values = {}
+    for layer in layers:
+        selected_ids = layer.selectedFeatureIds()
+        if len(selected_ids) == 0:
+            continue
+        build = len(selected_ids) >= _feature_id_map_min_values
+        feature_id_map = _get_feature_id_map(layer, field_name, build)
+        values_by_id = feature_id_map[1] if feature_id_map is not None else {}
+        # Selected features not mapped (i.e. inserted by a database function) are requested by feature id
+        missing_ids = [feature_id for feature_id in selected_ids if feature_id not in values_by_id]
+        if missing_ids:
+            values_by_id = dict(values_by_id)
+            values_by_id.update(_request_feature_values(layer, field_name, missing_ids))
+        for feature_id in selected_ids:
+            value = values_by_id.get(feature_id)
+            if value is not None:
+                values[value] = None
+    return list(values)
+
+
+def clear_feature_id_maps(layer=None):
+    """ Remove maps of field values to feature ids of @layer (or of every layer). They will be built again when needed.
+    Maps are removed automatically when layers signal their data has changed """
+
+    if layer is not None:
+        _remove_feature_id_maps(layer.id())
+    else:
+        _feature_id_maps.clear()
+
+
 def get_points_from_geometry(layer, feature):
     """ Get the start point and end point of the feature """
 
@@ -581,13 +721,13 @@ def get_max_rectangle_from_coords(list_coord):
 
     coords = list_coord.group(1)
     polygon = coords.split(',')
-    x, y = polygon[0].split(' ')
+    x, y = polygon[0].strip().split(' ')
     min_x = x  # start with something much higher than expected min
     min_y = y
     max_x = x  # start with something much lower than expected max
     max_y = y
     for i in range(0, len(polygon)):
-        x, y = polygon[i].split(' ')
+        x, y = polygon[i].strip().split(' ')
         if x < min_x:
             min_x = x
         if x > max_x:
@@ -655,13 +795,52 @@ def get_geometry_vertex(list_coord=None):
     points = []
 
     for i in range(0, len(polygon)):
-        x, y = polygon[i].split(' ')
+        x, y = polygon[i].strip().split(' ')
         point = QgsPointXY(float(x), float(y))
         points.append(point)
 
     return points
 
 
+def get_transformed_geometry(geometry, source_epsg, target_epsg):
+    """
+    Return geometry transformed from @source_epsg to @target_epsg in a single call, or None if it is not valid
+        :param geometry: Geometry as WKT (String), WKB (bytes) or QgsGeometry
+    """
+
+    if isinstance(geometry, str):
+        geometry = QgsGeometry.fromWkt(geometry)
+    elif isinstance(geometry, (bytes, bytearray, memoryview)):
+        wkb = bytes(geometry)
+        geometry = QgsGeometry()
+        geometry.fromWkb(wkb)
+    else:
+        geometry = QgsGeometry(geometry)
+    if geometry.isNull():
+        return None
+
+    source_crs = QgsCoordinateReferenceSystem(str(source_epsg))
+    target_crs = QgsCoordinateReferenceSystem(str(target_epsg))
+    tform = QgsCoordinateTransform(source_crs, target_crs, QgsProject.instance())
+    try:
+        geometry.transform(tform)
+    except Exception as e:
+        tools_log.log_warning(f"Error transforming geometry from {source_epsg} to {target_epsg}: {e}")
+        return None
+
+    return geometry
+
+
+def get_postgis_wkt(geometry):
+    """ Return WKT of @geometry in the format of PostGIS ST_AsText, without spaces between vertices
+    (i.e. 'LINESTRING(x1 y1,x2 y2)'), as expected by get_geometry_vertex and get_max_rectangle_from_coords """
+
+    geometry_type, separator, coords = geometry.asWkt().partition(' (')
+    if not separator:
+        return geometry_type.upper()
+    return f"{geometry_type.upper()}({coords.replace(', ', ',')}"
+
+
 def reset_rubber_band(rubber_band):
     """ Reset QgsRubberBand """
     rubber_band.reset()
@@ -1181,4 +1360,168 @@ def draw_polygon(points, rubber_band, border=QColor(255, 0, 0, 100), width=3, du
         # Qtimer singleShot works with ms, we manage transformation to seconds
         QTimer.singleShot(int(duration_time)*1000, rubber_band.reset)
 
+
+
+def _get_layer_index():
+    """ Return index of project layers by table name. It is built once and updated on signals of QgsProject """
+
+    global _layer_index
+    if _layer_index is None:
+        _layer_index = {}
+        project = QgsProject.instance()
+        project.layersAdded.connect(_add_layers_to_index)
+        project.layersRemoved.connect(_remove_layers_from_index)
+        _add_layers_to_index(project.mapLayers().values())
+    return _layer_index
+
+
+def _add_layers_to_index(layers):
+
+    for layer in layers:
+        # Connect signals before indexing the layer, so its data source is cached (see get_layer_source_descriptor)
+        if layer.id() not in _layer_index_slots:
+            slot = partial(_update_layer_index, layer.id())
+            try:
+                layer.dataSourceChanged.connect(slot)
+                if isinstance(layer, QgsVectorLayer):
+                    layer.subsetStringChanged.connect(slot)
+                _layer_index_slots[layer.id()] = slot
+            except AttributeError:
+                pass
+        _index_layer(layer)
+
+
+def _remove_layers_from_index(layer_ids):
+
+    for layer_id in layer_ids:
+        _layer_index_slots.pop(layer_id, None)
+        _layer_sources.pop(layer_id, None)
+        _feature_id_slots.pop(layer_id, None)
+        _remove_feature_id_maps(layer_id)
+        _unindex_layer(layer_id)
+
+
+def _update_layer_index(layer_id):
+    """ Index again layer @layer_id when its data source or filter has changed """
+
+    _layer_sources.pop(layer_id, None)
+    _remove_feature_id_maps(layer_id)
+    layer = QgsProject.instance().mapLayer(layer_id)
+    if layer is not None:
+        _index_layer(layer)
+
+
+def _index_layer(layer):
+    """ Add @layer to index of project layers by table name """
+
+    if _layer_index is None:
+        return
+    _unindex_layer(layer.id())
+    try:
+        tablename = get_layer_source_table_name(layer)
+        schema_name = get_layer_schema(layer)
+    except AttributeError:
+        # Layer without data provider
+        return
+    if tablename is None:
+        return
+    _layer_index.setdefault(tablename, []).append((layer.id(), schema_name))
+    _layer_index_tables[layer.id()] = tablename
+
+
+def _get_feature_id_map(layer, field_name, build=True):
+    """ Return tuple (dict of feature ids by value of @field_name as text, dict of value by feature id) of @layer.
+    It is built with a single request without geometry and cached for project layers until their data changes.
+    Return None if it is not cached and it must not be built (@build False or layer in edition, as every change
+    of the edit buffer would build it again) """
+
+    key = (layer.id(), field_name)
+    feature_id_map = _feature_id_maps.get(key)
+    if feature_id_map is not None:
+        return feature_id_map
+    if not build or layer.isEditable():
+        return None
+
+    ids_by_value = {}
+    value_by_id = {}
+    field_index = layer.fields().indexFromName(field_name)
+    if field_index != -1:
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes([field_index])
+        for feature in layer.getFeatures(request):
+            value = feature.attribute(field_index)
+            if value is None or value == NULL:
+                # Mapped as None, so features without value are not requested again
+                value_by_id[feature.id()] = None
+                continue
+            ids_by_value.setdefault(str(value), []).append(feature.id())
+            value_by_id[feature.id()] = value
+    feature_id_map = (ids_by_value, value_by_id)
+
+    # Only cache layers whose changes are notified by signals
+    _get_layer_index()
+    if layer.id() in _layer_index_slots:
+        if layer.id() not in _feature_id_slots:
+            slot = partial(_remove_feature_id_maps, layer.id())
+            layer.dataChanged.connect(slot)
+            _feature_id_slots[layer.id()] = slot
+        _feature_id_maps[key] = feature_id_map
+    return feature_id_map
+
+
+def _request_feature_ids(layer, field_name, values):
+    """ Return ids of features of @layer whose @field_name is in @values, requested with a filter expression """
+
+    field_index = layer.fields().indexFromName(field_name)
+    if field_index == -1 or not values:
+        return []
+    expr = f"{QgsExpression.quotedColumnRef(field_name)} IN " \
+           f"({', '.join(QgsExpression.quotedValue(value) for value in values)})"
+    request = QgsFeatureRequest().setFilterExpression(expr).setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([field_index])
+    return [feature.id() for feature in layer.getFeatures(request)]
+
+
+def _request_feature_values(layer, field_name, feature_ids):
+    """ Return dict of value of @field_name by feature id of features @feature_ids of @layer (None if NULL) """
+
+    values_by_id = {}
+    field_index = layer.fields().indexFromName(field_name)
+    if field_index == -1:
+        return values_by_id
+    request = QgsFeatureRequest().setFilterFids(feature_ids).setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([field_index])
+    for feature in layer.getFeatures(request):
+        value = feature.attribute(field_index)
+        values_by_id[feature.id()] = None if value is None or value == NULL else value
+    return values_by_id
+
+
+def _remove_feature_id_maps(layer_id):
+
+    for key in [key for key in _feature_id_maps if key[0] == layer_id]:
+        _feature_id_maps.pop(key, None)
+
+
+def _disconnect_layer_source_signals(layer, slot):
+
+    for signal_name in ('dataSourceChanged', 'subsetStringChanged'):
+        try:
+            getattr(layer, signal_name).disconnect(slot)
+        except (TypeError, AttributeError):
+            pass
+
+
+def _unindex_layer(layer_id):
+    """ Remove @layer_id from index of project layers by table name """
+
+    tablename = _layer_index_tables.pop(layer_id, None)
+    if tablename is None or _layer_index is None:
+        return
+    values = [value for value in _layer_index.get(tablename, []) if value[0] != layer_id]
+    if values:
+        _layer_index[tablename] = values
+    else:
+        _layer_index.pop(tablename, None)
+
 # endregion
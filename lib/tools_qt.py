@@ -34,6 +34,9 @@ from .ui.ui_manager import DialogTextUi
 
 translator = QTranslator()
 dlg_text = DialogTextUi()
+_translations = {}                      # Key: (context_name, aux_context, message). Value: translated message
+_translations_max_size = 10000
+_translator_path = None                 # Path of the translation file loaded. Translations are cached for it
 
 
 class GwExtendedQLabel(QLabel):
@@ -1059,11 +1062,20 @@ def set_stylesheet(widget, style="border: 2px solid red"):
 
 
 def tr(message, context_name=None, aux_context='ui_message'):
-    """ Translate @message looking it in @context_name """
+    """ Translate @message looking it in @context_name. Translations are cached until the translation file changes """
 
     if context_name is None:
         context_name = global_vars.plugin_name
 
+    key = (context_name, aux_context, message)
+    try:
+        return _translations[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Message not hashable: translate it without cache
+        key = None
+
     value = None
     try:
         value = QCoreApplication.translate(context_name, message)
@@ -1074,9 +1086,22 @@ def tr(message, context_name=None, aux_context='ui_message'):
         if value == message:
             value = QCoreApplication.translate(aux_context, message)
 
+    if key is not None:
+        if len(_translations) >= _translations_max_size:
+            try:
+                del _translations[next(iter(_translations))]
+            except (KeyError, RuntimeError, StopIteration):
+                pass
+        _translations[key] = value
+
     return value
 
 
+def clear_translations():
+    """ Clear cache of translations used by tr(). Needed if translators are changed outside of this module """
+    _translations.clear()
+
+
 def manage_translation(context_name, dialog=None, log_info=False):
     """ Manage locale and corresponding 'i18n' file """
 
@@ -1296,9 +1321,14 @@ def create_datetime(object_name, allow_null=True, set_cal_popup=True, display_fo
 def _add_translator(locale_path, log_info=False):
     """ Add translation file to the list of translation files to be used for translations """
 
+    global _translator_path
     if os.path.exists(locale_path):
         translator.load(locale_path)
         QCoreApplication.installTranslator(translator)
+        # Translations of another locale (or none) have been cached
+        if locale_path != _translator_path:
+            _translator_path = locale_path
+            clear_translations()
         if log_info:
             tools_log.log_info("Add translator", parameter=locale_path)
     else:
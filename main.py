@@ -8,7 +8,7 @@ or (at your option) any later version.
 import os
 
 from functools import partial
-from qgis.core import QgsProject
+from qgis.core import Qgis, QgsApplication, QgsProject
 from qgis.PyQt.QtCore import QObject
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction, QDockWidget, QToolBar, QToolButton, QMenu, QApplication
@@ -17,8 +17,9 @@ from . import global_vars
 from .core.admin.admin_btn import GwAdminButton
 from .core.load_project import GwLoadProject
 from .core.utils import tools_gw
+from .core.utils.layers_config_cache import GwLayersConfigCache
 from .core.utils.signal_manager import GwSignalManager
-from .lib import tools_qgis, tools_os, tools_log
+from .lib import tools_qgis, tools_os, tools_log, tools_db
 from .core.ui.dialog import GwDialog
 from .core.ui.main_window import GwMainWindow
 
@@ -112,6 +113,8 @@ class Giswater(QObject):
             # Remove file handler when reloading
             if hide_gw_button:
                 global_vars.logger.close_logger()
+                tools_log.close_slow_query_logger()
+                tools_log.close_trace_logger()
         except Exception as e:
             tools_log.log_info(f"Exception in unload when global_vars.logger.close_logger(): {e}")
 
@@ -130,6 +133,27 @@ class Giswater(QObject):
         except Exception as e:
             tools_log.log_info(f"Exception in unload when global_vars.notify.stop_listening(list_channels): {e}")
 
+        try:
+            # Disconnect index of project layers by table name
+            tools_qgis.reset_layer_index()
+        except Exception as e:
+            tools_log.log_info(f"Exception in unload when tools_qgis.reset_layer_index(): {e}")
+
+        try:
+            # Write pending changes of configuration files
+            tools_gw.flush_config_files()
+            QgsApplication.instance().aboutToQuit.disconnect(tools_gw.flush_config_files)
+        except Exception as e:
+            tools_log.log_info(f"Exception in unload when tools_gw.flush_config_files(): {e}")
+
+        try:
+            # Cancel pending async calls and close their connection
+            if global_vars.async_manager:
+                global_vars.async_manager.close()
+                global_vars.async_manager = None
+        except Exception as e:
+            tools_log.log_info(f"Exception in unload when global_vars.async_manager.close(): {e}")
+
         try:
             # Check if project is current loaded and remove giswater action from PluginMenu and Toolbars
             if self.load_project:
@@ -217,6 +241,23 @@ class Giswater(QObject):
         log_db_limit_characters = tools_gw.get_config_parser('log', 'log_db_limit_characters', 'user', 'init', False)
         global_vars.logger.set_logger_parameters(min_log_level, log_limit_characters, log_db_limit_characters)
 
+        # Set rotation of log files 'log_max_file_mb', 'log_max_folder_mb' and 'log_max_days'
+        log_max_file_mb = tools_gw.get_config_parser('log', 'log_max_file_mb', 'user', 'init', False)
+        log_max_folder_mb = tools_gw.get_config_parser('log', 'log_max_folder_mb', 'user', 'init', False)
+        log_max_days = tools_gw.get_config_parser('log', 'log_max_days', 'user', 'init', False)
+        tools_log.set_log_rotation_params(log_max_file_mb, log_max_folder_mb, log_max_days)
+
+        # Set trace log file 'log_trace'
+        log_trace = tools_gw.get_config_parser('log', 'log_trace', 'user', 'init', False)
+        plugin_version, message = tools_qgis.get_plugin_version()
+        tools_log.set_trace_params(tools_os.set_boolean(log_trace, False),
+                                   {'plugin_version': plugin_version, 'qgis_version': Qgis.QGIS_VERSION})
+
+        # Set query statistics parameters 'log_query_stats' and 'log_slow_query_ms'
+        log_query_stats = tools_gw.get_config_parser('log', 'log_query_stats', 'user', 'init', False)
+        log_slow_query_ms = tools_gw.get_config_parser('log', 'log_slow_query_ms', 'user', 'init', False)
+        tools_db.set_query_stats_params(tools_os.set_boolean(log_query_stats, True), log_slow_query_ms)
+
         # Enable Python console and Log Messages panel if parameter 'enable_python_console' = True
         python_enable_console = tools_gw.get_config_parser('system', 'enable_python_console', 'project', 'giswater')
         if python_enable_console == 'TRUE':
@@ -225,6 +266,30 @@ class Giswater(QObject):
         # Set init parameter 'exec_procedure_max_retries'
         global_vars.exec_procedure_max_retries = int(tools_gw.get_config_parser('system', 'exec_procedure_max_retries', 'user', 'init', False))
 
+        # Set init parameter 'query_cache_size'
+        query_cache_size = tools_gw.get_config_parser('system', 'query_cache_size', 'user', 'init', False)
+        tools_db.set_query_cache_params(query_cache_size)
+
+        # Set init parameter 'json_codec'
+        json_codec = tools_gw.get_config_parser('system', 'json_codec', 'user', 'init', False)
+        tools_db.set_json_codec(json_codec)
+
+        # Set init parameter 'prepared_functions'
+        prepared_functions = tools_gw.get_config_parser('system', 'prepared_functions', 'user', 'init', False)
+        if prepared_functions:
+            global_vars.prepared_functions = [function.strip() for function in prepared_functions.split(',')]
+
+        # Set init parameters 'layers_config_cache' and 'layers_config_cache_max_age'
+        layers_config_cache = tools_gw.get_config_parser('system', 'layers_config_cache', 'user', 'init', False)
+        if tools_os.set_boolean(layers_config_cache, False):
+            max_age = tools_gw.get_config_parser('system', 'layers_config_cache_max_age', 'user', 'init', False)
+            try:
+                max_age = float(max_age)
+            except (TypeError, ValueError):
+                max_age = 24
+            path = f"{global_vars.user_folder_dir}{os.sep}core{os.sep}cache{os.sep}layers_config.sqlite"
+            global_vars.layers_config_cache = GwLayersConfigCache(path, max_age)
+
         # Create the GwSignalManager
         self._create_signal_manager()
 
@@ -0,0 +1,120 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Benchmark of the configuration store used by tools_gw.get_config_parser / set_config_parser (lib/tools_config.py).
+# Compares it with the former behaviour: parse the file on every read and rewrite it on every change.
+# Runs outside QGIS, only requires the python standard library:
+#     python benchmark_config_store.py [path_to/init.config] [--calls 10000]
+# Without a file, a copy of config/user_params.config of the plugin is used.
+import argparse
+import builtins
+import configparser
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+def load_tools_config():
+    """ Import lib/tools_config.py without importing the plugin (that requires QGIS) """
+
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib', 'tools_config.py')
+    spec = importlib.util.spec_from_file_location('tools_config', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class OpenCounter(object):
+    """ Count files opened while active """
+
+    def __enter__(self):
+        self.count = 0
+        self._open = builtins.open
+
+        def counted_open(*args, **kwargs):
+            self.count += 1
+            return self._open(*args, **kwargs)
+
+        builtins.open = counted_open
+        return self
+
+    def __exit__(self, *args):
+        builtins.open = self._open
+
+
+def legacy_get(path, section, option):
+
+    parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
+    parser.read(path)
+    if parser.has_section(section) and parser.has_option(section, option):
+        return parser[section][option]
+    return None
+
+
+def legacy_set(path, section, option, value):
+
+    parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
+    parser.read(path)
+    if section not in parser:
+        parser.add_section(section)
+    parser.set(section, option, value)
+    with open(path, 'w') as configfile:
+        parser.write(configfile)
+
+
+def run(path, calls):
+
+    tools_config = load_tools_config()
+    folder = tempfile.mkdtemp()
+    try:
+        filepath = os.path.join(folder, 'benchmark.config')
+        shutil.copy(path, filepath)
+        parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
+        parser.read(filepath)
+        section = parser.sections()[0]
+        option = parser.options(section)[0]
+        print(f"File: {path} ({os.path.getsize(path)} bytes). Reading [{section}] {option} {calls} times")
+
+        def measure(name, function, calls=calls):
+            with OpenCounter() as counter:
+                start = time.perf_counter()
+                for i in range(calls):
+                    function(i)
+                elapsed = (time.perf_counter() - start) * 1000
+            print(f"{name:<30} {elapsed:10.1f} ms {elapsed * 1000 / calls:10.2f} us/call "
+                  f"{counter.count / calls:8.3f} files opened/call")
+
+        # Read: as execute_procedure does with 'log_sql' on every call
+        measure("get (legacy)", lambda i: legacy_get(filepath, section, option))
+        store = tools_config.GwConfigStore()
+        store.get_value(filepath, section, option)
+        measure("get (store)", lambda i: store.get_value(filepath, section, option))
+        print(f"{'':<30} store: {store.stats['reads']} reads, {store.stats['checks']} modification checks")
+
+        # Write: as save_settings does when closing a dialog
+        writes = min(calls, 1000)
+        measure("set (legacy)", lambda i: legacy_set(filepath, 'benchmark', f"key_{i % 10}", f"{i}"), writes)
+        measure("set (store)", lambda i: store.set_value(filepath, 'benchmark', f"key_{i % 10}", f"{i}"), writes)
+        store.close()
+        print(f"{'':<30} store: {store.stats['writes']} writes to disk")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config',
+                                'user_params.config')
+    parser = argparse.ArgumentParser(description="Benchmark of the configuration store")
+    parser.add_argument('path', nargs='?', default=default_path)
+    parser.add_argument('--calls', type=int, default=10000)
+    args = parser.parse_args()
+    run(args.path, args.calls)
+    sys.exit(0)
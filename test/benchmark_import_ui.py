@@ -0,0 +1,69 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Benchmark of the form classes of dialogs (core/ui/ui_manager.py).
+# Compares the former parsing of every .ui file when importing ui_manager with the import of lazy form classes,
+# and the cost of the first dialog of each form, loading the .ui file at runtime or its precompiled module.
+# Run core/ui/compile_ui.py before to measure precompiled modules.
+# Requires the python interpreter of QGIS (i.e. OSGeo4W shell or 'python3' with qgis in PYTHONPATH):
+#     python benchmark_import_ui.py
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from qgis.core import QgsApplication
+from qgis.PyQt import uic
+
+
+def get_ui_files(ui_folder):
+    """ Return path of every .ui file of the plugin """
+
+    ui_files = []
+    for folder, subfolders, files in os.walk(ui_folder):
+        if os.path.basename(folder) == 'compiled':
+            continue
+        ui_files.extend(os.path.join(folder, file) for file in sorted(files) if file.endswith('.ui'))
+    return ui_files
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark of the form classes of dialogs")
+    parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    # Import plugin package from its parent folder
+    plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(plugin_dir))
+    package = os.path.basename(plugin_dir)
+    ui_files = get_ui_files(os.path.join(plugin_dir, 'core', 'ui'))
+    print(f"{len(ui_files)} .ui files")
+
+    def measure(name, function):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:<40} {elapsed:10.1f} ms")
+
+    # Former import of ui_manager: every .ui file parsed by uic.loadUiType
+    measure("parse every .ui file (legacy import)", lambda: [uic.loadUiType(path) for path in ui_files])
+    measure("import ui_manager (lazy)", lambda: importlib.import_module(f"{package}.core.ui.ui_manager"))
+    ui_manager = sys.modules[f"{package}.core.ui.ui_manager"]
+
+    # First use of every form: precompiled module if up to date, otherwise .ui file
+    measure("first use, runtime .ui", lambda: [uic.loadUiType(path) for path in ui_files])
+    compiled = [path for path in ui_files if ui_manager._import_compiled_form_class(path) is not None]
+    ui_manager._form_classes.clear()
+    measure(f"first use, {len(compiled)} precompiled", lambda: [ui_manager._get_form_class(path) for path in ui_files])
+    measure("next uses (memoized)", lambda: [ui_manager._get_form_class(path) for path in ui_files])
+
+    qgs.exitQgis()
+    sys.exit(0)
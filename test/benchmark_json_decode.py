@@ -0,0 +1,105 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Benchmark of the decoders of json responses available in lib/tools_pgdao.py (see set_json_codec).
+# Runs outside QGIS, only requires psycopg2 (and optionally orjson / ujson).
+#
+# Record real responses executing the queries of a file (one per line) against a database:
+#     python benchmark_json_decode.py record "service=giswater" queries.sql responses_folder
+#     (i.e. SELECT ws.gw_fct_getinfofromid($${"client":...}$$);)
+#
+# Compare decode time of the recorded responses:
+#     python benchmark_json_decode.py run responses_folder [--repeat 20]
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+
+def load_tools_pgdao():
+    """ Import lib/tools_pgdao.py without importing the plugin (that requires QGIS) """
+
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib', 'tools_pgdao.py')
+    spec = importlib.util.spec_from_file_location('tools_pgdao', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def record(conn_string, queries_file, folder):
+    """ Execute each query of @queries_file and save its json response as text into @folder """
+
+    import psycopg2
+
+    os.makedirs(folder, exist_ok=True)
+    conn = psycopg2.connect(conn_string)
+    cursor = conn.cursor()
+    with open(queries_file, encoding='utf-8') as f:
+        queries = [line.strip().rstrip(';') for line in f if line.strip() and not line.startswith('--')]
+    for index, query in enumerate(queries):
+        cursor.execute(f"SELECT ({query})::text")
+        text = cursor.fetchone()[0]
+        conn.rollback()
+        filepath = os.path.join(folder, f"response_{index:03d}.json")
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"{filepath}: {len(text)} characters")
+    conn.close()
+
+
+def run(folder, repeat=20):
+    """ Print decode time of the responses saved in @folder with each installed decoder """
+
+    tools_pgdao = load_tools_pgdao()
+    responses = []
+    for filename in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, filename), encoding='utf-8') as f:
+            responses.append(f.read())
+    if not responses:
+        print(f"No responses found in {folder}")
+        return
+    size = sum(len(text) for text in responses)
+    print(f"{len(responses)} responses, {size / 1024:.1f} KB, {repeat} repetitions")
+
+    def measure(name, decode):
+        start = time.perf_counter()
+        for i in range(repeat):
+            for text in responses:
+                decode(text)
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        print(f"{name:<30} {elapsed:10.2f} ms")
+
+    for codec in tools_pgdao.get_json_codecs():
+        tools_pgdao.set_json_codec(codec)
+        measure(codec, tools_pgdao._loads_json)
+
+    # Lazy mode: nothing is decoded until accessed. Measure also the usual access of execute_procedure
+    tools_pgdao.set_json_codec('auto')
+    measure("lazy (not accessed)", tools_pgdao._loads_lazy_json)
+    measure(f"lazy + 'status' ({tools_pgdao.get_json_codec()})",
+            lambda text: 'status' in tools_pgdao._loads_lazy_json(text))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark of json decoders of database responses")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parser_record = subparsers.add_parser('record', help="Record responses of the queries of a file")
+    parser_record.add_argument('conn_string')
+    parser_record.add_argument('queries_file')
+    parser_record.add_argument('folder')
+    parser_run = subparsers.add_parser('run', help="Compare decode time of recorded responses")
+    parser_run.add_argument('folder')
+    parser_run.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.conn_string, args.queries_file, args.folder)
+    else:
+        run(args.folder, args.repeat)
+    sys.exit(0)
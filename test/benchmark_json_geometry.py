@@ -0,0 +1,115 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Benchmark of the reprojection of geometries of database responses (see tools_gw.manage_json_geometry).
+# Compares the former per-vertex string replacement with the transformation of the whole parsed geometry.
+# Before measuring, checks that a reprojected response is drawn by tools_gw.draw_by_json.
+# Requires the python interpreter of QGIS (i.e. OSGeo4W shell or 'python3' with qgis in PYTHONPATH):
+#     QT_QPA_PLATFORM=offscreen python benchmark_json_geometry.py [--vertices 1000 10000 100000] [--legacy-max 20000]
+# Legacy algorithm is quadratic: it is only measured up to --legacy-max vertices.
+import argparse
+import importlib
+import os
+import random
+import re
+import sys
+import time
+
+from qgis.core import QgsApplication, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsPointXY, QgsProject
+from qgis.gui import QgsMapCanvas, QgsRubberBand
+
+
+DATA_EPSG = 25831
+PROJECT_EPSG = 3857
+
+
+def create_wkt(vertices):
+    """ Return WKT of a linestring with @vertices random vertices around Barcelona (EPSG:25831) """
+
+    x, y = 430000.0, 4580000.0
+    coords = []
+    for i in range(vertices):
+        x += random.uniform(-5, 5)
+        y += random.uniform(-5, 5)
+        coords.append(f"{x:.3f} {y:.3f}")
+    return f"LINESTRING({','.join(coords)})"
+
+
+def legacy_transform(wkt):
+    """ Former algorithm: split vertices and replace each coordinate in the whole text """
+
+    tform = QgsCoordinateTransform(QgsCoordinateReferenceSystem(f"EPSG:{DATA_EPSG}"),
+                                   QgsCoordinateReferenceSystem(f"EPSG:{PROJECT_EPSG}"), QgsProject.instance())
+    list_coord = re.search(r'\((.*)\)', wkt)
+    points = []
+    for coord in list_coord.group(1).split(','):
+        x, y = coord.split(' ')
+        points.append(QgsPointXY(float(x), float(y)))
+    for point in points:
+        new_coords = tform.transform(point)
+        wkt = wkt.replace(str(point.x()), str(new_coords.x()))
+        wkt = wkt.replace(str(point.y()), str(new_coords.y()))
+    return wkt
+
+
+def check_draw_by_json(tools_gw, global_vars, wkt):
+    """ Reproject a response with tools_gw.manage_json_geometry and draw it with tools_gw.draw_by_json.
+    Return number of vertices of the rubber band """
+
+    global_vars.data_epsg = DATA_EPSG
+    global_vars.project_epsg = PROJECT_EPSG
+    json_result = {'body': {'feature': {'geometry': {'st_astext': wkt}}}}
+    json_result = tools_gw.manage_json_geometry(json_result)
+    rubber_band = QgsRubberBand(QgsMapCanvas())
+    tools_gw.draw_by_json(json_result, rubber_band)
+    return rubber_band.numberOfVertices()
+
+
+def measure(function, wkt):
+
+    start = time.perf_counter()
+    function(wkt)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark of the reprojection of geometries of json responses")
+    parser.add_argument('--vertices', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=20000)
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], True)
+    qgs.initQgis()
+
+    # Import plugin package from its parent folder
+    plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(plugin_dir))
+    package = os.path.basename(plugin_dir)
+    global_vars = importlib.import_module(f"{package}.global_vars")
+    tools_gw = importlib.import_module(f"{package}.core.utils.tools_gw")
+    tools_qgis = importlib.import_module(f"{package}.lib.tools_qgis")
+
+    random.seed(0)
+    for wkt in ("POINT(430000 4580000)", create_wkt(100)):
+        vertices = check_draw_by_json(tools_gw, global_vars, wkt)
+        print(f"draw_by_json of reprojected {wkt.split('(')[0]}: {vertices} vertices drawn")
+        if vertices == 0:
+            print("Error: reprojected geometry is not drawn")
+            sys.exit(1)
+
+    def geometry_transform(wkt):
+        geometry = tools_qgis.get_transformed_geometry(wkt, DATA_EPSG, PROJECT_EPSG)
+        return tools_qgis.get_postgis_wkt(geometry)
+
+    print(f"{'vertices':>10} {'legacy (ms)':>14} {'geometry (ms)':>14}")
+    for vertices in args.vertices:
+        wkt = create_wkt(vertices)
+        legacy = f"{measure(legacy_transform, wkt):14.1f}" if vertices <= args.legacy_max else f"{'-':>14}"
+        print(f"{vertices:>10} {legacy} {measure(geometry_transform, wkt):14.1f}")
+    qgs.exitQgis()
+    sys.exit(0)
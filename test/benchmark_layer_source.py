@@ -0,0 +1,97 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Benchmark of the data source of layers (lib/tools_qgis.get_layer_source_descriptor) on a project of postgres layers.
+# Compares the former parsing of the uri with shlex on every call with the cache of parsed sources by layer id.
+# Layers are not connected to any database: they are created invalid, only their uri is used.
+# Requires the python interpreter of QGIS (i.e. OSGeo4W shell or 'python3' with qgis in PYTHONPATH):
+#     python benchmark_layer_source.py [--layers 300] [--calls 20]
+import argparse
+import importlib
+import os
+import shlex
+import sys
+import time
+
+from qgis.core import QgsApplication, QgsProject, QgsVectorLayer
+
+
+def create_layers(count):
+    """ Return @count postgres layers without connection, as the ones of a Giswater project """
+
+    layers = []
+    for i in range(count):
+        uri = (f"dbname='giswater' host=localhost port=5432 user='postgres' sslmode=disable key='arc_id' "
+               f"srid=25831 type=LineString checkPrimaryKeyUnicity='1' table=\"ws\".\"v_edit_layer_{i}\" "
+               f"(the_geom) sql=expl_id = {i % 10}")
+        layer = QgsVectorLayer(uri, f"layer_{i}", 'postgres')
+        layers.append(layer)
+    return layers
+
+
+def legacy_get_layer_source(layer):
+    """ Former tools_qgis.get_layer_source, parsing uri on every call """
+
+    layer_source = {'db': None, 'schema': None, 'table': None, 'service': None, 'host': None, 'port': None,
+                    'user': None, 'password': None, 'sslmode': None}
+    uri = layer.dataProvider().dataSourceUri()
+    list_uri = []
+    for v in shlex.split(uri):
+        if '=' in v:
+            elem_uri = tuple(v.split('='))
+            if len(elem_uri) == 2:
+                list_uri.append(elem_uri)
+    splt_dct = dict(list_uri)
+    if 'dbname' in splt_dct:
+        splt_dct['db'] = splt_dct['dbname']
+    if 'table' in splt_dct:
+        splt_dct['schema'], splt_dct['table'] = splt_dct['table'].split('.')
+    for key in layer_source.keys():
+        layer_source[key] = splt_dct.get(key)
+    return layer_source
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark of the data source of layers")
+    parser.add_argument('--layers', type=int, default=300)
+    parser.add_argument('--calls', type=int, default=20)
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    # Import plugin package from its parent folder
+    plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(plugin_dir))
+    package = os.path.basename(plugin_dir)
+    tools_qgis = importlib.import_module(f"{package}.lib.tools_qgis")
+
+    layers = create_layers(args.layers)
+    QgsProject.instance().addMapLayers(layers, False)
+    print(f"{len(layers)} layers, every layer read {args.calls} times (i.e. a loop over project layers per action)")
+
+    def measure(name, function):
+        start = time.perf_counter()
+        for i in range(args.calls):
+            for layer in layers:
+                function(layer)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:<30} {elapsed:10.1f} ms {elapsed * 1000 / (args.calls * len(layers)):10.2f} us/call")
+
+    measure("get_layer_source (legacy)", legacy_get_layer_source)
+    measure("get_layer_source (cached)", tools_qgis.get_layer_source)
+    measure("table name (cached)", tools_qgis.get_layer_source_table_name)
+
+    # Changing the filter of a layer invalidates its cached source
+    layers[0].setSubsetString("expl_id = 99")
+    print(f"sql after setSubsetString: {tools_qgis.get_layer_source_descriptor(layers[0]).sql}")
+
+    tools_qgis.reset_layer_index()
+    QgsProject.instance().removeAllMapLayers()
+    qgs.exitQgis()
+    sys.exit(0)
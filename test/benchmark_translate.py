@@ -0,0 +1,80 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Micro-benchmark of translations of forms (lib/tools_qt.tr) with and without its cache.
+# Messages are the texts of the .ui files of the plugin, translated as many times as forms are built.
+# Requires the python interpreter of QGIS (i.e. OSGeo4W shell or 'python3' with qgis in PYTHONPATH):
+#     python benchmark_translate.py [--locale es_ES] [--forms 100]
+import argparse
+import importlib
+import os
+import re
+import sys
+import time
+
+from qgis.core import QgsApplication
+from qgis.PyQt.QtCore import QCoreApplication
+
+
+def get_ui_messages(plugin_dir):
+    """ Return texts of labels and tooltips of every .ui file of the plugin """
+
+    messages = []
+    for folder, subfolders, files in os.walk(os.path.join(plugin_dir, 'core', 'ui')):
+        for file in files:
+            if not file.endswith('.ui'):
+                continue
+            with open(os.path.join(folder, file), encoding='utf-8') as f:
+                messages.extend(re.findall(r'<string>([^<]+)</string>', f.read()))
+    return messages
+
+
+def legacy_tr(message, context_name, aux_context='ui_message'):
+    """ Former tools_qt.tr, without cache """
+
+    value = QCoreApplication.translate(context_name, message)
+    if value == message:
+        value = QCoreApplication.translate(aux_context, message)
+    return value
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmark of translation of forms")
+    parser.add_argument('--locale', default='es_ES')
+    parser.add_argument('--forms', type=int, default=100)
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    # Import plugin package from its parent folder
+    plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(plugin_dir))
+    package = os.path.basename(plugin_dir)
+    global_vars = importlib.import_module(f"{package}.global_vars")
+    global_vars.plugin_dir = plugin_dir
+    global_vars.plugin_name = 'giswater'
+    tools_qt = importlib.import_module(f"{package}.lib.tools_qt")
+    tools_qt._add_translator(os.path.join(plugin_dir, 'i18n', f'giswater_{args.locale}.qm'))
+
+    messages = get_ui_messages(plugin_dir)
+    print(f"{len(messages)} messages, {args.forms} forms, locale {args.locale}")
+
+    def measure(name, function):
+        start = time.perf_counter()
+        for i in range(args.forms):
+            for message in messages:
+                function(message, 'giswater')
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:<20} {elapsed:10.1f} ms {elapsed / args.forms:10.2f} ms/form")
+
+    measure("without cache", legacy_tr)
+    tools_qt.clear_translations()
+    measure("with cache", tools_qt.tr)
+    qgs.exitQgis()
+    sys.exit(0)
@@ -0,0 +1,125 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Tests of GwConfigStore (lib/tools_config.py). They don't require QGIS:
+#     python -m pytest test/test_config_store.py
+import configparser
+import time
+
+import pytest
+
+from ..lib.tools_config import GwConfigStore
+
+
+@pytest.fixture
+def config_path(tmp_path):
+
+    path = tmp_path / "init.config"
+    path.write_text("[system]\nlog_sql = False #Write queries to log\nquery_cache_size = 256\n")
+    return str(path)
+
+
+def _read_file(path):
+
+    parser = configparser.ConfigParser(comment_prefixes=";", allow_no_value=True)
+    parser.read(path)
+    return parser
+
+
+def _wait(condition, timeout=5):
+
+    limit = time.monotonic() + timeout
+    while not condition() and time.monotonic() < limit:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_changes_are_written_once_after_last_one(config_path):
+
+    store = GwConfigStore(flush_delay=0.2)
+    try:
+        for value in ('1', '2', '3'):
+            store.set_value(config_path, 'system', 'query_cache_size', value)
+        assert store.get_value(config_path, 'system', 'query_cache_size') == '3'
+        assert _read_file(config_path)['system']['query_cache_size'] == '256'
+
+        assert _wait(lambda: store.stats['writes'] == 1)
+        time.sleep(0.4)
+        assert store.stats['writes'] == 1
+        assert _read_file(config_path)['system']['query_cache_size'] == '3'
+        assert _read_file(config_path)['system']['log_sql'] == 'False #Write queries to log'
+    finally:
+        store.close()
+
+
+def test_file_changed_by_another_program_keeps_values_not_written(config_path):
+
+    store = GwConfigStore(check_interval=0, flush_delay=60)
+    try:
+        store.set_value(config_path, 'system', 'log_sql', 'True')
+        with open(config_path, 'w') as f:
+            f.write("[system]\nlog_sql = False\nquery_cache_size = 512\n[log]\nlog_level = 2\n")
+
+        assert store.get_value(config_path, 'system', 'query_cache_size') == '512'
+        assert store.get_value(config_path, 'log', 'log_level') == '2'
+        assert store.get_value(config_path, 'system', 'log_sql') == 'True'
+
+        assert store.flush()
+        parser = _read_file(config_path)
+        assert parser['system']['log_sql'] == 'True'
+        assert parser['system']['query_cache_size'] == '512'
+    finally:
+        store.close()
+
+
+def test_failed_write_keeps_values_for_next_flush(config_path, monkeypatch):
+
+    errors = []
+    store = GwConfigStore(flush_delay=60, on_error=errors.append)
+    try:
+        store.set_value(config_path, 'system', 'query_cache_size', '128')
+
+        def fail(path, text):
+            raise OSError("disk full")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(store, '_write_file', fail)
+            assert store.flush() is False
+        assert len(errors) == 1 and "disk full" in errors[0]
+        assert _read_file(config_path)['system']['query_cache_size'] == '256'
+
+        store.set_value(config_path, 'system', 'log_sql', 'True')
+        assert store.flush()
+        parser = _read_file(config_path)
+        assert parser['system']['query_cache_size'] == '128'
+        assert parser['system']['log_sql'] == 'True'
+        assert not store.files[config_path]['dirty']
+    finally:
+        store.close()
+
+
+def test_on_reload_receives_parser_read_again(config_path):
+
+    reloaded = []
+    store = GwConfigStore(check_interval=0, on_reload=lambda path, parser: reloaded.append((path, parser)))
+    try:
+        parser = store.get_parser(config_path)
+        assert reloaded == []
+
+        with open(config_path, 'w') as f:
+            f.write("[system]\nquery_cache_size = 1024\n")
+        assert store.get_value(config_path, 'system', 'query_cache_size') == '1024'
+        assert len(reloaded) == 1
+        path, new_parser = reloaded[0]
+        assert path == config_path
+        assert new_parser is not parser
+        assert new_parser is store.get_parser(config_path)
+
+        store.reload(config_path)
+        assert len(reloaded) == 2
+    finally:
+        store.close()
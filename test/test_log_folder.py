@@ -0,0 +1,83 @@
+"""
+This file is part of Giswater 3
+The program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+"""
+# -*- coding: utf-8 -*-
+# Tests of the retention policy of log folders (GwLogFolder of lib/tools_log.py). tools_log requires the python
+# interpreter of QGIS:
+#     python -m pytest test/test_log_folder.py
+import os
+import time
+
+import pytest
+
+pytest.importorskip('qgis.core')
+
+from ..lib import tools_log
+
+
+@pytest.fixture
+def rotation_params():
+
+    params = dict(tools_log._log_rotation_params)
+    yield tools_log._log_rotation_params
+    tools_log._log_rotation_params.update(params)
+
+
+def _write_file(path, size, age_days=0):
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _get_log_folder(folder):
+    """ Return GwLogFolder of @folder once its first maintenance (compression of previous days) has finished """
+
+    log_folder = tools_log.GwLogFolder(folder)
+    log_folder.tasks.join()
+    return log_folder
+
+
+def test_retention_keeps_active_and_non_log_files(tmp_path, rotation_params):
+
+    folder = str(tmp_path)
+    log_folder = _get_log_folder(folder)
+    old_log = _write_file(os.path.join(folder, 'giswater_20200101.log'), 10, age_days=40)
+    old_gz = _write_file(os.path.join(folder, 'sub', 'trace_20200101.jsonl.gz'), 10, age_days=40)
+    active_log = _write_file(os.path.join(folder, 'giswater_20200102.log'), 10, age_days=40)
+    history = _write_file(os.path.join(folder, 'startup_history.json'), 10, age_days=40)
+    user_file = _write_file(os.path.join(folder, 'sub', 'notes.txt'), 10, age_days=40)
+
+    rotation_params.update(max_days=30, max_folder_bytes=0)
+    log_folder.active_files.add(active_log)
+    log_folder.apply_retention()
+
+    assert not os.path.exists(old_log)
+    assert not os.path.exists(old_gz)
+    assert os.path.exists(active_log)
+    assert os.path.exists(history)
+    assert os.path.exists(user_file)
+
+
+def test_retention_removes_oldest_log_files_of_subfolders_until_size_limit(tmp_path, rotation_params):
+
+    folder = str(tmp_path)
+    log_folder = _get_log_folder(folder)
+    logs = [_write_file(os.path.join(folder, 'sub', f'giswater_2020010{day}.log'), 1000, age_days=10 - day)
+            for day in range(1, 6)]
+    history = _write_file(os.path.join(folder, 'startup_history.json'), 100, age_days=20)
+
+    log_folder.add_size(5100)
+
+    rotation_params.update(max_days=0, max_folder_bytes=2500)
+    log_folder.apply_retention()
+
+    assert [os.path.exists(path) for path in logs] == [False, False, False, True, True]
+    assert os.path.exists(history)
+    assert log_folder.size == 2100